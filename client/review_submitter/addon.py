@@ -15,11 +15,36 @@ class ReviewSubmitterAddon(AYONAddon, IHostAddon, IPluginPaths):
 
     def initialize(self, settings):
         """Initialize addon with settings."""
-        pass
+        addon_settings = settings.get(self.name, {})
+        self._performance_settings = addon_settings.get("performance", {})
 
     def connect_with_addons(self, enabled_addons):
         """Connect with other addons."""
-        pass
+        if self._performance_settings.get("warm_up_on_launch", False):
+            from .handlers.warmup_helper import start_warm_up
+
+            start_warm_up(self._performance_settings.get("warm_up_delay", 2.0))
+
+        host_name = os.environ.get("AYON_HOST_NAME")
+        if self._performance_settings.get("metrics_enabled", False):
+            from .handlers.metrics import EXPORT_HOSTS, MetricsExporter
+
+            # Publish workers, tray and other tools of the addon do not export
+            if host_name in EXPORT_HOSTS:
+                MetricsExporter.start(
+                    self._performance_settings.get("metrics_dir") or None,
+                    self._performance_settings.get("metrics_flush_interval", 30.0)
+                )
+
+        project_name = os.environ.get("AYON_PROJECT_NAME")
+        if self._performance_settings.get("event_invalidation", False) and project_name:
+            from .handlers.event_invalidator import EventInvalidator
+
+            EventInvalidator.start(
+                project_name,
+                interval=self._performance_settings.get("event_poll_interval", 5.0),
+                long_ttl=self._performance_settings.get("event_cache_ttl", 3600)
+            )
 
     def get_plugin_paths(self):
         """Return publish plugin paths for OpenRV."""
@@ -0,0 +1,113 @@
+"""Command line entry point for submitting reviews without RV or Qt.
+
+Example:
+    python -m review_submitter submit --project MyProject \
+        --version-id <id> --version-id <id> --reviewer supervisor \
+        --type WIP --comment "Nightly render"
+    python -m review_submitter backfill-analytics --project MyProject
+"""
+import argparse
+import os
+
+
+def _build_parser():
+    parser = argparse.ArgumentParser(
+        prog="review_submitter",
+        description="AYON Review Submitter"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    submit = subparsers.add_parser("submit", help="Submit versions for review")
+    submit.add_argument("--project", required=True, help="Project name")
+    submit.add_argument(
+        "--version-id", dest="version_ids", action="append", required=True,
+        help="Version to submit, can be used multiple times"
+    )
+    submit.add_argument(
+        "--reviewer", dest="reviewers", action="append", required=True,
+        help="Reviewer user name, can be used multiple times"
+    )
+    submit.add_argument("--type", dest="submission_type", default="WIP", help="Submission type")
+    submit.add_argument("--comment", default="", help="Activity comment")
+    submit.add_argument("--priority", action="store_true", help="Mark as high priority")
+    submit.add_argument("--submitter", default=None, help="Submitter stored in task data")
+    submit.add_argument("--workers", type=int, default=4, help="Versions submitted at the same time")
+    submit.add_argument(
+        "--no-thumbnail", dest="thumbnail", action="store_false",
+        help="Do not render thumbnails from the version media"
+    )
+
+    backfill = subparsers.add_parser(
+        "backfill-analytics",
+        help="Index submissions stored in task data and rebuild server analytics"
+    )
+    backfill.add_argument(
+        "--project", dest="projects", action="append", required=True,
+        help="Project name, can be used multiple times"
+    )
+    return parser
+
+
+def _backfill_analytics(args):
+    import ayon_api
+
+    from .version import __version__
+
+    conn = ayon_api.get_server_api_connection()
+    failed = False
+    for project_name in args.projects:
+        response = conn.post(
+            f"addons/review_submitter/{__version__}/projects/{project_name}/analytics/backfill")
+        if response.status_code >= 400:
+            print(f"Backfill of {project_name} failed: HTTP {response.status_code} {response.text}")
+            failed = True
+            continue
+        result = response.data
+        print(f"Backfilled {project_name}: scanned {result['tasks']} tasks, added {result['added']} submissions")
+    return 1 if failed else 0
+
+
+def _submit(args):
+    # Settings are resolved for the current project
+    os.environ.setdefault("AYON_PROJECT_NAME", args.project)
+
+    from .handlers.settings_helper import get_performance_settings
+    from .handlers.submission_helper import submit_versions
+
+    performance_settings = get_performance_settings()
+    if performance_settings.get("metrics_enabled", False):
+        from .handlers.metrics import MetricsExporter
+
+        MetricsExporter.start(
+            performance_settings.get("metrics_dir") or None,
+            performance_settings.get("metrics_flush_interval", 30.0),
+            host_name="headless"
+        )
+
+    review_data = {
+        "reviewer": args.reviewers[0],
+        "reviewers": args.reviewers,
+        "submission_type": args.submission_type,
+        "is_high_priority": args.priority,
+        "comment": args.comment
+    }
+    results = submit_versions(
+        args.project,
+        args.version_ids,
+        review_data,
+        max_workers=max(1, args.workers),
+        submitter_name=args.submitter,
+        thumbnail=args.thumbnail
+    )
+    failed = [version_id for version_id, error in results.items() if error]
+    print(f"Submitted {len(results) - len(failed)}/{len(results)} versions")
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    args = _build_parser().parse_args(argv)
+    if args.command == "submit":
+        return _submit(args)
+    if args.command == "backfill-analytics":
+        return _backfill_analytics(args)
+    return 2
@@ -3,3 +3,26 @@ import os
 # Review Submitter root directory
 REVIEW_SUBMITTER_ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
 AYON_ATTR_PREFIX = "ayon."
+
+# Number of previous submissions kept in task data next to 'submission_data'
+SUBMISSION_HISTORY_LIMIT = 10
+
+# Fields requested from AYON, 'attrib' expands to all attributes of the type.
+# Entities passed to loaders keep everything the loaders and path
+# resolution read, plain lookups only request what the addon uses.
+LOADER_REPRESENTATION_FIELDS = {"id", "name", "versionId", "attrib", "context", "files", "data"}
+LOADER_VERSION_FIELDS = {"id", "name", "version", "productId", "taskId", "author", "attrib", "data"}
+REPRESENTATION_PATH_FIELDS = {"id", "name", "versionId", "attrib.path", "attrib.template", "context"}
+VERSION_SUMMARY_FIELDS = {"id", "name", "productId", "taskId"}
+VERSION_MEDIA_FIELDS = {
+    "id",
+    "attrib.resolutionWidth",
+    "attrib.resolutionHeight",
+    "attrib.frameStart",
+    "attrib.frameEnd",
+    "attrib.handleStart",
+    "attrib.handleEnd"
+}
+PRODUCT_SUMMARY_FIELDS = {"id", "name", "productType"}
+FOLDER_FIELDS = {"id", "name", "path"}
+TASK_SUMMARY_FIELDS = {"id", "name", "folderId"}
@@ -1,11 +1,34 @@
-from .openrv_handler import OpenRVStackHandler
-from .review_submission_handler import (
-    ReviewSubmissionHandler,
-    ReviewSubmissionDialog
-)
+"""Review Submitter handlers.
+
+Handlers are imported on first attribute access (PEP 562), so loader and
+publish plugin discovery does not import Qt, ayon_api or RV modules that
+are only needed once a handler is used.
+"""
+import importlib
+
+_LAZY_ATTRIBUTES = {
+    "OpenRVStackHandler": ".openrv_handler",
+    "ReviewSubmissionHandler": ".review_submission_handler",
+    "ReviewSubmissionDialog": ".review_submission_handler",
+}
 
 __all__ = [
     "OpenRVStackHandler",
     "ReviewSubmissionHandler",
     "ReviewSubmissionDialog"
 ]
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module = importlib.import_module(module_name, __name__)
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -0,0 +1,99 @@
+"""Shared in-memory caches for AYON lookups."""
+import os
+import threading
+import time
+
+from .metrics import CACHE_REQUESTS
+
+# Seconds before a cached value is fetched again
+DEFAULT_TTL = 300
+
+
+class TTLCache:
+    """Thread safe key/value cache with a time to live per cache."""
+
+    def __init__(self, name, ttl=DEFAULT_TTL):
+        self.name = name
+        self.ttl = ttl
+        self._items = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None and item[1] < time.monotonic():
+                self._items.pop(key, None)
+                item = None
+        CACHE_REQUESTS.inc(cache=self.name, result="miss" if item is None else "hit")
+        if item is None:
+            return default
+        return item[0]
+
+    def set(self, key, value):
+        with self._lock:
+            self._items[key] = (value, time.monotonic() + self.ttl)
+
+    def get_or_fetch(self, key, fetch):
+        """Return cached value or store and return result of 'fetch()'"""
+        value = self.get(key)
+        if value is None:
+            value = fetch()
+            if value is not None:
+                self.set(key, value)
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            self._items.pop(key, None)
+
+    def invalidate_where(self, predicate):
+        """Drop entries whose key matches 'predicate(key)'"""
+        with self._lock:
+            for key in [key for key in self._items if predicate(key)]:
+                del self._items[key]
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+def get_cache_dir(*subdirs):
+    """Local directory for on-disk caches, created if missing.
+
+    Root can be overridden with 'AYON_REVIEW_SUBMITTER_CACHE_DIR'.
+    """
+    root = os.environ.get("AYON_REVIEW_SUBMITTER_CACHE_DIR") or os.path.join(
+        os.path.expanduser("~"), ".ayon", "review_submitter", "cache")
+    path = os.path.join(root, *subdirs)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+SETTINGS_CACHE = TTLCache("settings")
+USERS_CACHE = TTLCache("users")
+ENTITY_CACHE = TTLCache("entities")
+
+
+def get_cached_folder(project_name, folder_path):
+    """Get folder entity by path through the shared entity cache"""
+    import ayon_api
+    from ..constants import FOLDER_FIELDS
+
+    return ENTITY_CACHE.get_or_fetch(
+        ("folder", project_name, folder_path),
+        lambda: ayon_api.get_folder_by_path(project_name, folder_path, fields=FOLDER_FIELDS)
+    )
+
+
+def get_cached_tasks(project_name, folder_id, task_names=None):
+    """Get tasks of folder through the shared entity cache"""
+    import ayon_api
+    from ..constants import TASK_SUMMARY_FIELDS
+
+    tasks = ENTITY_CACHE.get_or_fetch(
+        ("tasks", project_name, folder_id),
+        lambda: list(ayon_api.get_tasks(project_name, folder_ids=[folder_id], fields=TASK_SUMMARY_FIELDS))
+    )
+    if task_names is None:
+        return list(tasks)
+    return [task for task in tasks if task["name"] in task_names]
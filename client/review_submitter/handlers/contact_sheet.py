@@ -0,0 +1,110 @@
+"""Contact sheets of frames sampled across a representation."""
+import math
+import os
+from concurrent.futures import Future
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .cache_helper import get_cache_dir
+from .media_helper import decode_frames, encode_image, get_process_pool, get_proxy_size
+
+
+def build_contact_sheet(
+    path,
+    frame_count,
+    output_path,
+    frames=12,
+    columns=4,
+    tile_width=320,
+    resolution=None
+):
+    """Render sampled frames and tile them into one image.
+
+    All sampled frames are decoded down-scaled in one ffmpeg pass.
+
+    Args:
+        path (str): Movie file or first file of image sequence.
+        frame_count (int): Number of frames of the media.
+        output_path (str): Image path, format is picked from extension.
+        frames (int): Number of sampled frames.
+        columns (int): Tiles per row.
+        tile_width (int): Width of one tile.
+        resolution (Optional[tuple[int, int]]): Source resolution used for
+            tile aspect ratio.
+
+    Returns:
+        str: Path to the contact sheet.
+    """
+    if np is None:
+        raise RuntimeError("NumPy is required for contact sheets")
+
+    width, height = get_proxy_size(tile_width, resolution)
+    samples = max(1, min(frames, frame_count))
+    indices = sorted({int(i * frame_count / samples) for i in range(samples)})
+
+    tiles = decode_frames(path, width, height, frame_indices=indices)
+
+    columns = max(1, min(columns, len(tiles)))
+    rows = math.ceil(len(tiles) / columns)
+    sheet = np.zeros((rows * height, columns * width, 3), dtype=np.uint8)
+    for index, tile in enumerate(tiles):
+        row, column = divmod(index, columns)
+        sheet[row * height:(row + 1) * height, column * width:(column + 1) * width] = tile
+
+    return encode_image(sheet, output_path)
+
+
+def _build_cached_contact_sheet(path, frame_count, output_path, **kwargs):
+    """Build sheet next to the cached file and move it in place.
+
+    Runs in a pool worker. The temporary file is unique per process, so an
+    interrupted or concurrent build is never reused.
+    """
+    root, ext = os.path.splitext(output_path)
+    temp_path = f"{root}_{os.getpid()}_tmp{ext}"
+    build_contact_sheet(path, frame_count, temp_path, **kwargs)
+    os.replace(temp_path, output_path)
+    return output_path
+
+
+def submit_contact_sheet(
+    representation_id,
+    path,
+    frame_count,
+    resolution=None,
+    frames=12,
+    columns=4,
+    tile_width=320,
+    max_workers=4
+):
+    """Contact sheet of representation, built once in the media process pool.
+
+    Cached sheets are keyed by representation and layout, so other
+    representations of a version or changed settings get their own sheet.
+    Arguments are passed to 'build_contact_sheet'.
+
+    Returns:
+        concurrent.futures.Future: Resolves to the path of the cached sheet,
+            already done when the sheet is cached.
+    """
+    width, height = get_proxy_size(tile_width, resolution)
+    name = f"{representation_id}_{frame_count}f_{frames}x{columns}_{width}x{height}"
+    output_path = os.path.join(get_cache_dir("contact_sheets"), f"{name}.jpg")
+    if os.path.exists(output_path):
+        future = Future()
+        future.set_result(output_path)
+        return future
+
+    return get_process_pool(max_workers).submit(
+        _build_cached_contact_sheet,
+        path,
+        frame_count,
+        output_path,
+        frames=frames,
+        columns=columns,
+        tile_width=tile_width,
+        resolution=resolution
+    )
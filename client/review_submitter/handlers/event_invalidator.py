@@ -0,0 +1,271 @@
+"""Invalidate shared caches from the AYON event stream of a project."""
+import fnmatch
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+from .cache_helper import DEFAULT_TTL, ENTITY_CACHE, SETTINGS_CACHE
+
+ADDON_NAME = "review_submitter"
+# Topics that make cached entries stale
+TOPICS = [
+    "entity.task.*",
+    "entity.folder.*",
+    "settings.changed",
+]
+EVENT_FIELDS = {"id", "topic", "project", "summary", "createdAt"}
+# Events are fetched with this overlap so events committed late are not missed
+CURSOR_OVERLAP = timedelta(seconds=5)
+SEEN_LIMIT = 5000
+# Cursor of a project without any matching event
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _utc_now():
+    return datetime.now(timezone.utc)
+
+
+def _parse_timestamp(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+class AyonEventSource:
+    """Events of project read from the AYON server"""
+
+    def get_events(self, project_name, newer_than, topics):
+        import ayon_api
+
+        return list(ayon_api.get_events(
+            topics=topics,
+            project_names=[project_name],
+            newer_than=newer_than,
+            fields=EVENT_FIELDS
+        ))
+
+    def get_latest_event(self, project_name, topics):
+        """Newest event of project, None if there is none"""
+        import ayon_api
+
+        # Descending order with a limit queries the 'last' events
+        events = list(ayon_api.get_events(
+            topics=topics,
+            project_names=[project_name],
+            fields=EVENT_FIELDS,
+            limit=1,
+            order=ayon_api.SortOrder.descending
+        ))
+        return events[0] if events else None
+
+
+class LocalEventSource:
+    """In-memory event source for tests and local runs.
+
+    Example:
+        source = LocalEventSource()
+        EventInvalidator.start("demo", source=source, interval=0.1)
+        source.emit("entity.task.data_changed", "demo", {"entityId": task_id})
+    """
+
+    def __init__(self, clock_offset=None):
+        """
+        Args:
+            clock_offset (Optional[timedelta]): Difference of the source
+                clock to the local clock, e.g. of a server clock running
+                behind.
+        """
+        self._events = []
+        self._lock = threading.Lock()
+        self._clock_offset = clock_offset or timedelta()
+
+    def emit(self, topic, project_name=None, summary=None):
+        event = {
+            "id": uuid.uuid4().hex,
+            "topic": topic,
+            "project": project_name,
+            "summary": summary or {},
+            "createdAt": (_utc_now() + self._clock_offset).isoformat()
+        }
+        with self._lock:
+            self._events.append(event)
+        return event
+
+    def _matching(self, project_name, topics):
+        with self._lock:
+            events = list(self._events)
+        return [
+            event for event in events
+            if event["project"] in (project_name, None)
+            and any(fnmatch.fnmatchcase(event["topic"], topic) for topic in topics)
+        ]
+
+    def get_events(self, project_name, newer_than, topics):
+        return [
+            event for event in self._matching(project_name, topics)
+            if _parse_timestamp(event["createdAt"]) > _parse_timestamp(newer_than)
+        ]
+
+    def get_latest_event(self, project_name, topics):
+        events = self._matching(project_name, topics)
+        if not events:
+            return None
+        return max(events, key=lambda event: _parse_timestamp(event["createdAt"]))
+
+
+class EventInvalidator:
+    """Poll the project event stream and invalidate affected cache entries.
+
+    While polling works the shared caches use a long time to live, entries
+    are dropped as soon as an event says they changed:
+
+    - task changes drop the cached tasks of its folder and its last
+      submissions, so the submission cache skips its 'updatedAt' check
+    - folder changes drop the cached folders and tasks of the project
+    - settings changes of the addon drop the cached project settings
+
+    When the event source fails the caches go back to their default time
+    to live until polling succeeds again.
+
+    The cursor is seeded from the creation time of the newest event on the
+    server, so a local clock ahead of the server clock never skips events.
+    """
+
+    interval = 5.0
+    long_ttl = 3600
+
+    _source = None
+    _project_name = None
+    _thread = None
+    _stop = None
+    _cursor = None
+    _seen = OrderedDict()
+    _healthy = False
+
+    @classmethod
+    def start(cls, project_name, source=None, interval=None, long_ttl=None):
+        """Start polling events of project on a daemon thread"""
+        cls.stop()
+        cls._source = source or AyonEventSource()
+        cls._project_name = project_name
+        cls.interval = interval or cls.interval
+        cls.long_ttl = long_ttl or cls.long_ttl
+        # Seeded by the first poll on the polling thread
+        cls._cursor = None
+        cls._seen.clear()
+        cls._stop = threading.Event()
+        cls._thread = threading.Thread(
+            target=cls._run, args=(cls._stop,), name="ReviewSubmitterEvents", daemon=True)
+        cls._thread.start()
+        return cls._thread
+
+    @classmethod
+    def stop(cls):
+        if cls._stop is not None:
+            cls._stop.set()
+        cls._thread = None
+        cls._set_healthy(False)
+
+    @classmethod
+    def _run(cls, stop):
+        while not stop.is_set():
+            cls.poll()
+            stop.wait(cls.interval)
+
+    @classmethod
+    def poll(cls):
+        """Fetch new events once and handle them.
+
+        Returns:
+            int: Number of handled events.
+        """
+        try:
+            if cls._cursor is None:
+                cls._cursor = cls._seed_cursor()
+            events = cls._source.get_events(
+                cls._project_name,
+                (cls._cursor - CURSOR_OVERLAP).isoformat(),
+                TOPICS
+            )
+        except Exception as e:
+            if cls._healthy:
+                print(f"[EVENTS] Polling failed, using short cache TTLs: {e}")
+            cls._set_healthy(False)
+            return 0
+
+        handled = 0
+        for event in sorted(events, key=lambda item: item["createdAt"]):
+            if event["id"] in cls._seen:
+                continue
+            cls._seen[event["id"]] = True
+            if len(cls._seen) > SEEN_LIMIT:
+                cls._seen.popitem(last=False)
+            cls._cursor = max(cls._cursor, _parse_timestamp(event["createdAt"]))
+            try:
+                cls.handle_event(event)
+                handled += 1
+            except Exception as e:
+                print(f"[EVENTS] Could not handle {event['topic']}: {e}")
+
+        # Caches are trusted for long only after the first successful poll
+        cls._set_healthy(True)
+        return handled
+
+    @classmethod
+    def _seed_cursor(cls):
+        """Creation time of the newest event of project in server time"""
+        event = cls._source.get_latest_event(cls._project_name, TOPICS)
+        if event is None:
+            return EPOCH
+        return _parse_timestamp(event["createdAt"])
+
+    @classmethod
+    def _set_healthy(cls, healthy):
+        from .submission_cache import VERIFY_TTL, SubmissionCache
+
+        if healthy == cls._healthy:
+            return
+        if not healthy:
+            # Changes may have been missed while the stream was down
+            SETTINGS_CACHE.clear()
+            ENTITY_CACHE.clear()
+            SubmissionCache._verified.clear()
+        cls._healthy = healthy
+        SETTINGS_CACHE.ttl = cls.long_ttl if healthy else DEFAULT_TTL
+        ENTITY_CACHE.ttl = cls.long_ttl if healthy else DEFAULT_TTL
+        SubmissionCache._verified.ttl = cls.long_ttl if healthy else VERIFY_TTL
+
+    @classmethod
+    def handle_event(cls, event):
+        """Invalidate cache entries made stale by event"""
+        from .submission_cache import SubmissionCache
+
+        topic = event["topic"]
+        project_name = event.get("project") or cls._project_name
+        summary = event.get("summary") or {}
+
+        if topic == "settings.changed":
+            if summary.get("addon_name") not in (None, ADDON_NAME):
+                return
+            if event.get("project"):
+                SETTINGS_CACHE.invalidate(project_name)
+            else:
+                # Studio settings apply to every project
+                SETTINGS_CACHE.clear()
+            return
+
+        if topic.startswith("entity.task."):
+            task_id = summary.get("entityId")
+            folder_id = summary.get("parentId")
+            if task_id:
+                SubmissionCache.invalidate(project_name, task_id)
+            if folder_id:
+                ENTITY_CACHE.invalidate(("tasks", project_name, folder_id))
+            else:
+                ENTITY_CACHE.invalidate_where(
+                    lambda key: key[0] == "tasks" and key[1] == project_name)
+            return
+
+        if topic.startswith("entity.folder."):
+            # Folder paths are cache keys, renames and moves change them
+            ENTITY_CACHE.invalidate_where(
+                lambda key: key[0] in ("folder", "tasks") and key[1] == project_name)
@@ -0,0 +1,181 @@
+"""Perceptual fingerprints of representations to spot identical resubmissions."""
+import json
+import os
+import threading
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from ayon_core.pipeline.load import get_representation_path
+
+from .cache_helper import get_cache_dir
+from .media_helper import decode_frames, get_process_pool
+from .memory_budget import get_frame_count
+
+# Frames sampled across the range of a representation
+FINGERPRINT_SAMPLES = 8
+# Difference hash of HASH_SIZE x HASH_SIZE bits per frame
+HASH_SIZE = 8
+# Maximum differing bits per frame hash to still count as identical
+MAX_HASH_DISTANCE = 2
+
+
+def _hash_frames(path, frame_indices):
+    """Difference hashes of frames as hex strings, in ascending frame order.
+
+    Runs in a worker process, all frames are decoded in one pass.
+    """
+    frames = decode_frames(path, HASH_SIZE + 1, HASH_SIZE, frame_indices=frame_indices)
+    hashes = []
+    for frame in frames:
+        gray = frame.mean(axis=2)
+        bits = (gray[:, 1:] > gray[:, :-1]).flatten()
+        hashes.append(np.packbits(bits).tobytes().hex())
+    return hashes
+
+
+def _hash_distance(hash_a, hash_b):
+    return bin(int(hash_a, 16) ^ int(hash_b, 16)).count("1")
+
+
+class FingerprintStore:
+    """On-disk store of representation fingerprints keyed by id.
+
+    A fingerprint is a list of perceptual hashes of frames sampled across
+    the representation range. Hashes are computed in the shared process
+    pool, once per representation, so later comparisons only read the
+    store and never decode media.
+    """
+
+    _memory = {}
+    _computing = set()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _path(representation_id):
+        return os.path.join(get_cache_dir("fingerprints"), f"{representation_id}.json")
+
+    @classmethod
+    def get(cls, representation_id):
+        """Cached fingerprint of representation or None"""
+        if not representation_id:
+            return None
+        fingerprint = cls._memory.get(representation_id)
+        if fingerprint is None:
+            path = cls._path(representation_id)
+            if not os.path.exists(path):
+                return None
+            with open(path, "r") as stream:
+                fingerprint = json.load(stream)
+            cls._memory[representation_id] = fingerprint
+        return fingerprint
+
+    @classmethod
+    def compute_async(cls, context, max_workers=4):
+        """Compute fingerprint of representation in background if missing"""
+        representation_id = context["representation"]["id"]
+        if np is None or cls.get(representation_id) is not None:
+            return
+        with cls._lock:
+            if representation_id in cls._computing:
+                return
+            cls._computing.add(representation_id)
+
+        path = get_representation_path(context["representation"])
+        frame_count = get_frame_count(context)
+        samples = min(FINGERPRINT_SAMPLES, frame_count)
+        indices = sorted({int(i * frame_count / samples) for i in range(samples)})
+
+        future = get_process_pool(max_workers).submit(_hash_frames, path, indices)
+
+        def _store(_future):
+            with cls._lock:
+                cls._computing.discard(representation_id)
+            try:
+                fingerprint = {
+                    "version_id": context["version"]["id"],
+                    "frame_count": frame_count,
+                    "hashes": future.result()
+                }
+            except Exception as e:
+                print(f"Fingerprint of {representation_id} failed: {e}")
+                return
+            with open(cls._path(representation_id), "w") as stream:
+                json.dump(fingerprint, stream)
+            cls._memory[representation_id] = fingerprint
+
+        future.add_done_callback(_store)
+
+    @classmethod
+    def is_identical(cls, representation_id_a, representation_id_b):
+        """Whether both representations have matching cached fingerprints.
+
+        Returns:
+            bool or None: None when a fingerprint is not available yet.
+        """
+        fingerprint_a = cls.get(representation_id_a)
+        fingerprint_b = cls.get(representation_id_b)
+        if fingerprint_a is None or fingerprint_b is None:
+            return None
+        if fingerprint_a["frame_count"] != fingerprint_b["frame_count"]:
+            return False
+        return all(
+            _hash_distance(hash_a, hash_b) <= MAX_HASH_DISTANCE
+            for hash_a, hash_b in zip(fingerprint_a["hashes"], fingerprint_b["hashes"])
+        )
+
+    @classmethod
+    def check_resubmission(cls, contexts):
+        """Current representations identical to last submission.
+
+        Missing fingerprints are scheduled so the next check is instant.
+
+        Returns:
+            list[dict]: Contexts of current version without pixel changes.
+        """
+        previous = {
+            (c["product"]["id"], c["representation"]["name"]): c
+            for c in contexts
+            if c.get("review_generation", 0) == 1
+        }
+        unchanged = []
+        for ctx in contexts:
+            if ctx.get("review_generation", 0) != 0:
+                continue
+            prev_ctx = previous.get((ctx["product"]["id"], ctx["representation"]["name"]))
+            if prev_ctx is None:
+                continue
+
+            identical = cls.is_identical(ctx["representation"]["id"], prev_ctx["representation"]["id"])
+            if identical is None:
+                cls.compute_async(ctx)
+                cls.compute_async(prev_ctx)
+            elif identical:
+                unchanged.append(ctx)
+        return unchanged
+
+    @classmethod
+    def find_unchanged_products(cls, loaded_products, last_products):
+        """Loaded products whose media matches their last submitted version.
+
+        Uses cached fingerprints only, media is never decoded here.
+
+        Args:
+            loaded_products (dict): Loaded product data by product id.
+            last_products (dict): Product data of the last submission.
+
+        Returns:
+            list[str]: Ids of unchanged products.
+        """
+        unchanged = []
+        for product_id, product_data in loaded_products.items():
+            last_data = last_products.get(product_id)
+            if not last_data or last_data["version_id"] == product_data["version_id"]:
+                continue
+            if cls.is_identical(
+                product_data.get("representation_id"), last_data.get("representation_id")
+            ):
+                unchanged.append(product_id)
+        return unchanged
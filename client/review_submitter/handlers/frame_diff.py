@@ -0,0 +1,197 @@
+"""Changed-frame index between compared versions."""
+import json
+import os
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import rv.commands
+except ImportError:
+    rv = None
+
+from ayon_core.pipeline.load import get_representation_path
+
+from .cache_helper import get_cache_dir
+from .media_helper import get_process_pool, get_proxy_size, iter_frame_chunks
+from .memory_budget import get_frame_count
+
+# Frames held in memory and compared at once
+CHUNK_SIZE = 48
+CHANGED_FRAMES_PROPERTY = "ayon.changed_frames"
+
+
+def _diff_frames(path_a, path_b, width, height, frame_count):
+    """Mean absolute difference (0-1) of each frame of both files.
+
+    Runs in a worker process. Each file is decoded once and compared
+    chunk by chunk, so memory stays bounded by 'CHUNK_SIZE' frames.
+    """
+    diffs = []
+    chunks_a = iter_frame_chunks(path_a, width, height, CHUNK_SIZE, frame_count)
+    chunks_b = iter_frame_chunks(path_b, width, height, CHUNK_SIZE, frame_count)
+    try:
+        for frames_a, frames_b in zip(chunks_a, chunks_b):
+            count = min(len(frames_a), len(frames_b))
+            diff = np.abs(frames_a[:count].astype(np.int16) - frames_b[:count].astype(np.int16))
+            diffs.extend((diff.mean(axis=(1, 2, 3)) / 255.0).tolist())
+            if count < CHUNK_SIZE:
+                break
+    finally:
+        # Stops the decoder of the longer file
+        chunks_a.close()
+        chunks_b.close()
+    return diffs
+
+
+class ChangedFrameIndex:
+    """Publish frames that changed between compared versions as RV marks.
+
+    Downsampled proxies of both versions are decoded once and compared
+    chunk by chunk in the shared process pool. Per-frame differences are
+    cached on disk per representation pair, so each pair is analyzed only
+    once. Changed frames are stored on the stack node and marked whenever
+    the stack is viewed.
+    """
+
+    poll_interval = 200
+
+    _pending = []
+    _timer = None
+    _marked_frames = []
+    _bound = False
+
+    @staticmethod
+    def _cache_path(repre_id_a, repre_id_b, width):
+        return os.path.join(
+            get_cache_dir("changed_frames"), f"{repre_id_a}_{repre_id_b}_{width}.json")
+
+    @classmethod
+    def schedule_for_stack(cls, stack_node, contexts, stack_settings):
+        """Start analysis of current against previous version in stack"""
+        if np is None:
+            print("NumPy not available, skipping changed-frame analysis")
+            return
+
+        current = next((c for c in contexts if c.get("review_generation", 0) == 0), None)
+        if current is None:
+            return
+        previous = next(
+            (c for c in contexts
+             if c.get("review_generation", 0) == 1
+             and c["product"]["id"] == current["product"]["id"]),
+            None
+        )
+        if previous is None:
+            return
+
+        cls._bind_events()
+        width = stack_settings.get("analysis_proxy_width", 256)
+        threshold = stack_settings.get("changed_frame_threshold", 0.02)
+        cache_path = cls._cache_path(
+            current["representation"]["id"], previous["representation"]["id"], width)
+        if os.path.exists(cache_path):
+            with open(cache_path, "r") as stream:
+                cls._apply(stack_node, json.load(stream), threshold)
+            return
+
+        attrib = current["version"].get("attrib") or {}
+        resolution = None
+        if attrib.get("resolutionWidth") and attrib.get("resolutionHeight"):
+            resolution = (attrib["resolutionWidth"], attrib["resolutionHeight"])
+        width, height = get_proxy_size(width, resolution)
+
+        path_a = get_representation_path(current["representation"])
+        path_b = get_representation_path(previous["representation"])
+        frame_count = min(get_frame_count(current), get_frame_count(previous))
+
+        pool = get_process_pool(stack_settings.get("analysis_workers", 4))
+        futures = [
+            pool.submit(_diff_frames, path_a, path_b, width, height, frame_count)
+        ]
+        cls._pending.append({
+            "stack_node": stack_node,
+            "futures": futures,
+            "cache_path": cache_path,
+            "threshold": threshold
+        })
+        cls._start_timer()
+
+    @classmethod
+    def _start_timer(cls):
+        from qtpy import QtCore
+
+        if cls._timer is None:
+            cls._timer = QtCore.QTimer()
+            cls._timer.timeout.connect(cls._poll)
+        if not cls._timer.isActive():
+            cls._timer.start(cls.poll_interval)
+
+    @classmethod
+    def _poll(cls):
+        for item in list(cls._pending):
+            if not all(future.done() for future in item["futures"]):
+                continue
+            cls._pending.remove(item)
+
+            diffs = []
+            try:
+                for future in item["futures"]:
+                    diffs.extend(future.result())
+            except Exception as e:
+                print(f"Changed-frame analysis failed: {e}")
+                continue
+
+            with open(item["cache_path"], "w") as stream:
+                json.dump(diffs, stream)
+            cls._apply(item["stack_node"], diffs, item["threshold"])
+
+        if not cls._pending:
+            cls._timer.stop()
+
+    @classmethod
+    def _apply(cls, stack_node, diffs, threshold):
+        """Store changed frames on stack node and mark them if viewed"""
+        changed = [index + 1 for index, value in enumerate(diffs) if value >= threshold]
+        prop = f"{stack_node}.{CHANGED_FRAMES_PROPERTY}"
+        if not rv.commands.propertyExists(prop):
+            rv.commands.newProperty(prop, rv.commands.IntType, 1)
+        rv.commands.setIntProperty(prop, changed, True)
+        print(f"{len(changed)} of {len(diffs)} frames changed in {stack_node}")
+
+        if rv.commands.viewNode() == stack_node:
+            cls._mark(changed)
+
+    @classmethod
+    def _mark(cls, frames):
+        for frame in cls._marked_frames:
+            rv.commands.markFrame(frame, False)
+        for frame in frames:
+            rv.commands.markFrame(frame, True)
+        cls._marked_frames = list(frames)
+
+    @classmethod
+    def _bind_events(cls):
+        if cls._bound or rv is None:
+            return
+        rv.commands.bind(
+            "default",
+            "global",
+            "after-graph-view-change",
+            cls._on_view_change,
+            "Mark changed frames of viewed review stack"
+        )
+        cls._bound = True
+
+    @classmethod
+    def _on_view_change(cls, event):
+        try:
+            prop = f"{rv.commands.viewNode()}.{CHANGED_FRAMES_PROPERTY}"
+            frames = []
+            if rv.commands.propertyExists(prop):
+                frames = rv.commands.getIntProperty(prop)
+            cls._mark(frames)
+        finally:
+            event.reject()
@@ -0,0 +1,291 @@
+"""Prefetch media around the playhead for all inputs of the viewed stack."""
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import rv.commands
+except ImportError:
+    rv = None
+
+READ_BUFFER_SIZE = 1024 * 1024
+# Share of the RV cache used to size the window, the rest is left to RV
+CACHE_SHARE = 0.5
+# Fraction of the window placed after the playhead
+AHEAD_SHARE = 0.75
+WARMED_LIMIT = 20000
+
+# RV sequence notation, e.g. 'name.1001-1100#.exr' or 'name.1-50@@@@.dpx'
+SEQUENCE_PATTERN = re.compile(
+    r"^(?P<head>.*?)(?P<start>-?\d+)-(?P<end>-?\d+)(?P<padding>#|@+|%0?\d*d)(?P<tail>[^/\\]*)$"
+)
+
+
+def parse_media(media):
+    """Describe RV media string as image sequence or single file.
+
+    Returns:
+        dict: 'pattern', 'start' and 'end' for sequences, 'path' for files.
+    """
+    directory, name = os.path.split(media)
+    match = SEQUENCE_PATTERN.match(name)
+    if not match:
+        return {"path": media}
+    padding = match.group("padding")
+    if padding == "#":
+        width = 4
+    elif padding.startswith("@"):
+        width = len(padding)
+    else:
+        width = int(padding[1:-1] or 0)
+    pattern = f"{match.group('head')}%0{width}d{match.group('tail')}"
+    return {
+        "pattern": os.path.join(directory, pattern),
+        "start": int(match.group("start")),
+        "end": int(match.group("end"))
+    }
+
+
+def _read_range(path, offset=0, length=None):
+    """Read file range so the OS and storage caches hold it"""
+    with open(path, "rb") as stream:
+        stream.seek(offset)
+        remaining = length
+        while remaining is None or remaining > 0:
+            size = READ_BUFFER_SIZE if remaining is None else min(READ_BUFFER_SIZE, remaining)
+            buffer = stream.read(size)
+            if not buffer:
+                break
+            if remaining is not None:
+                remaining -= len(buffer)
+
+
+class FrameWarmUp:
+    """Keep a window of frames around the playhead warm for the viewed stack.
+
+    The window covers all inputs of the view node, top input first, and is
+    sized from RV's cache capacity and the decoded frame size of the inputs.
+    Media of the window is read by background threads so the first pass of
+    an A/B toggle does not wait for network storage. The window moves when
+    the playhead leaves its center or the view node changes; moving cancels
+    reads of the previous window.
+
+    Only the OS and storage caches are warmed, frames are never decoded
+    here. Decoding ahead of the playhead is left to RV's own cache, which
+    is switched to buffer mode when it is off. Every input maps the
+    playhead to its own source frame, so inputs with different frame
+    ranges are read at the frames RV will show.
+    """
+
+    max_frames = 48
+    readers = 4
+
+    _fallback_capacity = 4096 * 1024 * 1024
+
+    _executor = None
+    _generation = 0
+    _lock = threading.Lock()
+    _warmed = OrderedDict()
+    _media_info = {}
+    _window = None
+    _bound = False
+
+    @classmethod
+    def start(cls, stack_settings):
+        """Enable warm-up and warm the current view"""
+        if rv is None:
+            return
+        cls.max_frames = stack_settings.get("warm_up_max_frames", 48)
+        cls.readers = stack_settings.get("warm_up_readers", 4)
+        cls._fallback_capacity = stack_settings.get("rv_cache_budget_mb", 4096) * 1024 * 1024
+        if rv.commands.cacheMode() == rv.commands.CacheOff:
+            # Let RV keep decoded frames around the playhead
+            rv.commands.setCacheMode(rv.commands.CacheBuffer)
+        cls._bind_events()
+        cls.update(force=True)
+
+    @staticmethod
+    def _get_view_sources(view_node):
+        """File sources of view node in input priority order"""
+        if rv.commands.nodeType(view_node) == "RVSourceGroup":
+            groups = [view_node]
+        else:
+            groups = rv.commands.nodeInputs(view_node)
+        sources = []
+        for group in groups:
+            sources.extend(
+                node for node in rv.commands.nodesInGroup(group)
+                if rv.commands.nodeType(node) == "RVFileSource"
+            )
+        return sources
+
+    @classmethod
+    def _get_media_info(cls, source):
+        media = rv.commands.sourceMedia(source)[0]
+        key = (source, media)
+        info = cls._media_info.get(key)
+        if info is None:
+            media_info = rv.commands.sourceMediaInfo(source, media)
+            info = parse_media(media)
+            info["frame_bytes"] = max(1, (
+                media_info.get("width", 1920)
+                * media_info.get("height", 1080)
+                * media_info.get("channels", 4)
+                * max(8, media_info.get("bitsPerChannel", 8)) // 8
+            ))
+            info.setdefault("start", media_info.get("startFrame", 1))
+            info.setdefault("end", media_info.get("endFrame", info["start"]))
+            if "path" in info:
+                info["file_size"] = os.path.getsize(info["path"])
+            cls._media_info[key] = info
+        return info
+
+    @classmethod
+    def _get_window_size(cls, infos):
+        try:
+            capacity = rv.commands.cacheInfo()[0]
+        except Exception:
+            capacity = 0
+        capacity = capacity or cls._fallback_capacity
+        frame_bytes = sum(info["frame_bytes"] for info in infos)
+        return max(1, min(cls.max_frames, int(capacity * CACHE_SHARE // frame_bytes)))
+
+    @staticmethod
+    def _get_frame_order(frame, size):
+        """Playhead first, then alternating with preference to frames ahead"""
+        ahead = max(1, int(round(size * AHEAD_SHARE)))
+        behind = size - ahead
+        order = [frame]
+        for offset in range(1, ahead):
+            order.append(frame + offset)
+            if offset <= behind:
+                order.append(frame - offset)
+        return order
+
+    @staticmethod
+    def _get_source_offset(source, frame):
+        """Offset between source frames of input and global frames"""
+        try:
+            return rv.commands.sourceFrame(frame, source) - frame
+        except Exception:
+            return 0
+
+    @classmethod
+    def _get_reads(cls, inputs, frames):
+        """File reads of window, frame by frame, top input first.
+
+        Args:
+            inputs (list[tuple[dict, int]]): Media info and source frame
+                offset of every input.
+            frames (list[int]): Global frames of the window.
+        """
+        reads = []
+        for frame in frames:
+            for info, offset in inputs:
+                source_frame = frame + offset
+                if not info["start"] <= source_frame <= info["end"]:
+                    continue
+                if "pattern" in info:
+                    reads.append((info["pattern"] % source_frame, 0, None))
+                    continue
+                # Movie: read the byte range proportional to the frame
+                frame_count = info["end"] - info["start"] + 1
+                length = info["file_size"] // frame_count
+                reads.append((info["path"], (source_frame - info["start"]) * length, length))
+        return reads
+
+    @classmethod
+    def update(cls, force=False):
+        """Plan window around playhead of current view node"""
+        view_node = rv.commands.viewNode()
+        frame = rv.commands.frame()
+        if not view_node:
+            return
+
+        window = cls._window
+        if not force and window and window["view_node"] == view_node:
+            # Keep the window while the playhead stays in its center
+            if abs(frame - window["frame"]) <= window["size"] // 4:
+                return
+
+        inputs = []
+        for source in cls._get_view_sources(view_node):
+            try:
+                inputs.append((cls._get_media_info(source), cls._get_source_offset(source, frame)))
+            except Exception as e:
+                print(f"Warm-up skips {source}: {e}")
+        if not inputs:
+            return
+
+        size = cls._get_window_size([info for info, _offset in inputs])
+        frames = cls._get_frame_order(frame, size)
+
+        cls._window = {"view_node": view_node, "frame": frame, "size": size}
+        cls._schedule(cls._get_reads(inputs, frames))
+
+    @classmethod
+    def _schedule(cls, reads):
+        with cls._lock:
+            cls._generation += 1
+            generation = cls._generation
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(
+                    max_workers=cls.readers, thread_name_prefix="FrameWarmUp")
+        for read in reads:
+            if read in cls._warmed:
+                continue
+            cls._executor.submit(cls._warm, generation, read)
+
+    @classmethod
+    def _warm(cls, generation, read):
+        # Reads of a window the playhead already left are dropped
+        if generation != cls._generation or read in cls._warmed:
+            return
+        try:
+            _read_range(*read)
+        except OSError:
+            return
+        with cls._lock:
+            cls._warmed[read] = True
+            while len(cls._warmed) > WARMED_LIMIT:
+                cls._warmed.popitem(last=False)
+
+    @classmethod
+    def _bind_events(cls):
+        if cls._bound:
+            return
+        rv.commands.bind(
+            "default",
+            "global",
+            "frame-changed",
+            cls._on_frame_changed,
+            "Move review stack warm-up window with the playhead"
+        )
+        rv.commands.bind(
+            "default",
+            "global",
+            "after-graph-view-change",
+            cls._on_view_change,
+            "Warm up frames of viewed review stack"
+        )
+        cls._bound = True
+
+    @classmethod
+    def _on_frame_changed(cls, event):
+        try:
+            cls.update()
+        except Exception as e:
+            print(f"Frame warm-up failed: {e}")
+        finally:
+            event.reject()
+
+    @classmethod
+    def _on_view_change(cls, event):
+        try:
+            cls.update(force=True)
+        except Exception as e:
+            print(f"Frame warm-up failed: {e}")
+        finally:
+            event.reject()
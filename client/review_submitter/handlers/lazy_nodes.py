@@ -0,0 +1,114 @@
+"""Registry of RV nodes whose inputs are loaded on first view."""
+from collections import OrderedDict, defaultdict
+
+try:
+    import rv.commands
+except ImportError:
+    rv = None
+
+
+class LazyNodeRegistry:
+    """Load RV node inputs when the node becomes the view node.
+
+    Each registered node has a load callback and an optional release
+    callback. Nodes sharing a group also share a budget: once more nodes of
+    the group are loaded than the budget allows, the least recently viewed
+    releasable node is released again.
+    """
+
+    _entries = {}
+    _budgets = {}
+    _loaded = defaultdict(OrderedDict)
+    _bound = False
+    _busy = False
+
+    @classmethod
+    def register(cls, node, load_callback, release_callback=None, group=None):
+        """Register node to be loaded lazily"""
+        cls._entries[node] = {
+            "load": load_callback,
+            "release": release_callback,
+            "group": group or node,
+            "loaded": False
+        }
+        cls._bind_events()
+
+    @classmethod
+    def set_budget(cls, group, max_loaded):
+        """Set how many nodes of group may stay loaded at once"""
+        cls._budgets[group] = max(1, int(max_loaded))
+
+    @classmethod
+    def is_registered(cls, node):
+        return node in cls._entries
+
+    @classmethod
+    def ensure_loaded(cls, node):
+        """Load node inputs if not loaded yet and enforce group budget"""
+        entry = cls._entries.get(node)
+        if entry is None or cls._busy:
+            return False
+
+        cls._busy = True
+        try:
+            group = entry["group"]
+            if not entry["loaded"]:
+                entry["load"]()
+                entry["loaded"] = True
+            cls._loaded[group][node] = True
+            cls._loaded[group].move_to_end(node)
+            cls._release_over_budget(group, keep=node)
+        except Exception as e:
+            print(f"Error loading lazy node {node}: {e}")
+            return False
+        finally:
+            cls._busy = False
+        return True
+
+    @classmethod
+    def forget(cls, node):
+        """Stop tracking node (e.g. when it was deleted)"""
+        entry = cls._entries.pop(node, None)
+        if entry:
+            cls._loaded[entry["group"]].pop(node, None)
+
+    @classmethod
+    def _release_over_budget(cls, group, keep):
+        budget = cls._budgets.get(group)
+        if budget is None:
+            return
+
+        loaded = cls._loaded[group]
+        for node in list(loaded):
+            if len(loaded) <= budget:
+                break
+            entry = cls._entries.get(node)
+            if node == keep or not entry or not entry["release"]:
+                continue
+            try:
+                entry["release"]()
+            except Exception as e:
+                print(f"Error releasing lazy node {node}: {e}")
+                continue
+            entry["loaded"] = False
+            loaded.pop(node, None)
+
+    @classmethod
+    def _bind_events(cls):
+        if cls._bound or rv is None:
+            return
+        rv.commands.bind(
+            "default",
+            "global",
+            "after-graph-view-change",
+            cls._on_view_change,
+            "Load lazily registered review nodes"
+        )
+        cls._bound = True
+
+    @classmethod
+    def _on_view_change(cls, event):
+        try:
+            cls.ensure_loaded(rv.commands.viewNode())
+        finally:
+            event.reject()
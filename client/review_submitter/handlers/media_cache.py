@@ -0,0 +1,288 @@
+"""Local mirror of stacked media with size-bounded LRU eviction."""
+import hashlib
+import json
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+
+try:
+    import rv.commands
+except ImportError:
+    rv = None
+
+from ayon_core.pipeline.load import get_representation_path
+
+from .cache_helper import get_cache_dir
+from .media_helper import FRAME_NUMBER_PATTERN, get_sequence_pattern
+
+COPY_BUFFER_SIZE = 8 * 1024 * 1024
+
+
+def get_source_files(path):
+    """All files of a movie or image sequence given its first file"""
+    if get_sequence_pattern(path) is None:
+        return [path]
+    directory, filename = os.path.split(path)
+    match = FRAME_NUMBER_PATTERN.match(filename)
+    pattern = re.compile(
+        rf"^{re.escape(match.group('head'))}\d{{{len(match.group('frame'))}}}{re.escape(match.group('tail'))}$")
+    return sorted(
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if pattern.match(name)
+    )
+
+
+def _copy_with_checksum(source, destination):
+    """Copy file and return sha1 of the copied bytes"""
+    checksum = hashlib.sha1()
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        while True:
+            buffer = src.read(COPY_BUFFER_SIZE)
+            if not buffer:
+                break
+            checksum.update(buffer)
+            dst.write(buffer)
+    return checksum.hexdigest()
+
+
+def _file_checksum(path):
+    checksum = hashlib.sha1()
+    with open(path, "rb") as stream:
+        for buffer in iter(lambda: stream.read(COPY_BUFFER_SIZE), b""):
+            checksum.update(buffer)
+    return checksum.hexdigest()
+
+
+class MediaCache:
+    """Mirror representation media to a local directory.
+
+    Media is copied by a single background thread so network storage is not
+    flooded, every copied file is verified against the checksum of the
+    bytes read from the source. A representation counts as cached only once
+    its manifest is written. Manifests are touched on use and the least
+    recently used representations are evicted beyond the size budget.
+    Media attached to sources of this session is never evicted, RV may be
+    reading it.
+
+    RV keeps playing the network path until the copy is complete, then the
+    source media is switched to the local copy.
+    """
+
+    poll_interval = 1000
+
+    _queue = queue.Queue()
+    _queued = set()
+    _completed = set()
+    _attached = set()
+    _lock = threading.Lock()
+    _worker = None
+    _pending_swaps = []
+    _timer = None
+
+    root = None
+    size_limit = 100 * 1024 ** 3
+
+    @classmethod
+    def configure(cls, performance_settings):
+        cls.root = performance_settings.get("media_cache_dir") or get_cache_dir("media")
+        cls.size_limit = performance_settings.get("media_cache_size_gb", 100) * 1024 ** 3
+        os.makedirs(cls.root, exist_ok=True)
+
+    @classmethod
+    def _manifest_path(cls, representation_id):
+        return os.path.join(cls.root, f"{representation_id}.json")
+
+    @classmethod
+    def _media_dir(cls, representation_id):
+        return os.path.join(cls.root, representation_id)
+
+    @classmethod
+    def get_local_dir(cls, context):
+        """Local directory of complete and current copy, None otherwise"""
+        representation_id = context["representation"]["id"]
+        manifest_path = cls._manifest_path(representation_id)
+        if not os.path.exists(manifest_path):
+            return None
+        try:
+            with open(manifest_path, "r") as stream:
+                manifest = json.load(stream)
+            # Cheap check that the published files did not change
+            files = manifest["files"]
+            for entry in (files[0], files[-1]):
+                stat = os.stat(os.path.join(manifest["source_dir"], entry["name"]))
+                if stat.st_size != entry["size"] or int(stat.st_mtime) != entry["mtime"]:
+                    raise ValueError("Source media changed")
+        except (OSError, ValueError, KeyError, IndexError) as e:
+            print(f"Dropping cached media of {representation_id}: {e}")
+            cls._remove(representation_id)
+            return None
+
+        # Mark as recently used
+        os.utime(manifest_path, None)
+        return cls._media_dir(representation_id)
+
+    @classmethod
+    def request(cls, context):
+        """Local directory if cached, otherwise schedule copy and return None"""
+        local_dir = cls.get_local_dir(context)
+        if local_dir:
+            return local_dir
+
+        representation_id = context["representation"]["id"]
+        with cls._lock:
+            if representation_id in cls._queued:
+                return None
+            cls._queued.add(representation_id)
+            if cls._worker is None or not cls._worker.is_alive():
+                cls._worker = threading.Thread(target=cls._run, name="MediaCacheCopier", daemon=True)
+                cls._worker.start()
+        cls._queue.put((representation_id, get_representation_path(context["representation"])))
+        return None
+
+    @classmethod
+    def _run(cls):
+        while True:
+            representation_id, path = cls._queue.get()
+            try:
+                cls._copy(representation_id, path)
+                with cls._lock:
+                    cls._completed.add(representation_id)
+            except Exception as e:
+                print(f"Caching media of {representation_id} failed: {e}")
+                cls._remove(representation_id)
+            finally:
+                with cls._lock:
+                    cls._queued.discard(representation_id)
+
+    @classmethod
+    def _copy(cls, representation_id, path):
+        sources = get_source_files(path)
+        total_size = sum(os.path.getsize(source) for source in sources)
+        if total_size > cls.size_limit:
+            print(f"Media of {representation_id} exceeds the media cache size, not cached")
+            return
+        cls._evict(total_size, keep=representation_id)
+
+        media_dir = cls._media_dir(representation_id)
+        os.makedirs(media_dir, exist_ok=True)
+        start = time.monotonic()
+        files = []
+        for source in sources:
+            name = os.path.basename(source)
+            destination = os.path.join(media_dir, name)
+            stat = os.stat(source)
+            checksum = _copy_with_checksum(source, destination)
+            if _file_checksum(destination) != checksum:
+                raise IOError(f"Checksum mismatch of {destination}")
+            files.append({
+                "name": name,
+                "size": stat.st_size,
+                "mtime": int(stat.st_mtime),
+                "sha1": checksum
+            })
+
+        # Manifest marks the copy complete
+        manifest_path = cls._manifest_path(representation_id)
+        with open(f"{manifest_path}.tmp", "w") as stream:
+            json.dump({
+                "source_dir": os.path.dirname(path),
+                "size": total_size,
+                "files": files
+            }, stream)
+        os.replace(f"{manifest_path}.tmp", manifest_path)
+        print(
+            f"Cached {len(files)} files ({total_size / 1024 ** 2:.0f} MB) of "
+            f"{representation_id} in {time.monotonic() - start:.1f}s")
+
+    @classmethod
+    def _evict(cls, required_size, keep=None):
+        """Remove least recently used media until 'required_size' fits"""
+        with cls._lock:
+            protected = cls._attached | {keep}
+        entries = []
+        for name in os.listdir(cls.root):
+            if not name.endswith(".json"):
+                continue
+            manifest_path = os.path.join(cls.root, name)
+            try:
+                with open(manifest_path, "r") as stream:
+                    size = json.load(stream)["size"]
+                entries.append((os.path.getmtime(manifest_path), name[:-5], size))
+            except (OSError, ValueError, KeyError):
+                continue
+
+        used = sum(entry[2] for entry in entries)
+        for _mtime, representation_id, size in sorted(entries):
+            if used + required_size <= cls.size_limit:
+                break
+            if representation_id in protected:
+                continue
+            cls._remove(representation_id)
+            used -= size
+
+    @classmethod
+    def _remove(cls, representation_id):
+        try:
+            os.remove(cls._manifest_path(representation_id))
+        except OSError:
+            pass
+        shutil.rmtree(cls._media_dir(representation_id), ignore_errors=True)
+        with cls._lock:
+            cls._completed.discard(representation_id)
+
+    @classmethod
+    def attach(cls, source_node, context):
+        """Play local copy in 'source_node' now or once it is cached"""
+        with cls._lock:
+            cls._attached.add(context["representation"]["id"])
+        local_dir = cls.request(context)
+        if local_dir:
+            cls._swap(source_node, local_dir)
+            return
+        cls._pending_swaps.append((source_node, context))
+        cls._start_timer()
+
+    @staticmethod
+    def _swap(source_node, local_dir):
+        media = rv.commands.sourceMedia(source_node)[0]
+        local_media = os.path.join(local_dir, os.path.basename(media))
+        rv.commands.setSourceMedia(source_node, [local_media])
+        print(f"{source_node} plays local copy {local_media}")
+
+    @classmethod
+    def _start_timer(cls):
+        from qtpy import QtCore
+
+        if cls._timer is None:
+            cls._timer = QtCore.QTimer()
+            cls._timer.timeout.connect(cls._poll)
+        if not cls._timer.isActive():
+            cls._timer.start(cls.poll_interval)
+
+    @classmethod
+    def _poll(cls):
+        for item in list(cls._pending_swaps):
+            source_node, context = item
+            representation_id = context["representation"]["id"]
+            with cls._lock:
+                completed = representation_id in cls._completed
+                queued = representation_id in cls._queued
+            if not completed and queued:
+                continue
+
+            cls._pending_swaps.remove(item)
+            if not completed or not rv.commands.nodeExists(source_node):
+                continue
+            local_dir = cls.get_local_dir(context)
+            if local_dir:
+                try:
+                    cls._swap(source_node, local_dir)
+                except Exception as e:
+                    print(f"Could not switch {source_node} to local media: {e}")
+
+        if not cls._pending_swaps:
+            cls._timer.stop()
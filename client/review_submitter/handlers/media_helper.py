@@ -0,0 +1,294 @@
+"""Decode and encode downsampled review media through ffmpeg."""
+import os
+import re
+import subprocess
+import sys
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from ayon_core.lib import get_ffmpeg_tool_args
+from ayon_core.lib.transcoding import IMAGE_EXTENSIONS
+
+FRAME_NUMBER_PATTERN = re.compile(r"^(?P<head>.*?)(?P<frame>\d+)(?P<tail>\.[^.]+)$")
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("NumPy is required for media analysis")
+
+
+def get_python_executable():
+    """Python interpreter for spawned worker processes, None if not found.
+
+    Embedded hosts like OpenRV run Python inside their own binary, where
+    'sys.executable' would launch another host. The interpreter bundled
+    with the host Python is used instead, it can be set with
+    'AYON_REVIEW_SUBMITTER_PYTHON'.
+    """
+    executable = os.environ.get("AYON_REVIEW_SUBMITTER_PYTHON")
+    if executable:
+        return executable if os.path.isfile(executable) else None
+    if os.path.basename(sys.executable).lower().startswith("python"):
+        return sys.executable
+
+    if sys.platform == "win32":
+        candidates = [("", "python.exe")]
+    else:
+        major, minor = sys.version_info[:2]
+        candidates = [("bin", f"python{major}.{minor}"), ("bin", f"python{major}")]
+    for prefix in dict.fromkeys((sys.exec_prefix, sys.base_exec_prefix)):
+        for subdir, name in candidates:
+            path = os.path.join(prefix, subdir, name)
+            if os.path.isfile(path) and os.access(path, os.X_OK):
+                return path
+    return None
+
+
+def get_process_pool(max_workers=4):
+    """Shared process pool for media work.
+
+    The pool is created on first use with the 'spawn' start method so
+    workers never inherit host (RV/Qt) state. Workers run the interpreter
+    from 'get_python_executable', without one the work runs on threads of
+    the host process instead.
+    """
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            executable = get_python_executable()
+            if executable is None:
+                print("No Python interpreter for media worker processes, media work runs in-process")
+                _process_pool = ThreadPoolExecutor(
+                    max_workers=max_workers,
+                    thread_name_prefix="ReviewSubmitterMedia"
+                )
+            else:
+                mp_context = multiprocessing.get_context("spawn")
+                mp_context.set_executable(executable)
+                _process_pool = ProcessPoolExecutor(
+                    max_workers=max_workers,
+                    mp_context=mp_context
+                )
+        return _process_pool
+
+
+def get_sequence_pattern(path):
+    """Convert first frame path of image sequence to ffmpeg pattern.
+
+    Returns:
+        tuple[str, int] or None: Pattern like 'file.%04d.exr' and first frame,
+            None if path is not a numbered image file.
+    """
+    if os.path.splitext(path)[1].lower() not in IMAGE_EXTENSIONS:
+        return None
+    match = FRAME_NUMBER_PATTERN.match(os.path.basename(path))
+    if not match:
+        return None
+    frame = match.group("frame")
+    pattern = f"{match.group('head')}%0{len(frame)}d{match.group('tail')}"
+    return os.path.join(os.path.dirname(path), pattern), int(frame)
+
+
+def get_input_args(path, first_frame=0):
+    """ffmpeg input arguments for movie file or image sequence.
+
+    Image sequences start reading at zero based 'first_frame', movies
+    always start at their first frame.
+    """
+    sequence = get_sequence_pattern(path)
+    if sequence is None:
+        return ["-i", path]
+    pattern, start_number = sequence
+    return ["-start_number", str(start_number + first_frame), "-i", pattern]
+
+
+def _select_filter(frame_indices=None, first_frame=None, frame_count=None):
+    if frame_indices is not None:
+        expression = "+".join(f"eq(n\\,{index})" for index in frame_indices)
+        return f"select='{expression}'"
+    if first_frame or frame_count is not None:
+        start = first_frame or 0
+        end = start + frame_count - 1 if frame_count else 2 ** 31
+        return f"select='between(n\\,{start}\\,{end})'"
+    return None
+
+
+def _decode_args(path, width, height, frame_indices=None, first_frame=None, frame_count=None):
+    """ffmpeg arguments writing selected frames as raw RGB to stdout.
+
+    Decoding stops after the last selected frame. Image sequences seek to
+    the first selected frame by their start number, movies are decoded
+    from their start and frames before the selection are dropped.
+    """
+    output_count = frame_count
+    if frame_indices is not None:
+        frame_indices = sorted(set(frame_indices))
+        output_count = len(frame_indices)
+
+    offset = 0
+    if get_sequence_pattern(path) is not None:
+        if frame_indices is not None:
+            offset = frame_indices[0]
+            frame_indices = [index - offset for index in frame_indices]
+        elif first_frame:
+            offset, first_frame = first_frame, None
+
+    filters = [_select_filter(frame_indices, first_frame, frame_count)]
+    filters.append(f"scale={width}:{height}")
+    args = [
+        "-v", "error",
+        *get_input_args(path, offset),
+        "-vf", ",".join(f for f in filters if f),
+        "-vsync", "0",
+    ]
+    if output_count:
+        args.extend(["-frames:v", str(output_count)])
+    args.extend(["-f", "rawvideo", "-pix_fmt", "rgb24", "-"])
+    return get_ffmpeg_tool_args("ffmpeg", *args)
+
+
+def decode_frames(
+    path,
+    width,
+    height,
+    frame_indices=None,
+    first_frame=None,
+    frame_count=None
+):
+    """Decode frames scaled to 'width' x 'height' as RGB uint8 array.
+
+    Args:
+        path (str): Movie file or first file of image sequence.
+        width (int): Output width.
+        height (int): Output height.
+        frame_indices (Optional[list[int]]): Zero based frames to decode,
+            frames are returned in ascending order without duplicates.
+        first_frame (Optional[int]): Zero based first frame of a range.
+        frame_count (Optional[int]): Number of frames of a range.
+
+    Returns:
+        numpy.ndarray: Array of shape (frames, height, width, 3).
+    """
+    _require_numpy()
+    args = _decode_args(path, width, height, frame_indices, first_frame, frame_count)
+    output = subprocess.run(args, capture_output=True, check=True).stdout
+    return np.frombuffer(output, dtype=np.uint8).reshape(-1, height, width, 3)
+
+
+def iter_frame_chunks(path, width, height, chunk_size, frame_count=None):
+    """Decode file once and yield its frames in chunks.
+
+    Args:
+        path (str): Movie file or first file of image sequence.
+        width (int): Output width.
+        height (int): Output height.
+        chunk_size (int): Frames per yielded chunk, the last may be shorter.
+        frame_count (Optional[int]): Stop after this many frames.
+
+    Yields:
+        numpy.ndarray: Arrays of shape (frames, height, width, 3).
+    """
+    _require_numpy()
+    args = _decode_args(path, width, height, frame_count=frame_count)
+    frame_size = width * height * 3
+    process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        while True:
+            data = process.stdout.read(frame_size * chunk_size)
+            frames = len(data) // frame_size
+            if frames:
+                yield np.frombuffer(
+                    data[:frames * frame_size], dtype=np.uint8
+                ).reshape(frames, height, width, 3)
+            if len(data) < frame_size * chunk_size:
+                break
+        stderr = process.stderr.read()
+        if process.wait() != 0:
+            raise subprocess.CalledProcessError(process.returncode, args, stderr=stderr)
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        process.stderr.close()
+
+
+def encode_image(image, output_path, quality=3):
+    """Encode RGB uint8 array of shape (height, width, 3) to image file.
+
+    Format is picked by ffmpeg from the output extension, 'quality' is used
+    for JPEG output (2 best - 31 worst).
+    """
+    _require_numpy()
+    height, width = image.shape[:2]
+    args = get_ffmpeg_tool_args(
+        "ffmpeg",
+        "-v", "error",
+        "-y",
+        "-f", "rawvideo",
+        "-pix_fmt", "rgb24",
+        "-s", f"{width}x{height}",
+        "-i", "-",
+        "-frames:v", "1",
+        "-q:v", str(quality),
+        output_path
+    )
+    subprocess.run(args, input=np.ascontiguousarray(image).tobytes(), capture_output=True, check=True)
+    return output_path
+
+
+def convert_image(input_path, output_path, quality=3):
+    """Re-encode single image, e.g. PNG to compressed JPEG"""
+    args = get_ffmpeg_tool_args(
+        "ffmpeg",
+        "-v", "error",
+        "-y",
+        "-i", input_path,
+        "-frames:v", "1",
+        "-q:v", str(quality),
+        output_path
+    )
+    subprocess.run(args, capture_output=True, check=True)
+    return output_path
+
+
+def extract_frame(path, output_path, frame_index=0, width=None):
+    """Render one frame of movie or image sequence to image file.
+
+    Args:
+        path (str): Movie file or first file of image sequence.
+        output_path (str): Image path, format is picked from extension.
+        frame_index (int): Zero based frame to render.
+        width (Optional[int]): Scale to width keeping aspect ratio.
+    """
+    filters = [_select_filter(frame_indices=[frame_index])]
+    if width:
+        filters.append(f"scale={width}:-2")
+    args = get_ffmpeg_tool_args(
+        "ffmpeg",
+        "-v", "error",
+        "-y",
+        *get_input_args(path),
+        "-vf", ",".join(filters),
+        "-vsync", "0",
+        "-frames:v", "1",
+        output_path
+    )
+    subprocess.run(args, capture_output=True, check=True)
+    return output_path
+
+
+def get_proxy_size(width, resolution=None):
+    """Proxy size for given width keeping aspect ratio of 'resolution'"""
+    source_width, source_height = resolution or (1920, 1080)
+    height = max(2, int(round(width * source_height / source_width / 2.0)) * 2)
+    return width, height
@@ -0,0 +1,149 @@
+"""Estimate decoded memory of representations and fit stacks into a budget."""
+from collections import defaultdict
+
+from ayon_core.lib.transcoding import VIDEO_EXTENSIONS
+
+# Decoded bytes per channel, anything not listed decodes to 8 bit
+BYTES_PER_CHANNEL = {
+    ".exr": 2,
+    ".dpx": 2,
+    ".tif": 2,
+    ".tiff": 2,
+    ".hdr": 4,
+}
+DEFAULT_CHANNELS = 4
+DEFAULT_RESOLUTION = (1920, 1080)
+
+
+def _get_attrib(context, key):
+    """Read attribute from representation with fallback to version"""
+    for entity_type in ("representation", "version"):
+        entity = context.get(entity_type) or {}
+        value = (entity.get("attrib") or {}).get(key)
+        if value is not None:
+            return value
+    return None
+
+
+def get_frame_count(context):
+    """Number of frames of representation in loader context"""
+    files = context["representation"].get("files") or []
+    if len(files) > 1:
+        return len(files)
+
+    frame_start = _get_attrib(context, "frameStart")
+    frame_end = _get_attrib(context, "frameEnd")
+    if frame_start is None or frame_end is None:
+        return 1
+    handle_start = _get_attrib(context, "handleStart") or 0
+    handle_end = _get_attrib(context, "handleEnd") or 0
+    return max(1, frame_end - frame_start + 1 + handle_start + handle_end)
+
+
+def _get_channels(context):
+    repre_data = context["representation"].get("data") or {}
+    channels = repre_data.get("channels") or _get_attrib(context, "channels")
+    if isinstance(channels, (list, tuple)):
+        channels = len(channels)
+    if channels:
+        return int(channels)
+    # RV decodes to RGBA when channels are unknown
+    return DEFAULT_CHANNELS
+
+
+def estimate_representation_memory(context, ext):
+    """Estimate decoded size in bytes of all frames of a representation.
+
+    Args:
+        context (dict): Loader context with representation and version.
+        ext (str): Lowercase extension of the representation with dot.
+
+    Returns:
+        int: Estimated bytes RV needs to cache the whole representation.
+    """
+    width = _get_attrib(context, "resolutionWidth") or DEFAULT_RESOLUTION[0]
+    height = _get_attrib(context, "resolutionHeight") or DEFAULT_RESOLUTION[1]
+    if ext in VIDEO_EXTENSIONS:
+        bytes_per_channel = 1
+    else:
+        bytes_per_channel = BYTES_PER_CHANNEL.get(ext, 1)
+
+    return (
+        width * height
+        * _get_channels(context)
+        * bytes_per_channel
+        * get_frame_count(context)
+    )
+
+
+class MemoryBudgetPlanner:
+    """Pick representations so that the whole stack fits the RV cache.
+
+    Every version loaded with the stack keeps one of its representations,
+    tiers are keyed by version and representation id. Only the eager set
+    counts, older generations are loaded on first view and are kept as
+    they are. When everything fits nothing is dropped, otherwise each
+    version starts with its most expensive representation and the version
+    with the highest cost is downgraded until the selection fits.
+    """
+
+    @staticmethod
+    def apply(ext_groups, budget_mb):
+        """Filter grouped contexts to fit into budget.
+
+        Args:
+            ext_groups (dict[str, list[dict]]): Contexts grouped by extension.
+            budget_mb (int): RV cache budget in megabytes.
+
+        Returns:
+            dict[str, list[dict]]: Filtered contexts grouped by extension.
+        """
+        budget = budget_mb * 1024 * 1024
+        tiers = defaultdict(dict)
+        for ext, contexts in ext_groups.items():
+            for ctx in contexts:
+                if ctx.get("review_generation", 0) > 1:
+                    continue
+                tiers[ctx["version"]["id"]][ctx["representation"]["id"]] = (
+                    estimate_representation_memory(ctx, ext))
+        total = sum(cost for costs in tiers.values() for cost in costs.values())
+
+        if total <= budget:
+            return ext_groups
+
+        # Tiers of each version ordered from most to least expensive
+        ordered = {
+            version_id: sorted(costs.items(), key=lambda item: item[1], reverse=True)
+            for version_id, costs in tiers.items()
+        }
+        selected = {version_id: 0 for version_id in ordered}
+
+        def selection_cost():
+            return sum(ordered[vid][index][1] for vid, index in selected.items())
+
+        while selection_cost() > budget:
+            downgradable = [
+                vid for vid, index in selected.items()
+                if index + 1 < len(ordered[vid])
+            ]
+            if not downgradable:
+                print(
+                    f"Stack needs {selection_cost() // (1024 * 1024)} MB,"
+                    f" more than the {budget_mb} MB budget even with the cheapest representations")
+                break
+            heaviest = max(downgradable, key=lambda vid: ordered[vid][selected[vid]][1])
+            selected[heaviest] += 1
+
+        keep = {
+            ordered[version_id][index][0]
+            for version_id, index in selected.items()
+        }
+        filtered = defaultdict(list)
+        for ext, contexts in ext_groups.items():
+            for ctx in contexts:
+                if ctx.get("review_generation", 0) > 1 or ctx["representation"]["id"] in keep:
+                    filtered[ext].append(ctx)
+        print(
+            f"Memory budget {budget_mb} MB: loading {selection_cost() // (1024 * 1024)} MB"
+            f" instead of {total // (1024 * 1024)} MB")
+        return filtered
@@ -0,0 +1,376 @@
+"""Process-wide metrics of addon operations with a local file exporter.
+
+Metrics are exported in the Prometheus text format, e.g. for the node
+exporter textfile collector, and as JSON next to it. Every exported series
+carries the 'host' and 'pid' labels of the process, so files of concurrent
+sessions never contain the same series.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+PREFIX = "review_submitter_"
+# Hosts whose sessions export metrics, other AYON processes only collect them
+EXPORT_HOSTS = {"openrv"}
+# Latency buckets in seconds
+DEFAULT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_labels(label_names, label_values, extra=None):
+    pairs = list(zip(label_names, label_values))
+    if extra:
+        pairs.extend(extra)
+    if not pairs:
+        return ""
+    escaped = (
+        '{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in pairs
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type_name = None
+
+    def __init__(self, name, description, label_names=()):
+        self.name = PREFIX + name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def _header(self):
+        return [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} {self.type_name}"
+        ]
+
+    def samples(self):
+        with self._lock:
+            return dict(self._values)
+
+    def render(self, extra_labels=()):
+        """Lines of the Prometheus text format.
+
+        Args:
+            extra_labels (Iterable[tuple[str, str]]): Labels added to every
+                series, e.g. of the exporting process.
+        """
+        extra_labels = list(extra_labels)
+        lines = self._header()
+        for key, value in sorted(self.samples().items()):
+            labels = _format_labels(self.label_names, key, extra_labels)
+            lines.append(f"{self.name}{labels} {_format_value(value)}")
+        return lines
+
+    def to_dict(self):
+        return {
+            "type": self.type_name,
+            "description": self.description,
+            "samples": [
+                {"labels": dict(zip(self.label_names, key)), "value": value}
+                for key, value in sorted(self.samples().items())
+            ]
+        }
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    type_name = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+
+    type_name = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets"""
+
+    type_name = "histogram"
+
+    def __init__(self, name, description, label_names=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, description, label_names)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry["buckets"][index] += 1
+            entry["sum"] += value
+            entry["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe duration of the block in seconds"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self):
+        with self._lock:
+            return {
+                key: {"buckets": list(entry["buckets"]), "sum": entry["sum"], "count": entry["count"]}
+                for key, entry in self._values.items()
+            }
+
+    def render(self, extra_labels=()):
+        extra_labels = list(extra_labels)
+        lines = self._header()
+        for key, entry in sorted(self.samples().items()):
+            for bound, count in zip(self.buckets, entry["buckets"]):
+                labels = _format_labels(
+                    self.label_names, key, extra_labels + [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.label_names, key, extra_labels)
+            lines.append(f"{self.name}_sum{labels} {_format_value(entry['sum'])}")
+            lines.append(f"{self.name}_count{labels} {entry['count']}")
+        return lines
+
+    def to_dict(self):
+        data = super().to_dict()
+        for sample in data["samples"]:
+            value = sample.pop("value")
+            sample.update({
+                "buckets": dict(zip((_format_value(bound) for bound in self.buckets), value["buckets"])),
+                "sum": value["sum"],
+                "count": value["count"]
+            })
+        return data
+
+
+class MetricsRegistry:
+    """Named metrics of the process, created once and shared."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(PREFIX + name)
+            if metric is None:
+                metric = self._metrics[PREFIX + name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is already registered as {metric.type_name}")
+            return metric
+
+    def counter(self, name, description, labels=()):
+        return self._get_or_create(Counter, name, description, labels)
+
+    def gauge(self, name, description, labels=()):
+        return self._get_or_create(Gauge, name, description, labels)
+
+    def histogram(self, name, description, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(Histogram, name, description, labels, buckets)
+
+    def render_prometheus(self, extra_labels=()):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in sorted(metrics, key=lambda item: item.name):
+            lines.extend(metric.render(extra_labels))
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self):
+        with self._lock:
+            metrics = dict(self._metrics)
+        return {name: metric.to_dict() for name, metric in sorted(metrics.items())}
+
+
+REGISTRY = MetricsRegistry()
+
+BUILD_INFO = REGISTRY.gauge(
+    "build_info", "Addon version of the process, always 1", ("version",))
+API_CALLS = REGISTRY.counter(
+    "api_calls_total", "AYON server requests by operation and result", ("operation", "result"))
+API_CALL_DURATION = REGISTRY.histogram(
+    "api_call_duration_seconds", "Latency of AYON server requests", ("operation",))
+CACHE_REQUESTS = REGISTRY.counter(
+    "cache_requests_total", "Lookups of the shared in-memory caches", ("cache", "result"))
+SETTINGS_FETCHES = REGISTRY.counter(
+    "settings_fetches_total", "Addon settings fetched from the server", ("result",))
+SETTINGS_FETCH_DURATION = REGISTRY.histogram(
+    "settings_fetch_duration_seconds", "Latency of addon settings fetches")
+UPLOAD_BYTES = REGISTRY.counter(
+    "upload_bytes_total", "Bytes uploaded to the server", ("kind",))
+UPLOAD_RETRIES = REGISTRY.counter(
+    "upload_retries_total", "Chunks sent again after a failed chunked upload request")
+SUBMISSIONS = REGISTRY.counter(
+    "submissions_total", "Review submissions by source and result", ("source", "result"))
+SUBMISSION_DURATION = REGISTRY.histogram(
+    "submission_duration_seconds", "Duration of review submissions", ("source",))
+STACK_BUILDS = REGISTRY.counter(
+    "stack_builds_total", "RV stacks and playlists created", ("kind", "result"))
+STACK_BUILD_DURATION = REGISTRY.histogram(
+    "stack_build_duration_seconds", "Duration of RV stack and playlist creation", ("kind",))
+LOADED_REPRESENTATIONS = REGISTRY.counter(
+    "loaded_representations_total", "Representations loaded into RV by media origin", ("origin",))
+PUBLISH_PROMPTS = REGISTRY.counter(
+    "publish_prompts_total", "Review prompts after publish by action", ("action",))
+
+
+@contextmanager
+def track_operation(counter, histogram, **labels):
+    """Count result and time the block, errors are counted and re-raised.
+
+    'counter' needs the labels of 'histogram' plus 'result'.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        counter.inc(result="error", **labels)
+        raise
+    else:
+        counter.inc(result="ok", **labels)
+    finally:
+        histogram.observe(time.perf_counter() - start, **labels)
+
+
+def track_api_call(operation):
+    """Count and time an AYON request"""
+    return track_operation(API_CALLS, API_CALL_DURATION, operation=operation)
+
+
+class MetricsExporter:
+    """Flush the registry to local files periodically and on exit.
+
+    Writes '<name>.prom' in the Prometheus text format and '<name>.json'.
+    Files are replaced atomically so a scraper never reads a partial file.
+    Names contain host and process id so concurrent sessions never share a
+    file, every series is labeled with both so the files never repeat a
+    series. Files are removed when the process exits.
+    """
+
+    interval = 30.0
+
+    _thread = None
+    _stop = None
+    _paths = None
+    _labels = ()
+    _registered = False
+
+    @classmethod
+    def start(cls, export_dir=None, interval=None, host_name=None):
+        """Start flushing on a daemon thread.
+
+        Args:
+            export_dir (Optional[str]): Target directory, the addon cache
+                'metrics' directory by default.
+            interval (Optional[float]): Seconds between flushes.
+            host_name (Optional[str]): Host of the process, used in the file
+                name next to the process id.
+        """
+        from .cache_helper import get_cache_dir
+        from ..version import __version__
+
+        if cls._thread is not None:
+            return cls._thread
+
+        host_name = host_name or os.environ.get("AYON_HOST_NAME") or "unknown"
+        export_dir = export_dir or get_cache_dir("metrics")
+        os.makedirs(export_dir, exist_ok=True)
+        pid = os.getpid()
+        base_path = os.path.join(export_dir, f"review_submitter_{host_name}_{pid}")
+        cls._paths = (f"{base_path}.prom", f"{base_path}.json")
+        cls._labels = (("host", host_name), ("pid", str(pid)))
+        cls.interval = interval or cls.interval
+        BUILD_INFO.set(1, version=__version__)
+
+        if not cls._registered:
+            atexit.register(cls._remove_files)
+            cls._registered = True
+        cls._stop = threading.Event()
+        cls._thread = threading.Thread(
+            target=cls._run, args=(cls._stop,), name="ReviewSubmitterMetrics", daemon=True)
+        cls._thread.start()
+        return cls._thread
+
+    @classmethod
+    def stop(cls):
+        if cls._stop is not None:
+            cls._stop.set()
+        cls._thread = None
+        cls.flush()
+
+    @classmethod
+    def _run(cls, stop):
+        while not stop.wait(cls.interval):
+            cls.flush()
+
+    @classmethod
+    def _remove_files(cls):
+        """Remove files of the exiting process so no stale series are scraped"""
+        if cls._stop is not None:
+            cls._stop.set()
+        paths, cls._paths = cls._paths, None
+        for path in paths or ():
+            for filepath in (path, f"{path}.tmp"):
+                try:
+                    os.remove(filepath)
+                except OSError:
+                    pass
+
+    @staticmethod
+    def _write(path, content):
+        with open(f"{path}.tmp", "w") as stream:
+            stream.write(content)
+        os.replace(f"{path}.tmp", path)
+
+    @classmethod
+    def flush(cls):
+        """Write current values, no-op if the exporter was not started"""
+        if not cls._paths:
+            return
+        prom_path, json_path = cls._paths
+        try:
+            cls._write(prom_path, REGISTRY.render_prometheus(cls._labels))
+            cls._write(json_path, json.dumps({
+                "timestamp": time.time(),
+                "labels": dict(cls._labels),
+                "metrics": REGISTRY.to_dict()
+            }, indent=2))
+        except OSError as e:
+            print(f"[METRICS] Could not write metrics: {e}")
@@ -1,7 +1,29 @@
 import os
 from collections import defaultdict
+from functools import partial
 from pathlib import Path
-from .settings_helper import get_product_filters
+from .settings_helper import (
+    get_product_filters,
+    get_stack_settings,
+    get_submission_settings,
+    get_performance_settings
+)
+from .lazy_nodes import LazyNodeRegistry
+from .memory_budget import MemoryBudgetPlanner
+from .frame_diff import ChangedFrameIndex
+from .fingerprint import FingerprintStore
+from .submission_cache import SubmissionCache
+from .media_cache import MediaCache
+from .proxy_helper import ProxyManager
+from .frame_warmup import FrameWarmUp
+from .graph_batch import GraphEditBatch
+from .metrics import (
+    LOADED_REPRESENTATIONS,
+    STACK_BUILDS,
+    STACK_BUILD_DURATION,
+    track_api_call,
+    track_operation
+)
 
 try:
     import rv.commands
@@ -16,10 +38,16 @@ except ImportError:
     MovLoader = None
 
 import ayon_api
-from ayon_api import get_task_by_id
 from ayon_core.pipeline.load import get_representation_path
 from ayon_core.lib.transcoding import VIDEO_EXTENSIONS, IMAGE_EXTENSIONS
 
+from ..constants import (
+    LOADER_REPRESENTATION_FIELDS,
+    LOADER_VERSION_FIELDS,
+    VERSION_SUMMARY_FIELDS,
+    PRODUCT_SUMMARY_FIELDS
+)
+
 
 class OpenRVStackHandler:
     """Handler for creating AUTO stack in OpenRV"""
@@ -31,19 +59,43 @@ class OpenRVStackHandler:
             print("RV module not available")
             return False
 
-        ext_groups = defaultdict(list)
+        with track_operation(STACK_BUILDS, STACK_BUILD_DURATION, kind="auto_stack"):
+            ext_groups = defaultdict(list)
+
+            for ctx in contexts:
+                OpenRVStackHandler._fetch_and_group_representations(ctx, ext_groups)
 
-        for ctx in contexts:
-            OpenRVStackHandler._fetch_and_group_representations(ctx, ext_groups)
+            stack_settings = get_stack_settings()
+            if stack_settings.get("memory_budget_enabled", False):
+                ext_groups = MemoryBudgetPlanner.apply(
+                    ext_groups, stack_settings.get("rv_cache_budget_mb", 4096))
 
-        stack_nodes = OpenRVStackHandler._create_stacks_and_layouts(ext_groups)
+            with GraphEditBatch.scope("create auto stack"):
+                stack_nodes = OpenRVStackHandler._create_stacks_and_layouts(ext_groups)
 
-        if stack_nodes:
-            rv.commands.setViewNode(stack_nodes[0])
-            rv.commands.setFrame(1)
+            if stack_nodes:
+                rv.commands.setViewNode(stack_nodes[0])
+                LazyNodeRegistry.ensure_loaded(stack_nodes[0])
+                rv.commands.setFrame(1)
+                if stack_settings.get("frame_warm_up", False):
+                    FrameWarmUp.start(stack_settings)
 
         return True
 
+    @staticmethod
+    def create_playlist(contexts):
+        """Create dailies playlist of per-shot stacks, streamed shot by shot"""
+        if rv is None:
+            print("RV module not available")
+            return False
+
+        from .playlist_builder import DailiesPlaylistBuilder
+
+        # Shots load in background, only the start is measured
+        with track_operation(STACK_BUILDS, STACK_BUILD_DURATION, kind="playlist"):
+            DailiesPlaylistBuilder(contexts).start()
+        return True
+
     @staticmethod
     def _fetch_and_group_representations(ctx, ext_groups):
         """Fetch representations and auto-compare with last submission"""
@@ -56,31 +108,50 @@ class OpenRVStackHandler:
         folder_id = ctx["product"]["folderId"]
         task_id = ctx["version"]["taskId"]
 
-        repres = list(ayon_api.get_representations(project_name, version_ids=[version_id]))
-
         # Auto-compare with last submission if same product
         product_filters = get_product_filters()
         auto_compare_types = product_filters.get("auto_compare_product_types", ["render", "prerender", "plate"])
 
+        stack_settings = get_stack_settings()
+        generations = stack_settings.get("compare_generations", 1)
+        generation_by_version = {version_id: 0}
+
         if task_id and product_type in auto_compare_types:
             try:
-                task = get_task_by_id(project_name, task_id)
-                loaded_products = task.get("data", {}).get("submission_data", {}).get("loaded_products", {})
-
-                if product_id in loaded_products:
-                    last_version_id = loaded_products[product_id]["version_id"]
-
-                    if last_version_id != version_id:
-                        prev_repres = list(ayon_api.get_representations(project_name, version_ids=[last_version_id]))
-                        repres.extend(prev_repres)
-                        print(
-                            f"Comparing {product_name} {version_name} with {loaded_products[product_id]['version_name']}")
+                submissions = SubmissionCache.get_submissions(project_name, task_id)
+
+                # Most recent submitted versions of this product, newest first
+                previous = []
+                for loaded_products in submissions:
+                    product_data = loaded_products.get(product_id)
+                    if not product_data or product_data["version_id"] == version_id:
+                        continue
+                    if product_data["version_id"] not in [p["version_id"] for p in previous]:
+                        previous.append(product_data)
+                previous = previous[:generations]
+
+                if previous:
+                    for generation, product_data in enumerate(previous, start=1):
+                        generation_by_version[product_data["version_id"]] = generation
+                    print(
+                        f"Comparing {product_name} {version_name} with "
+                        f"{', '.join(p['version_name'] for p in previous)}")
             except Exception as e:
                 print(f"Could not fetch last submission: {e}")
 
-        versions = list(ayon_api.get_versions(project_name, product_ids=[product_id]))
-        version_map = {v["id"]: v for v in versions}
-
+        # Only the compared versions, never the whole product history
+        version_ids = list(generation_by_version)
+        with track_api_call("get_representations"):
+            repres = list(ayon_api.get_representations(
+                project_name, version_ids=version_ids, fields=LOADER_REPRESENTATION_FIELDS))
+        with track_api_call("get_versions"):
+            version_map = {
+                v["id"]: v
+                for v in ayon_api.get_versions(
+                    project_name, version_ids=version_ids, fields=LOADER_VERSION_FIELDS)
+            }
+
+        repre_contexts = []
         for repre in repres:
             # Skip thumbnail representations
             if repre.get("name") == "thumbnail":
@@ -89,8 +160,17 @@ class OpenRVStackHandler:
             repre_ctx = ctx.copy()
             repre_ctx["representation"] = repre
             repre_ctx["version"] = version_map.get(repre["versionId"])
+            repre_ctx["review_generation"] = generation_by_version.get(repre["versionId"], 0)
             if repre_ctx["version"]:
                 OpenRVStackHandler._group_by_extension(repre_ctx, ext_groups)
+                repre_contexts.append(repre_ctx)
+
+        submission_settings = get_submission_settings()
+        if len(generation_by_version) > 1 and submission_settings.get("detect_identical_resubmissions", False):
+            for unchanged in FingerprintStore.check_resubmission(repre_contexts):
+                print(
+                    f"{unchanged['product']['name']} {unchanged['version']['name']}: "
+                    "no pixel changes since last submission")
 
     @staticmethod
     def _group_by_extension(context, ext_groups):
@@ -100,13 +180,36 @@ class OpenRVStackHandler:
         ext_groups[ext].append(context)
 
     @staticmethod
-    def _create_stacks_and_layouts(ext_groups):
-        """Create stacks and layouts for grouped extensions"""
+    def _create_stacks_and_layouts(ext_groups, single_sources=False):
+        """Create stacks and layouts for grouped extensions.
+
+        Args:
+            ext_groups (dict[str, list[dict]]): Contexts by extension.
+            single_sources (bool): Also return source groups of extensions
+                with a single representation, e.g. for playlist shots.
+
+        Returns:
+            list[str]: Stack (or first page) node of every extension.
+        """
         stack_nodes = []
 
+        stack_settings = get_stack_settings()
+        paged = stack_settings.get("layout_mode", "packed") == "paged"
+        page_size = stack_settings.get("layout_page_size", 16)
+        max_loaded_pages = stack_settings.get("max_loaded_pages", 2)
+
         for ext, contexts in ext_groups.items():
-            if len(contexts) > 1:
-                source_groups, version_names = OpenRVStackHandler._load_sources(contexts)
+            # Current and previous generations load now, older ones on first view
+            eager = [c for c in contexts if c.get("review_generation", 0) <= 1]
+            lazy = [c for c in contexts if c.get("review_generation", 0) > 1]
+            if paged and len(eager) > page_size:
+                # Only the eager set is paged, pages load when viewed
+                page_nodes = OpenRVStackHandler._create_paged_layouts(
+                    ext, eager, page_size, max_loaded_pages)
+                stack_nodes.append(page_nodes[0])
+                OpenRVStackHandler._register_lazy_generations(ext, None, eager, lazy)
+            elif len(contexts) > 1:
+                source_groups, version_names = OpenRVStackHandler._load_sources(eager)
 
                 if source_groups:
                     product_name = contexts[0]["product"]["name"]
@@ -114,8 +217,13 @@ class OpenRVStackHandler:
                     stack_node = OpenRVStackHandler._create_stack(ext, source_groups, version_comparison, product_name)
                     OpenRVStackHandler._create_layout(ext, source_groups, version_comparison, product_name)
                     stack_nodes.append(stack_node)
+                    OpenRVStackHandler._register_lazy_generations(ext, stack_node, eager, lazy)
+                    if stack_settings.get("changed_frame_analysis", False):
+                        ChangedFrameIndex.schedule_for_stack(stack_node, eager, stack_settings)
             else:
-                OpenRVStackHandler._load_representation(contexts[0])
+                loaded_node = OpenRVStackHandler._load_representation(contexts[0])
+                if single_sources and loaded_node:
+                    stack_nodes.append(rv.commands.nodeGroup(loaded_node))
 
         return stack_nodes
 
@@ -125,37 +233,152 @@ class OpenRVStackHandler:
         source_groups = []
         version_names = []
 
-        for ctx in contexts:
-            try:
-                # Use standard loader for consistency
-                loaded_node = OpenRVStackHandler._load_representation(ctx)
+        with GraphEditBatch.scope("load sources") as batch:
+            for ctx in contexts:
+                try:
+                    # Use standard loader for consistency
+                    loaded_node = batch.call(OpenRVStackHandler._load_representation, ctx)
 
-                if loaded_node:
-                    source_group = rv.commands.nodeGroup(loaded_node)
-                    source_groups.append(source_group)
-                    version_names.append(ctx["version"]["name"])
-            except Exception as e:
-                print(f"Error loading {ctx.get('version', {}).get('name', 'unknown')}: {e}")
+                    if loaded_node:
+                        source_group = rv.commands.nodeGroup(loaded_node)
+                        source_groups.append(source_group)
+                        version_names.append(ctx["version"]["name"])
+                except Exception as e:
+                    print(f"Error loading {ctx.get('version', {}).get('name', 'unknown')}: {e}")
 
         return source_groups, version_names
 
     @staticmethod
     def _create_stack(ext, source_groups, version_comparison, product_name):
         """Create RV stack node"""
-        stack_node = rv.commands.newNode("RVStackGroup")
-        rv.commands.setNodeInputs(stack_node, source_groups)
-        rv.commands.setStringProperty(f"{stack_node}.ui.name", [f"{product_name}_{ext}_stack({version_comparison})"])
+        with GraphEditBatch.scope("create stack") as batch:
+            stack_node = batch.new_node("RVStackGroup")
+            batch.set_inputs(stack_node, source_groups)
+            batch.set_string_property(
+                f"{stack_node}.ui.name", [f"{product_name}_{ext}_stack({version_comparison})"])
         return stack_node
 
     @staticmethod
     def _create_layout(ext, source_groups, version_comparison, product_name):
         """Create RV layout node"""
-        layout_node = rv.commands.newNode("RVLayoutGroup")
-        rv.commands.setNodeInputs(layout_node, source_groups)
-        rv.commands.setStringProperty(f"{layout_node}.layout.mode", ["packed"])
-        rv.commands.setStringProperty(f"{layout_node}.ui.name", [f"{product_name}_{ext}_layout({version_comparison})"])
+        with GraphEditBatch.scope("create layout") as batch:
+            layout_node = batch.new_node("RVLayoutGroup")
+            batch.set_inputs(layout_node, source_groups)
+            batch.set_string_property(f"{layout_node}.layout.mode", ["packed"])
+            batch.set_string_property(
+                f"{layout_node}.ui.name", [f"{product_name}_{ext}_layout({version_comparison})"])
         return layout_node
 
+    @staticmethod
+    def _register_lazy_generations(ext, stack_node, eager, lazy):
+        """Register older generations as stack inputs loaded on first view.
+
+        Args:
+            ext (str): Extension of the grouped representations.
+            stack_node (Optional[str]): Main stack the generations are added
+                to once loaded, None for paged layouts.
+            eager (list[dict]): Contexts loaded now or with their page.
+            lazy (list[dict]): Contexts of older generations.
+        """
+        for ctx in lazy:
+            product_id = ctx["product"]["id"]
+            current = next(
+                (c for c in eager
+                 if c["product"]["id"] == product_id and c.get("review_generation", 0) == 0),
+                None
+            )
+            if current is None:
+                continue
+
+            product_name = ctx["product"]["name"]
+            version_comparison = f"{current['version']['name']}/{ctx['version']['name']}"
+            with GraphEditBatch.scope("register generation") as batch:
+                generation_node = batch.new_node("RVStackGroup")
+                batch.set_string_property(
+                    f"{generation_node}.ui.name", [f"{product_name}_{ext}_stack({version_comparison})"])
+            LazyNodeRegistry.register(
+                generation_node,
+                partial(
+                    OpenRVStackHandler._load_generation,
+                    stack_node, generation_node, current, ctx
+                )
+            )
+
+    @staticmethod
+    def _load_generation(stack_node, generation_node, current, context):
+        """Load older generation and add it to its own and the main stack.
+
+        The current version is loaded as well when it is not in the session,
+        e.g. its page was never viewed or was released.
+        """
+        with GraphEditBatch.scope("load generation") as batch:
+            loaded_node = batch.call(OpenRVStackHandler._load_representation, context)
+            if not loaded_node:
+                return
+            source_group = rv.commands.nodeGroup(loaded_node)
+
+            current_group = OpenRVStackHandler._find_source_group(current["version"]["id"])
+            if current_group is None:
+                current_node = batch.call(OpenRVStackHandler._load_representation, current)
+                current_group = rv.commands.nodeGroup(current_node) if current_node else None
+            inputs = [current_group] if current_group else []
+            batch.set_inputs(generation_node, inputs + [source_group])
+            if stack_node is not None:
+                batch.set_inputs(stack_node, batch.get_inputs(stack_node) + [source_group])
+
+    @staticmethod
+    def _find_source_group(version_id):
+        """Find source group of already loaded version"""
+        for source in rv.commands.nodesOfType("RVSource"):
+            prop = f"{source}.ayon.version_id"
+            if rv.commands.propertyExists(prop) and rv.commands.getStringProperty(prop)[0] == version_id:
+                return rv.commands.nodeGroup(source)
+        return None
+
+    @staticmethod
+    def _create_paged_layouts(ext, contexts, page_size, max_loaded_pages):
+        """Create one layout per page of contexts, loaded when viewed"""
+        pages = [contexts[i:i + page_size] for i in range(0, len(contexts), page_size)]
+        product_name = contexts[0]["product"]["name"]
+
+        layout_nodes = []
+        with GraphEditBatch.scope("create pages") as batch:
+            for index, page_contexts in enumerate(pages, start=1):
+                layout_node = batch.new_node("RVLayoutGroup")
+                batch.set_string_property(f"{layout_node}.layout.mode", ["packed"])
+                batch.set_string_property(
+                    f"{layout_node}.ui.name", [f"{product_name}_{ext}_layout(page {index}/{len(pages)})"])
+                layout_nodes.append(layout_node)
+
+        # All pages of one selection share the loaded pages budget
+        group = layout_nodes[0]
+        LazyNodeRegistry.set_budget(group, max_loaded_pages)
+        for layout_node, page_contexts in zip(layout_nodes, pages):
+            LazyNodeRegistry.register(
+                layout_node,
+                partial(OpenRVStackHandler._load_page, layout_node, page_contexts),
+                partial(OpenRVStackHandler._release_page, layout_node),
+                group=group
+            )
+
+        return layout_nodes
+
+    @staticmethod
+    def _load_page(layout_node, contexts):
+        """Load page sources and connect them to the page layout"""
+        with GraphEditBatch.scope("load page") as batch:
+            source_groups, _ = OpenRVStackHandler._load_sources(contexts)
+            batch.set_inputs(layout_node, source_groups)
+
+    @staticmethod
+    def _release_page(layout_node):
+        """Disconnect and delete page sources to free their memory"""
+        with GraphEditBatch.scope("release page") as batch:
+            source_groups = batch.get_inputs(layout_node)
+            batch.set_inputs(layout_node, [])
+            for source_group in source_groups:
+                batch.call(rv.commands.deleteNode, source_group)
+
     @staticmethod
     def _load_representation(context):
         """Load single representation using standard loaders"""
@@ -174,36 +397,106 @@ class OpenRVStackHandler:
 
         # Return the loaded source node
         sources = rv.commands.sourcesAtFrame(rv.commands.frame())
-        return sources[-1] if sources else None
+        source = sources[-1] if sources else None
+
+        stack_settings = get_stack_settings()
+        performance_settings = get_performance_settings()
+        origin = "network"
+        if (
+            source
+            and stack_settings.get("proxies_enabled", False)
+            and ProxyManager.needs_proxy(context, stack_settings)
+        ):
+            try:
+                ProxyManager.attach(source, context, stack_settings)
+                origin = "proxy"
+            except Exception as e:
+                print(f"Proxy not available for {source}: {e}")
+        elif source and performance_settings.get("media_cache_enabled", False):
+            try:
+                MediaCache.configure(performance_settings)
+                MediaCache.attach(source, context)
+                origin = "media_cache"
+            except Exception as e:
+                print(f"Media cache not available for {source}: {e}")
+        LOADED_REPRESENTATIONS.inc(origin=origin)
+        return source
 
     @staticmethod
     def get_loaded_products_data(project_name):
         """Get loaded products data for submission_data storage"""
+        return OpenRVStackHandler.resolve_loaded_products(
+            project_name, OpenRVStackHandler.get_loaded_sources())
+
+    @staticmethod
+    def get_loaded_sources():
+        """Version and representation ids of AYON sources in the session.
+
+        Reads RV only, so it must run on the main thread but is cheap.
+
+        Returns:
+            list[tuple[str, Optional[str]]]: Version and representation id.
+        """
         if rv is None:
+            return []
+
+        source_data = []
+        for source in rv.commands.nodesOfType("RVSource"):
+            if not rv.commands.propertyExists(f"{source}.ayon.version_id"):
+                continue
+            representation_id = None
+            repre_prop = f"{source}.ayon.representation_id"
+            if rv.commands.propertyExists(repre_prop):
+                representation_id = rv.commands.getStringProperty(repre_prop)[0]
+            source_data.append(
+                (rv.commands.getStringProperty(f"{source}.ayon.version_id")[0], representation_id))
+        return source_data
+
+    @staticmethod
+    def resolve_loaded_products(project_name, source_data):
+        """Loaded products data of sources from 'get_loaded_sources'.
+
+        Only queries AYON, so it can run on a background thread.
+        """
+        if not source_data:
             return {}
 
         loaded_products = {}
-        sources = rv.commands.nodesOfType("RVSource")
-
-        for source in sources:
-            try:
-                if not rv.commands.propertyExists(f"{source}.ayon.version_id"):
-                    continue
-
-                version_id = rv.commands.getStringProperty(f"{source}.ayon.version_id")[0]
-                version = ayon_api.get_version_by_id(project_name, version_id)
-
-                if version:
-                    product_id = version["productId"]
-                    product = ayon_api.get_product_by_id(project_name, product_id)
-
-                    loaded_products[product_id] = {
-                        "version_id": version_id,
-                        "version_name": version["name"],
-                        "product_name": product["name"],
-                        "product_type": product["productType"]
-                    }
-            except Exception as e:
-                print(f"Error reading product data: {e}")
+        try:
+            with track_api_call("get_versions"):
+                versions = {
+                    version["id"]: version
+                    for version in ayon_api.get_versions(
+                        project_name,
+                        version_ids={version_id for version_id, _ in source_data},
+                        fields=VERSION_SUMMARY_FIELDS
+                    )
+                }
+            with track_api_call("get_products"):
+                products = {
+                    product["id"]: product
+                    for product in ayon_api.get_products(
+                        project_name,
+                        product_ids={version["productId"] for version in versions.values()},
+                        fields=PRODUCT_SUMMARY_FIELDS
+                    )
+                }
+        except Exception as e:
+            print(f"Error reading product data: {e}")
+            return loaded_products
+
+        for version_id, representation_id in source_data:
+            version = versions.get(version_id)
+            product = products.get(version["productId"]) if version else None
+            if not product:
+                continue
+            loaded_products[product["id"]] = {
+                "version_id": version_id,
+                "version_name": version["name"],
+                "product_name": product["name"],
+                "product_type": product["productType"]
+            }
+            if representation_id:
+                loaded_products[product["id"]]["representation_id"] = representation_id
 
         return loaded_products
@@ -0,0 +1,135 @@
+"""Streaming dailies playlist made of per-shot comparison stacks."""
+import queue
+import threading
+from collections import defaultdict
+
+from qtpy import QtCore
+
+from .openrv_handler import OpenRVStackHandler
+from .graph_batch import GraphEditBatch
+
+try:
+    import rv.commands
+except ImportError:
+    rv = None
+
+
+class DailiesPlaylistBuilder:
+    """Build an RVSequenceGroup of per-shot stacks while shots are fetched.
+
+    Representations of each shot are fetched on a background thread in
+    editorial order and handed over through a queue. RV graph edits must
+    happen on the main thread, so a timer picks up one shot per tick and
+    appends its stack to the sequence. The sequence becomes the view node as
+    soon as the first shot is loaded.
+    """
+
+    poll_interval = 50
+
+    # Keep running builders alive until they finish
+    _running = []
+
+    def __init__(self, contexts):
+        self._shots = self._group_by_shot(contexts)
+        self._queue = queue.Queue()
+        self._sequence_node = None
+        self._shot_nodes = []
+        self._timer = None
+
+    @staticmethod
+    def _group_by_shot(contexts):
+        """Group contexts by folder, sorted by folder path"""
+        shots = defaultdict(list)
+        for ctx in contexts:
+            folder = ctx.get("folder") or {}
+            key = folder.get("path") or folder.get("name") or ctx["product"]["folderId"]
+            shots[key].append(ctx)
+        return [shots[key] for key in sorted(shots)]
+
+    def start(self):
+        """Create the sequence node and start streaming shots into it"""
+        self._sequence_node = rv.commands.newNode("RVSequenceGroup")
+        rv.commands.setStringProperty(
+            f"{self._sequence_node}.ui.name", [f"dailies_playlist({len(self._shots)} shots)"])
+
+        thread = threading.Thread(
+            target=self._fetch_shots,
+            name="ReviewPlaylistFetch",
+            daemon=True
+        )
+        thread.start()
+
+        self._timer = QtCore.QTimer()
+        self._timer.timeout.connect(self._process_next)
+        self._timer.start(self.poll_interval)
+        DailiesPlaylistBuilder._running.append(self)
+
+    def _fetch_shots(self):
+        """Fetch and group representations of each shot in order"""
+        for shot_contexts in self._shots:
+            ext_groups = defaultdict(list)
+            for ctx in shot_contexts:
+                try:
+                    OpenRVStackHandler._fetch_and_group_representations(ctx, ext_groups)
+                except Exception as e:
+                    print(f"Error fetching {ctx['product']['name']}: {e}")
+            self._queue.put(ext_groups)
+        self._queue.put(None)
+
+    def _process_next(self):
+        try:
+            ext_groups = self._queue.get_nowait()
+        except queue.Empty:
+            return
+
+        if ext_groups is None:
+            self._finish()
+            return
+
+        with GraphEditBatch.scope("playlist shot") as batch:
+            try:
+                shot_node = self._build_shot(ext_groups)
+            except Exception as e:
+                print(f"Error building playlist shot: {e}")
+                shot_node = None
+            if not shot_node:
+                return
+
+            self._shot_nodes.append(shot_node)
+            batch.set_inputs(self._sequence_node, self._shot_nodes)
+
+        if len(self._shot_nodes) == 1:
+            rv.commands.setViewNode(self._sequence_node)
+            rv.commands.setFrame(1)
+
+    @staticmethod
+    def _build_shot(ext_groups):
+        """Create comparison stacks (or single sources) for one shot.
+
+        Every extension group is built like an auto stack, so generations
+        and paging are handled the same way. A shot with several
+        extensions gets a layout of their stacks as its playlist entry.
+        """
+        if not ext_groups:
+            return None
+
+        shot_nodes = OpenRVStackHandler._create_stacks_and_layouts(ext_groups, single_sources=True)
+        if len(shot_nodes) < 2:
+            return shot_nodes[0] if shot_nodes else None
+
+        contexts = next(iter(ext_groups.values()))
+        folder = contexts[0].get("folder") or {}
+        shot_name = folder.get("name") or contexts[0]["product"]["name"]
+        with GraphEditBatch.scope("playlist shot layout") as batch:
+            layout_node = batch.new_node("RVLayoutGroup")
+            batch.set_inputs(layout_node, shot_nodes)
+            batch.set_string_property(f"{layout_node}.layout.mode", ["packed"])
+            batch.set_string_property(
+                f"{layout_node}.ui.name", [f"{shot_name}_shot({'/'.join(ext_groups)})"])
+        return layout_node
+
+    def _finish(self):
+        self._timer.stop()
+        print(f"Dailies playlist ready with {len(self._shot_nodes)} shots")
+        if self in DailiesPlaylistBuilder._running:
+            DailiesPlaylistBuilder._running.remove(self)
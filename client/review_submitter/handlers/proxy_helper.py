@@ -0,0 +1,356 @@
+"""Downscaled single-layer proxies of heavy representations."""
+import abc
+import json
+import os
+import subprocess
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import rv.commands
+except ImportError:
+    rv = None
+
+from ayon_core.lib import get_ffmpeg_tool_args
+from ayon_core.pipeline.load import get_representation_path
+
+from .cache_helper import get_cache_dir
+from .media_helper import (
+    get_input_args,
+    get_process_pool,
+    get_proxy_size,
+    get_sequence_pattern,
+    iter_frame_chunks
+)
+from .memory_budget import get_frame_count
+
+PROXY_EXTENSION = ".jpg"
+FULL_MEDIA_PROPERTY = "ayon.full_media"
+PROXY_MEDIA_PROPERTY = "ayon.proxy_media"
+
+
+def get_proxy_pattern(path, output_dir):
+    """ffmpeg output pattern and first frame of proxy of image sequence.
+
+    Proxy frames keep name, padding and numbering of the source so RV
+    aligns them with the other stack inputs.
+    """
+    pattern, first_frame = get_sequence_pattern(path)
+    name = os.path.splitext(os.path.basename(pattern))[0]
+    return os.path.join(output_dir, name + PROXY_EXTENSION), first_frame
+
+
+class ProxyTranscoder(abc.ABC):
+    """Interface of proxy backends.
+
+    Backends must be picklable as they run in the shared process pool.
+    """
+
+    name = None
+
+    @abc.abstractmethod
+    def transcode(self, path, output_dir, width, height, frame_count):
+        """Write proxy frames of image sequence into 'output_dir'.
+
+        Args:
+            path (str): First file of source image sequence.
+            output_dir (str): Existing directory for proxy frames.
+            width (int): Proxy width.
+            height (int): Proxy height.
+            frame_count (int): Number of source frames.
+        """
+
+
+class FFmpegTranscoder(ProxyTranscoder):
+    """Scale and re-encode frames with a single ffmpeg call."""
+
+    name = "ffmpeg"
+
+    def transcode(self, path, output_dir, width, height, frame_count):
+        pattern, first_frame = get_proxy_pattern(path, output_dir)
+        args = get_ffmpeg_tool_args(
+            "ffmpeg",
+            "-v", "error",
+            "-y",
+            *get_input_args(path),
+            "-vf", f"scale={width}:{height}:flags=area",
+            "-frames:v", str(frame_count),
+            "-start_number", str(first_frame),
+            "-q:v", "2",
+            pattern
+        )
+        subprocess.run(args, capture_output=True, check=True)
+
+
+def box_downscale(image, width, height):
+    """Area-average resize of (height, width, channels) array.
+
+    Reference implementation in plain NumPy, every output pixel is the mean
+    of the source pixels it covers.
+    """
+    source_height, source_width = image.shape[:2]
+    rows = np.linspace(0, source_height, height + 1).astype(int)[:-1]
+    columns = np.linspace(0, source_width, width + 1).astype(int)[:-1]
+    data = image.astype(np.float32)
+    row_sums = np.add.reduceat(data, rows, axis=0)
+    row_counts = np.diff(np.append(rows, source_height))[:, None, None]
+    sums = np.add.reduceat(row_sums / row_counts, columns, axis=1)
+    column_counts = np.diff(np.append(columns, source_width))[None, :, None]
+    return np.clip(np.rint(sums / column_counts), 0, 255).astype(np.uint8)
+
+
+class NumpyTranscoder(ProxyTranscoder):
+    """Reference backend, decodes at source resolution and resizes in NumPy.
+
+    Slower than 'FFmpegTranscoder' but the resize is plain NumPy, so proxy
+    output can be checked against it anywhere. The sequence is decoded in
+    one stream bounded to 'frame_count' frames and the resized frames are
+    piped to one encoder, holding 'chunk_size' source frames at a time.
+    """
+
+    name = "numpy"
+    chunk_size = 8
+
+    def __init__(self, resolution=None):
+        self.resolution = resolution
+
+    def transcode(self, path, output_dir, width, height, frame_count):
+        if np is None:
+            raise RuntimeError("NumPy is required for the numpy proxy backend")
+        if not self.resolution:
+            raise ValueError("Source resolution is required for the numpy proxy backend")
+
+        pattern, first_frame = get_proxy_pattern(path, output_dir)
+        source_width, source_height = self.resolution
+        args = get_ffmpeg_tool_args(
+            "ffmpeg",
+            "-v", "error",
+            "-y",
+            "-f", "rawvideo",
+            "-pix_fmt", "rgb24",
+            "-s", f"{width}x{height}",
+            "-i", "-",
+            "-start_number", str(first_frame),
+            "-q:v", "2",
+            pattern
+        )
+        encoder = subprocess.Popen(args, stdin=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=0)
+        try:
+            for frames in iter_frame_chunks(path, source_width, source_height, self.chunk_size, frame_count):
+                for frame in frames:
+                    encoder.stdin.write(box_downscale(frame, width, height).tobytes())
+            encoder.stdin.close()
+            stderr = encoder.stderr.read()
+            if encoder.wait() != 0:
+                raise subprocess.CalledProcessError(encoder.returncode, args, stderr=stderr)
+        finally:
+            if encoder.poll() is None:
+                encoder.kill()
+                encoder.wait()
+            encoder.stderr.close()
+
+
+TRANSCODERS = {
+    FFmpegTranscoder.name: FFmpegTranscoder,
+    NumpyTranscoder.name: NumpyTranscoder,
+}
+
+
+def get_transcoder(name, resolution=None):
+    if name == NumpyTranscoder.name:
+        return NumpyTranscoder(resolution)
+    return TRANSCODERS.get(name, FFmpegTranscoder)()
+
+
+def _generate_proxy(transcoder, path, output_dir, width, height, frame_count):
+    """Transcode proxy and write its manifest, runs in a worker process."""
+    transcoder.transcode(path, output_dir, width, height, frame_count)
+    pattern, first_frame = get_proxy_pattern(path, output_dir)
+    manifest_path = os.path.join(output_dir, "proxy.json")
+    with open(f"{manifest_path}.tmp", "w") as stream:
+        json.dump({
+            "pattern": pattern,
+            "first_frame": first_frame,
+            "frame_count": frame_count,
+            "backend": transcoder.name
+        }, stream)
+    os.replace(f"{manifest_path}.tmp", manifest_path)
+    return pattern
+
+
+class ProxyManager:
+    """Generate proxies of stacked representations and swap RV sources.
+
+    Proxies are cached per representation id and proxy width. The first
+    time a heavy representation is stacked the full resolution media plays
+    while its proxy is generated in the shared process pool, then the
+    source switches to the proxy. Both media paths are stored on the
+    source node so the view can switch back to full resolution on demand.
+    """
+
+    poll_interval = 500
+
+    _pending = {}
+    _timer = None
+    _bound = False
+
+    @staticmethod
+    def _output_dir(representation_id, width):
+        return get_cache_dir("proxies", f"{representation_id}_{width}")
+
+    @staticmethod
+    def _get_resolution(context):
+        attrib = context["version"].get("attrib") or {}
+        if attrib.get("resolutionWidth") and attrib.get("resolutionHeight"):
+            return attrib["resolutionWidth"], attrib["resolutionHeight"]
+        return None
+
+    @classmethod
+    def needs_proxy(cls, context, stack_settings):
+        """Whether representation is an image sequence heavy enough for a proxy"""
+        path = get_representation_path(context["representation"])
+        if os.path.splitext(path)[1].lower() not in stack_settings.get("proxy_extensions", [".exr", ".dpx"]):
+            return False
+        if get_sequence_pattern(path) is None:
+            return False
+        resolution = cls._get_resolution(context)
+        return resolution is None or resolution[0] > stack_settings.get("proxy_width", 1024)
+
+    @classmethod
+    def get_proxy_dir(cls, representation_id, width):
+        """Directory of complete proxy, None if not generated yet"""
+        output_dir = cls._output_dir(representation_id, width)
+        if os.path.exists(os.path.join(output_dir, "proxy.json")):
+            return output_dir
+        return None
+
+    @classmethod
+    def attach(cls, source_node, context, stack_settings):
+        """Play proxy in 'source_node' now or once it is generated"""
+        cls._bind_events()
+        representation_id = context["representation"]["id"]
+        proxy_width = stack_settings.get("proxy_width", 1024)
+
+        proxy_dir = cls.get_proxy_dir(representation_id, proxy_width)
+        if proxy_dir:
+            cls._set_proxy(source_node, proxy_dir)
+            return
+
+        key = (representation_id, proxy_width)
+        pending = cls._pending.get(key)
+        if pending is None:
+            resolution = cls._get_resolution(context)
+            width, height = get_proxy_size(proxy_width, resolution)
+            future = get_process_pool(stack_settings.get("analysis_workers", 4)).submit(
+                _generate_proxy,
+                get_transcoder(stack_settings.get("proxy_backend", "ffmpeg"), resolution),
+                get_representation_path(context["representation"]),
+                cls._output_dir(representation_id, proxy_width),
+                width,
+                height,
+                get_frame_count(context)
+            )
+            pending = cls._pending[key] = {"future": future, "sources": []}
+        pending["sources"].append(source_node)
+        cls._start_timer()
+
+    @staticmethod
+    def _store_string(prop, value):
+        if not rv.commands.propertyExists(prop):
+            rv.commands.newProperty(prop, rv.commands.StringType, 1)
+        rv.commands.setStringProperty(prop, [value], True)
+
+    @classmethod
+    def _set_proxy(cls, source_node, proxy_dir):
+        full_media = rv.commands.sourceMedia(source_node)[0]
+        name = os.path.splitext(os.path.basename(full_media))[0]
+        proxy_media = os.path.join(proxy_dir, name + PROXY_EXTENSION)
+        cls._store_string(f"{source_node}.{FULL_MEDIA_PROPERTY}", full_media)
+        cls._store_string(f"{source_node}.{PROXY_MEDIA_PROPERTY}", proxy_media)
+        rv.commands.setSourceMedia(source_node, [proxy_media])
+
+    @classmethod
+    def _start_timer(cls):
+        from qtpy import QtCore
+
+        if cls._timer is None:
+            cls._timer = QtCore.QTimer()
+            cls._timer.timeout.connect(cls._poll)
+        if not cls._timer.isActive():
+            cls._timer.start(cls.poll_interval)
+
+    @classmethod
+    def _poll(cls):
+        for key, pending in list(cls._pending.items()):
+            if not pending["future"].done():
+                continue
+            cls._pending.pop(key)
+            try:
+                pending["future"].result()
+            except Exception as e:
+                print(f"Proxy of {key[0]} failed: {e}")
+                continue
+
+            proxy_dir = cls._output_dir(*key)
+            for source_node in pending["sources"]:
+                if rv.commands.nodeExists(source_node):
+                    cls._set_proxy(source_node, proxy_dir)
+            print(f"Proxy of {key[0]} ready")
+
+        if not cls._pending:
+            cls._timer.stop()
+
+    @classmethod
+    def set_full_resolution(cls, full_resolution=True, source_nodes=None):
+        """Switch sources between proxy and full resolution media.
+
+        Args:
+            full_resolution (bool): Play full resolution if True, proxy if False.
+            source_nodes (Optional[list[str]]): Sources to switch, sources
+                at current frame by default.
+        """
+        if source_nodes is None:
+            source_nodes = rv.commands.sourcesAtFrame(rv.commands.frame())
+        prop_name = FULL_MEDIA_PROPERTY if full_resolution else PROXY_MEDIA_PROPERTY
+        for source_node in source_nodes:
+            prop = f"{source_node}.{prop_name}"
+            if rv.commands.propertyExists(prop):
+                rv.commands.setSourceMedia(source_node, rv.commands.getStringProperty(prop))
+
+    @classmethod
+    def toggle_full_resolution(cls):
+        """Toggle viewed sources between proxy and full resolution"""
+        sources = [
+            source for source in rv.commands.sourcesAtFrame(rv.commands.frame())
+            if rv.commands.propertyExists(f"{source}.{PROXY_MEDIA_PROPERTY}")
+        ]
+        if not sources:
+            return
+        playing_proxy = (
+            rv.commands.sourceMedia(sources[0])[0]
+            == rv.commands.getStringProperty(f"{sources[0]}.{PROXY_MEDIA_PROPERTY}")[0]
+        )
+        cls.set_full_resolution(playing_proxy, sources)
+
+    @classmethod
+    def _bind_events(cls):
+        if cls._bound or rv is None:
+            return
+        rv.commands.bind(
+            "default",
+            "global",
+            "key-down--alt--p",
+            cls._on_toggle_key,
+            "Toggle review stack sources between proxy and full resolution"
+        )
+        cls._bound = True
+
+    @classmethod
+    def _on_toggle_key(cls, event):
+        try:
+            cls.toggle_full_resolution()
+        except Exception as e:
+            print(f"Could not toggle proxy resolution: {e}")
@@ -1,14 +1,22 @@
 import os
+import shutil
 import tempfile
+import threading
 from datetime import datetime
 from pathlib import Path
 from qtpy import QtWidgets, QtCore
-from ayon_api import get_server_api_connection, get_tasks, get_folder_by_path, RequestTypes, get_task_by_id, update_task
-from ayon_api.operations import OperationsSession
 from ayon_core.pipeline import get_current_project_name
 from ayon_core.pipeline import get_current_context
 from ayon_core.tools.utils import host_tools
-from .settings_helper import get_product_filters, get_task_settings, get_submission_settings
+from .settings_helper import (
+    get_product_filters,
+    get_task_settings,
+    get_submission_settings
+)
+from .cache_helper import USERS_CACHE, get_cached_folder, get_cached_tasks
+from .submission_helper import submit_review
+from .submission_cache import SubmissionCache
+from .metrics import track_api_call
 
 try:
     import rv.commands as rv
@@ -17,7 +25,7 @@ except ImportError:
 
 
 class ReviewSubmissionDialog(QtWidgets.QDialog):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, notice=None):
         super().__init__(parent)
         self.setWindowTitle("Submit Review")
         self.setFixedSize(400, 350)
@@ -25,6 +33,7 @@ class ReviewSubmissionDialog(QtWidgets.QDialog):
         self.is_high_priority = False
         self.comment = ""
         self.submission_type = None
+        self._notice = notice
         self._setup_ui()
 
     @staticmethod
@@ -42,31 +51,43 @@ class ReviewSubmissionDialog(QtWidgets.QDialog):
                 "Authorization": f"Bearer {api_key}"
             }
 
-            response = requests.post(
-                url,
-                json={"query": query, "variables": variables or {}},
-                headers=headers,
+            with track_api_call("graphql"):
+                response = requests.post(
+                    url,
+                    json={"query": query, "variables": variables or {}},
+                    headers=headers,
 
-                timeout=30
-            )
-            response.raise_for_status()
+                    timeout=30
+                )
+                response.raise_for_status()
             return response.json()
 
         except Exception as e:
             raise Exception(f"GraphQL query failed: {e}")
 
+    @staticmethod
+    def _query_user_names():
+        """Query names of all AYON users."""
+        query = "query { users { edges { node { name } } } }"
+        response = ReviewSubmissionDialog._graphql_query(query)
+        return [edge["node"]["name"] for edge in response.get("data", {}).get("users", {}).get("edges", [])]
+
     def _fetch_users(self):
         """Fetch AYON users."""
         try:
-            query = "query { users { edges { node { name } } } }"
-            response = self._graphql_query(query)
-            return [edge["node"]["name"] for edge in response.get("data", {}).get("users", {}).get("edges", [])]
+            return USERS_CACHE.get_or_fetch("names", self._query_user_names)
         except:
             return ["Users not fetching"]
 
     def _setup_ui(self):
         layout = QtWidgets.QVBoxLayout(self)
 
+        if self._notice:
+            notice_label = QtWidgets.QLabel(self._notice)
+            notice_label.setWordWrap(True)
+            notice_label.setStyleSheet("color: #e5a50a;")
+            layout.addWidget(notice_label)
+
         reviewer_label = QtWidgets.QLabel("Select Reviewer:")
         self.reviewer_combo = QtWidgets.QComboBox()
         self.reviewer_combo.addItems(self._fetch_users())
@@ -116,17 +137,28 @@ class ReviewSubmissionDialog(QtWidgets.QDialog):
         }
 
 
+class _SubmissionNotifier(QtCore.QObject):
+    """Delivers the result of a background submission to the main thread"""
+
+    finished = QtCore.Signal(object)
+
+
 class ReviewSubmissionHandler:
     """Handler for review submission workflow"""
 
+    # Keep notifiers of running dialog submissions alive
+    _notifiers = []
+
     @staticmethod
     def _extract_first_frame_from_rv():
         """Extract the first frame from current RV session as PNG."""
         if not rv:
             return None
 
-        temp_dir = Path(tempfile.gettempdir())
-        temp_path = temp_dir / "rv_thumbnail.png"
+        # Unique per submission, submissions overlap on background threads
+        fd, temp_path = tempfile.mkstemp(prefix="rv_thumbnail_", suffix=".png")
+        os.close(fd)
+        temp_path = Path(temp_path)
 
         try:
             current_frame = rv.frame()
@@ -142,105 +174,261 @@ class ReviewSubmissionHandler:
             return None
 
     @staticmethod
-    def _upload_thumbnail_to_version(project_name, version_id, thumbnail_path):
-        """Upload thumbnail to AYON server and set it for version"""
+    def _find_annotated_frames():
+        """Global frames of current view that contain paint strokes"""
+        has_strokes = any(
+            rv.getStringProperty(prop)
+            for paint_node in rv.nodesOfType("RVPaint")
+            for prop in rv.properties(paint_node)
+            if prop.endswith(".order")
+        )
+        if not has_strokes:
+            return []
+        return sorted(set(rv.mapPropertyToGlobalFrames("order", 1)))
+
+    @staticmethod
+    def _export_annotated_frames(max_frames):
+        """Export only frames with annotations from current RV session.
+
+        Returns:
+            list[str]: Paths to exported PNG files, their directory is
+                removed by 'submit_review' once they are uploaded.
+        """
+        if not rv:
+            return []
+
+        temp_dir = Path(tempfile.mkdtemp(prefix="rv_annotations_"))
+        exported = []
         try:
-            with open(thumbnail_path, "rb") as stream:
-                mime_type = "image/png"
-                if thumbnail_path.endswith((".jpg", ".jpeg")):
-                    if b"\xff\xd8\xff" == stream.read(3):
-                        mime_type = "image/jpeg"
-                    stream.seek(0)
-
-            conn = get_server_api_connection()
-            response = conn.upload_file(
-                f"projects/{project_name}/thumbnails",
-                thumbnail_path,
-                request_type=RequestTypes.post,
-                headers={"Content-Type": mime_type}
-            )
-            response.raise_for_status()
-            thumbnail_id = response.json()["id"]
-
-            op_session = OperationsSession()
-            op_session.update_entity(
-                project_name,
-                "version",
-                version_id,
-                {"thumbnailId": thumbnail_id}
-            )
-            op_session.commit()
-            return True
+            frames = ReviewSubmissionHandler._find_annotated_frames()[:max_frames]
+            current_frame = rv.frame()
+            try:
+                for frame in frames:
+                    rv.setFrame(frame)
+                    path = temp_dir / f"annotation.{frame:04d}.png"
+                    rv.exportCurrentFrame(str(path))
+                    if path.exists():
+                        exported.append(str(path))
+            finally:
+                rv.setFrame(current_frame)
         except Exception as e:
-            print(f"Failed to upload thumbnail: {e}")
-            return False
+            print(f"Failed to export annotated frames from RV: {e}")
+        if not exported:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        return exported
 
     @staticmethod
-    def _create_version_activity(version_id, review_data):
-        """Create activity comment on version with user tagging"""
-        conn = get_server_api_connection()
-        project_name = get_current_project_name()
-        reviewer = review_data["reviewer"]
-        comment = review_data["comment"]
-
-        message = comment
-        if review_data["is_high_priority"]:
-            message = f"🔥 HIGH PRIORITY: {message}"
-        if reviewer:
-            message += f" [{reviewer}](user:{reviewer})"
-
-        conn.create_activity(
-            project_name=project_name,
-            entity_type="version",
-            entity_id=version_id,
-            activity_type="comment",
-            body=message
-        )
+    def _collect_submission_context(source="dialog"):
+        """Collect everything that needs RV or the host context.
 
-        thumbnail_path = ReviewSubmissionHandler._extract_first_frame_from_rv()
-        if thumbnail_path:
-            ReviewSubmissionHandler._upload_thumbnail_to_version(
-                project_name, version_id, thumbnail_path
-            )
-            try:
-                os.remove(thumbnail_path)
-            except:
-                pass
+        Must run on the main thread, only reads RV and exports frames.
+        AYON lookups are left to '_complete_submission_context' on the
+        worker thread.
+
+        Args:
+            source (str): How the review is submitted, used in metrics.
+        """
+        from review_submitter.handlers import OpenRVStackHandler
 
         context = get_current_context()
-        task_name = context.get("task_name")
-        if task_name:
-            folder_path = context.get("folder_path")
-            folder = get_folder_by_path(project_name, folder_path)
-            if folder:
-                tasks = list(get_tasks(project_name, folder_ids=[folder["id"]], task_names=[task_name]))
-                if tasks:
-                    task_id = tasks[0]["id"]
-
-                    # Get loaded products from RV
-                    from review_submitter.handlers import OpenRVStackHandler
-                    loaded_products = OpenRVStackHandler.get_loaded_products_data(project_name)
-
-                    submission_data = {
-                        "submission_type": review_data["submission_type"],
-                        "reviewer_name": reviewer,
-                        "submitter_name": os.environ.get("USERNAME"),
-                        "workfile_version_id": version_id,
-                        "submitted_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                        "loaded_products": loaded_products
-                    }
-
-                    task = get_task_by_id(project_name, task_id)
-                    task_data = task.get("data", {})
-                    task_data["submission_data"] = submission_data
-                    update_task(project_name, task_id, data=task_data)
+        submission_settings = get_submission_settings()
+        annotated_frame_paths = []
+        if submission_settings.get("attach_annotated_frames", False):
+            annotated_frame_paths = ReviewSubmissionHandler._export_annotated_frames(
+                submission_settings.get("max_annotated_frames", 20))
+
+        return {
+            "project_name": get_current_project_name(),
+            "source": source,
+            "requested_at": datetime.now().isoformat(),
+            "folder_path": context.get("folder_path"),
+            "task_name": context.get("task_name"),
+            "thumbnail_path": ReviewSubmissionHandler._extract_first_frame_from_rv(),
+            "view_representation_id": ReviewSubmissionHandler._get_view_representation_id(),
+            "annotated_frame_paths": annotated_frame_paths,
+            "loaded_sources": OpenRVStackHandler.get_loaded_sources()
+        }
+
+    @staticmethod
+    def _complete_submission_context(submission_context):
+        """Resolve loaded and unchanged products, runs on the worker thread"""
+        from review_submitter.handlers import OpenRVStackHandler
+
+        project_name = submission_context["project_name"]
+        loaded_products = OpenRVStackHandler.resolve_loaded_products(
+            project_name, submission_context.pop("loaded_sources", []))
+
+        unchanged_products = []
+        if get_submission_settings().get("detect_identical_resubmissions", False):
+            try:
+                unchanged_products = ReviewSubmissionHandler._find_unchanged_products(
+                    project_name,
+                    loaded_products,
+                    submission_context.get("folder_path"),
+                    submission_context.get("task_name")
+                )
+            except Exception as e:
+                print(f"Could not check for unchanged products: {e}")
+
+        submission_context["loaded_products"] = loaded_products
+        submission_context["unchanged_products"] = unchanged_products
+        return submission_context
+
+    @staticmethod
+    def _get_view_representation_id():
+        """Representation id of the first AYON source at current frame"""
+        if not rv:
+            return None
+
+        try:
+            for source in rv.sourcesAtFrame(rv.frame()):
+                prop = f"{source}.ayon.representation_id"
+                if rv.propertyExists(prop):
+                    return rv.getStringProperty(prop)[0]
+        except Exception as e:
+            print(f"Failed to read viewed representation from RV: {e}")
+        return None
+
+    @staticmethod
+    def _submit_review(version_id, review_data, submission_context):
+        """Create activity, upload thumbnail and store submission data"""
+        submit_review(version_id, review_data, submission_context)
 
+    @staticmethod
+    def _create_version_activity(version_id, review_data):
+        """Create activity comment on version with user tagging.
+
+        Returns right after RV is read, the result is shown in a message
+        box once the background submission finishes.
+        """
+        notifier = _SubmissionNotifier()
+        ReviewSubmissionHandler._notifiers.append(notifier)
+        notifier.finished.connect(
+            lambda error: ReviewSubmissionHandler._on_submission_finished(notifier, error))
+        ReviewSubmissionHandler.submit_in_background(
+            version_id, review_data, source="dialog", on_finished=notifier.finished.emit)
+
+    @staticmethod
+    def _on_submission_finished(notifier, error):
+        """Report dialog submission result, runs on the main thread"""
+        if notifier in ReviewSubmissionHandler._notifiers:
+            ReviewSubmissionHandler._notifiers.remove(notifier)
+        if error:
+            QtWidgets.QMessageBox.warning(
+                None,
+                "Review Submission Failed",
+                f"Review could not be submitted: {error}"
+            )
+            return
         QtWidgets.QMessageBox.information(
             None,
             "Review Submitted",
             "Review comment sent successfully!"
         )
 
+    @staticmethod
+    def submit_in_background(version_id, review_data, source="background", on_finished=None):
+        """Submit review on a background thread without any UI.
+
+        Only RV is read on the calling (main) thread, AYON lookups,
+        attachments and the activity are done on a daemon thread.
+
+        Args:
+            version_id (str): Reviewed version.
+            review_data (dict): Reviewer, submission type, priority and comment.
+            source (str): How the review is submitted, used in metrics.
+            on_finished (Optional[Callable[[Optional[str]], None]]): Called
+                on the worker thread with the error message, None on success.
+
+        Returns:
+            threading.Thread: Started worker thread.
+        """
+        submission_context = ReviewSubmissionHandler._collect_submission_context(source)
+
+        def _worker():
+            error = None
+            try:
+                ReviewSubmissionHandler._complete_submission_context(submission_context)
+                ReviewSubmissionHandler._submit_review(version_id, review_data, submission_context)
+                print(f"Review submitted for version {version_id}")
+            except Exception as e:
+                error = str(e)
+                print(f"Background review submission failed: {e}")
+            if on_finished is not None:
+                on_finished(error)
+
+        thread = threading.Thread(target=_worker, name="ReviewSubmit", daemon=True)
+        thread.start()
+        return thread
+
+    @staticmethod
+    def _find_unchanged_products(project_name, loaded_products, folder_path=None, task_name=None):
+        """Names of loaded products identical to the last submission.
+
+        Uses cached fingerprints only, media is never decoded here. Folder
+        and task default to the current host context.
+
+        Returns:
+            list[str]: Product and version names.
+        """
+        from .fingerprint import FingerprintStore
+
+        if folder_path is None or task_name is None:
+            context = get_current_context()
+            folder_path = context.get("folder_path")
+            task_name = context.get("task_name")
+        folder = get_cached_folder(project_name, folder_path)
+        tasks = get_cached_tasks(project_name, folder["id"], [task_name]) if folder else []
+        if not tasks:
+            return []
+        submissions = SubmissionCache.get_submissions(project_name, tasks[0]["id"])
+        last_products = submissions[0] if submissions else {}
+        return [
+            f"{loaded_products[product_id]['product_name']} {loaded_products[product_id]['version_name']}"
+            for product_id in FingerprintStore.find_unchanged_products(loaded_products, last_products)
+        ]
+
+    @staticmethod
+    def get_unchanged_products_notice():
+        """Warn about loaded products identical to the last submission.
+
+        Returns:
+            str or None: Notice for the submission dialog.
+        """
+        from review_submitter.handlers import OpenRVStackHandler
+
+        try:
+            project_name = get_current_project_name()
+            unchanged = ReviewSubmissionHandler._find_unchanged_products(
+                project_name, OpenRVStackHandler.get_loaded_products_data(project_name))
+        except Exception as e:
+            print(f"Could not check for unchanged products: {e}")
+            return None
+
+        if not unchanged:
+            return None
+        return f"No pixel changes since last submission: {', '.join(unchanged)}"
+
+    @staticmethod
+    def get_default_review_data():
+        """Review data used when submitting without the dialog.
+
+        Returns:
+            dict or None: Review data, None if no default reviewers are set.
+        """
+        submission_settings = get_submission_settings()
+        reviewers = submission_settings.get("default_reviewers", [])
+        if not reviewers:
+            return None
+        submission_types = submission_settings.get("submission_types", ["WIP", "FINAL", "PACKAGE"])
+        return {
+            "reviewer": reviewers[0],
+            "reviewers": list(reviewers),
+            "submission_type": submission_types[0] if submission_types else "WIP",
+            "is_high_priority": False,
+            "comment": "Submitted on publish"
+        }
+
     @staticmethod
     def collect_review_inputs(parent, is_resubmission=False):
         """Collect review inputs - plates/renders based on submission type"""
@@ -262,7 +450,7 @@ class ReviewSubmissionHandler:
                 project_name = context["project_name"]
                 folder_path = context["folder_path"]
 
-                folder = get_folder_by_path(project_name, folder_path)
+                folder = get_cached_folder(project_name, folder_path)
                 if not folder:
                     print(f"Folder not found: {folder_path}")
                     return
@@ -275,7 +463,7 @@ class ReviewSubmissionHandler:
                     task_names.append(ayon_task_name)
 
                 try:
-                    tasks = get_tasks(project_name, folder_ids=[folder_id], task_names=task_names)
+                    tasks = get_cached_tasks(project_name, folder_id, task_names)
                     task_ids = [task["id"] for task in tasks] if tasks else []
                     task_ids.append("--no-task--")
 
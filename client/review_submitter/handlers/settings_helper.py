@@ -1,29 +1,38 @@
 """Helper to retrieve addon settings."""
 import logging
 
+from .cache_helper import SETTINGS_CACHE
+from .metrics import SETTINGS_FETCHES, SETTINGS_FETCH_DURATION
+
 logger = logging.getLogger(__name__)
 
 
-def get_addon_settings():
-    """Get Review Submitter addon settings with fallback to defaults."""
+def get_addon_settings(project_name=None):
+    """Get Review Submitter addon settings with fallback to defaults.
+
+    Project settings are kept in the shared settings cache.
+    """
     try:
-        from ayon_core.addon import AddonsManager
         from ayon_core.pipeline import get_current_project_name
 
-        manager = AddonsManager()
-        addon = manager.get("review_submitter")
-
-        if not addon:
-            print("Review Submitter addon not found in AddonsManager")
-            return _get_default_settings()
-
-        project_name = get_current_project_name()
+        project_name = project_name or get_current_project_name()
         if not project_name:
             print("No current project name found")
             return _get_default_settings()
 
-        # Get project settings
-        settings = addon.get_project_settings(project_name)
+        settings = SETTINGS_CACHE.get(project_name)
+        if settings is None:
+            try:
+                with SETTINGS_FETCH_DURATION.time():
+                    settings = _fetch_project_settings(project_name)
+            except Exception:
+                SETTINGS_FETCHES.inc(result="error")
+                raise
+            if settings is None:
+                SETTINGS_FETCHES.inc(result="default")
+                return _get_default_settings()
+            SETTINGS_FETCHES.inc(result="ok")
+            SETTINGS_CACHE.set(project_name, settings)
 
         return settings
 
@@ -34,6 +43,21 @@ def get_addon_settings():
         return _get_default_settings()
 
 
+def _fetch_project_settings(project_name):
+    """Fetch project settings of the addon from the server.
+
+    Settings are read through ayon_api directly, creating an AddonsManager
+    would initialize and connect every addon again, including the warm-up,
+    event and metrics threads of this addon.
+    """
+    import ayon_api
+    from ..version import __version__
+
+    return ayon_api.get_addon_project_settings(
+        "review_submitter", __version__, project_name
+    )
+
+
 def _get_default_settings():
     """Return default settings as fallback."""
     print("[SETTINGS] Using default fallback settings")
@@ -51,7 +75,49 @@ def _get_default_settings():
             "auto_submit_on_publish": False,
             "default_reviewers": [],
             "require_comment": True,
-            "submission_types": ["WIP", "FINAL", "PACKAGE"]
+            "submission_types": ["WIP", "FINAL", "PACKAGE"],
+            "detect_identical_resubmissions": False,
+            "attach_contact_sheet": False,
+            "contact_sheet_frames": 12,
+            "contact_sheet_columns": 4,
+            "contact_sheet_tile_width": 320,
+            "attach_annotated_frames": False,
+            "max_annotated_frames": 20
+        },
+        "stack_settings": {
+            "layout_mode": "packed",
+            "layout_page_size": 16,
+            "max_loaded_pages": 2,
+            "memory_budget_enabled": False,
+            "rv_cache_budget_mb": 4096,
+            "compare_generations": 1,
+            "changed_frame_analysis": False,
+            "analysis_proxy_width": 256,
+            "changed_frame_threshold": 0.02,
+            "analysis_workers": 4,
+            "proxies_enabled": False,
+            "proxy_width": 1024,
+            "proxy_extensions": [".exr", ".dpx"],
+            "proxy_backend": "ffmpeg",
+            "frame_warm_up": False,
+            "warm_up_max_frames": 48,
+            "warm_up_readers": 4
+        },
+        "performance": {
+            "warm_up_on_launch": False,
+            "warm_up_delay": 2.0,
+            "chunked_uploads": False,
+            "upload_chunk_size_mb": 4,
+            "upload_max_retries": 5,
+            "media_cache_enabled": False,
+            "media_cache_dir": "",
+            "media_cache_size_gb": 100,
+            "event_invalidation": False,
+            "event_poll_interval": 5.0,
+            "event_cache_ttl": 3600,
+            "metrics_enabled": False,
+            "metrics_dir": "",
+            "metrics_flush_interval": 30.0
         }
     }
 
@@ -75,3 +141,17 @@ def get_submission_settings():
     settings = get_addon_settings()
     submission = settings.get("submission", {})
     return submission
+
+
+def get_stack_settings():
+    """Get OpenRV stack settings."""
+    settings = get_addon_settings()
+    stack_settings = settings.get("stack_settings", {})
+    return stack_settings
+
+
+def get_performance_settings():
+    """Get performance settings."""
+    settings = get_addon_settings()
+    performance = settings.get("performance", {})
+    return performance
@@ -0,0 +1,139 @@
+"""Persistent cache of last submissions keyed by task."""
+import json
+import os
+import sqlite3
+import threading
+
+import ayon_api
+
+from .cache_helper import TTLCache, get_cache_dir
+
+# Seconds a verified entry is trusted without asking the server again
+VERIFY_TTL = 30
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS last_submissions (
+    project_name TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    updated_at TEXT,
+    summary TEXT NOT NULL,
+    PRIMARY KEY (project_name, task_id)
+)
+"""
+
+
+def summarize_task_data(task_data):
+    """Compact summary of submissions stored in task data.
+
+    Returns:
+        list[dict]: Loaded products of each submission, newest first, with
+            only the keys needed for comparison.
+    """
+    submissions = [task_data.get("submission_data") or {}]
+    submissions.extend(task_data.get("submission_history") or [])
+    summary = []
+    for submission in submissions:
+        products = {}
+        for product_id, product_data in (submission.get("loaded_products") or {}).items():
+            products[product_id] = {
+                key: product_data[key]
+                for key in ("version_id", "version_name", "representation_id")
+                if key in product_data
+            }
+        summary.append(products)
+    return summary
+
+
+class SubmissionCache:
+    """SQLite store of task id -> summary of its last submissions.
+
+    Entries are written from our own submissions and from full task fetches.
+    Before an entry is used, the task 'updatedAt' is compared with the
+    server, which only queries two fields, so the task data blob is
+    downloaded only when the task really changed.
+    """
+
+    _verified = TTLCache("submission_checks", ttl=VERIFY_TTL)
+    _lock = threading.Lock()
+    _initialized = False
+
+    @classmethod
+    def _connect(cls):
+        connection = sqlite3.connect(os.path.join(get_cache_dir(), "submissions.sqlite"), timeout=10)
+        if not cls._initialized:
+            with cls._lock:
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute(_SCHEMA)
+                connection.commit()
+                cls._initialized = True
+        return connection
+
+    @classmethod
+    def _read(cls, project_name, task_id):
+        connection = cls._connect()
+        try:
+            row = connection.execute(
+                "SELECT updated_at, summary FROM last_submissions WHERE project_name = ? AND task_id = ?",
+                (project_name, task_id)
+            ).fetchone()
+        finally:
+            connection.close()
+        if row is None:
+            return None, None
+        return row[0], json.loads(row[1])
+
+    @classmethod
+    def store(cls, project_name, task_id, task_data, updated_at):
+        """Store summary of task data with task 'updatedAt'"""
+        summary = summarize_task_data(task_data)
+        connection = cls._connect()
+        try:
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO last_submissions VALUES (?, ?, ?, ?)",
+                    (project_name, task_id, updated_at, json.dumps(summary, separators=(",", ":")))
+                )
+        finally:
+            connection.close()
+        cls._verified.set((project_name, task_id), summary)
+        return summary
+
+    @classmethod
+    def invalidate(cls, project_name, task_id):
+        cls._verified.invalidate((project_name, task_id))
+
+    @staticmethod
+    def _get_updated_at(project_name, task_id):
+        tasks = list(ayon_api.get_tasks(project_name, task_ids=[task_id], fields={"id", "updatedAt"}))
+        return tasks[0].get("updatedAt") if tasks else None
+
+    @classmethod
+    def get_submissions(cls, project_name, task_id):
+        """Summary of last submissions of task, newest first.
+
+        Returns:
+            list[dict]: Loaded products by product id for each submission.
+        """
+        key = (project_name, task_id)
+        summary = cls._verified.get(key)
+        if summary is not None:
+            return summary
+
+        updated_at, summary = cls._read(project_name, task_id)
+        remote_updated_at = cls._get_updated_at(project_name, task_id)
+        if summary is not None and updated_at and updated_at == remote_updated_at:
+            cls._verified.set(key, summary)
+            return summary
+
+        task = ayon_api.get_task_by_id(project_name, task_id, fields={"id", "data", "updatedAt"})
+        if not task:
+            return []
+        return cls.store(project_name, task_id, task.get("data") or {}, task.get("updatedAt"))
+
+    @classmethod
+    def record_submission(cls, project_name, task_id, task_data):
+        """Store task data written by our own submission"""
+        try:
+            cls.store(project_name, task_id, task_data, cls._get_updated_at(project_name, task_id))
+        except Exception as e:
+            print(f"Could not cache submission of task {task_id}: {e}")
@@ -0,0 +1,539 @@
+"""Review submission requests shared by RV and headless submitters.
+
+Nothing in here imports Qt or RV, so it can run on a farm post-job as well
+as on a background thread inside RV.
+"""
+import os
+import hashlib
+import mimetypes
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from ayon_api import (
+    get_server_api_connection,
+    RequestTypes,
+    get_task_by_id,
+    update_task,
+    get_representation_by_id,
+    get_representations,
+    get_version_by_id,
+    get_product_by_id
+)
+from ayon_api.operations import OperationsSession
+from ayon_core.pipeline.load import get_representation_path
+from ayon_core.lib.transcoding import IMAGE_EXTENSIONS, VIDEO_EXTENSIONS
+from .settings_helper import (
+    get_submission_settings,
+    get_performance_settings,
+    get_stack_settings
+)
+from .cache_helper import get_cached_folder, get_cached_tasks
+from .submission_cache import SubmissionCache
+from .media_helper import convert_image, extract_frame
+from .metrics import (
+    SUBMISSIONS,
+    SUBMISSION_DURATION,
+    UPLOAD_BYTES,
+    track_api_call,
+    track_operation
+)
+from ..version import __version__
+from ..constants import (
+    SUBMISSION_HISTORY_LIMIT,
+    REPRESENTATION_PATH_FIELDS,
+    VERSION_MEDIA_FIELDS,
+    VERSION_SUMMARY_FIELDS,
+    PRODUCT_SUMMARY_FIELDS
+)
+
+# Serialize read-modify-write of task data per task
+_task_locks = {}
+_task_locks_lock = threading.Lock()
+
+
+def _get_task_lock(task_id):
+    with _task_locks_lock:
+        return _task_locks.setdefault(task_id, threading.Lock())
+
+
+def build_activity_message(review_data, unchanged_products=None):
+    """Build activity comment body with priority marker and user tags.
+
+    Args:
+        review_data (dict): Reviewers, priority and comment.
+        unchanged_products (Optional[list[str]]): Products without pixel
+            changes since the last submission, noted for the reviewers.
+    """
+    reviewers = review_data.get("reviewers") or [review_data["reviewer"]]
+
+    message = review_data["comment"]
+    if review_data["is_high_priority"]:
+        message = f"🔥 HIGH PRIORITY: {message}"
+    for reviewer in reviewers:
+        if reviewer:
+            message += f" [{reviewer}](user:{reviewer})"
+    if unchanged_products:
+        message += f"\n\nNo pixel changes since last submission: {', '.join(unchanged_products)}"
+    return message
+
+
+def upload_chunked(project_name, filepath, finalize_payload, performance_settings):
+    """Upload file in resumable chunks through the server addon"""
+    from .upload_helper import ChunkedUploader, get_addon_endpoint_url, get_auth_headers
+
+    def _report_progress(sent, total):
+        print(f"Uploading {os.path.basename(filepath)}: {sent * 100 // max(total, 1)}%")
+
+    uploader = ChunkedUploader(
+        get_addon_endpoint_url(f"projects/{project_name}/uploads"),
+        headers=get_auth_headers(),
+        chunk_size=performance_settings.get("upload_chunk_size_mb", 4) * 1024 * 1024,
+        max_retries=performance_settings.get("upload_max_retries", 5),
+        progress_callback=_report_progress
+    )
+    return uploader.upload(filepath, finalize_payload=finalize_payload)
+
+
+def _post_thumbnail(endpoint, thumbnail_path, mime_type):
+    """Upload thumbnail file to endpoint and return the thumbnail id"""
+    response = get_server_api_connection().upload_file(
+        endpoint,
+        thumbnail_path,
+        request_type=RequestTypes.post,
+        headers={"Content-Type": mime_type}
+    )
+    response.raise_for_status()
+    return response.json()["id"]
+
+
+def upload_thumbnail_to_version(project_name, version_id, thumbnail_path):
+    """Upload thumbnail to AYON server and set it for version.
+
+    Falls back to the core thumbnails endpoint when the server addon
+    endpoint is missing or fails, tiers of such thumbnails are derived on
+    their first request.
+    """
+    try:
+        with open(thumbnail_path, "rb") as stream:
+            mime_type = "image/png"
+            if thumbnail_path.endswith((".jpg", ".jpeg")):
+                if b"\xff\xd8\xff" == stream.read(3):
+                    mime_type = "image/jpeg"
+                stream.seek(0)
+
+        performance_settings = get_performance_settings()
+        try:
+            if performance_settings.get("chunked_uploads", False):
+                with track_api_call("upload_thumbnail_chunked"):
+                    thumbnail_id = upload_chunked(
+                        project_name,
+                        thumbnail_path,
+                        {"target": "thumbnail", "content_type": mime_type},
+                        performance_settings
+                    )["id"]
+            else:
+                # The addon endpoint also derives resolution tiers of the thumbnail
+                with track_api_call("upload_thumbnail"):
+                    thumbnail_id = _post_thumbnail(
+                        f"addons/review_submitter/{__version__}/projects/{project_name}/thumbnails",
+                        thumbnail_path,
+                        mime_type
+                    )
+        except Exception as e:
+            print(f"Addon thumbnail upload failed, using core thumbnails endpoint: {e}")
+            with track_api_call("upload_thumbnail_core"):
+                thumbnail_id = _post_thumbnail(
+                    f"projects/{project_name}/thumbnails", thumbnail_path, mime_type)
+        UPLOAD_BYTES.inc(os.path.getsize(thumbnail_path), kind="thumbnail")
+
+        op_session = OperationsSession()
+        op_session.update_entity(
+            project_name,
+            "version",
+            version_id,
+            {"thumbnailId": thumbnail_id}
+        )
+        with track_api_call("update_version_thumbnail"):
+            op_session.commit()
+        return True
+    except Exception as e:
+        print(f"Failed to upload thumbnail: {e}")
+        return False
+
+
+def upload_activity_file(project_name, filepath):
+    """Upload file to be attached to an activity, returns file id.
+
+    With chunked uploads enabled the file is sent in resumable chunks, if
+    that fails, e.g. on a server without local project storage, it is sent
+    in one request to the core files endpoint.
+    """
+    mime_type = mimetypes.guess_type(filepath)[0] or "application/octet-stream"
+    performance_settings = get_performance_settings()
+    if performance_settings.get("chunked_uploads", False):
+        try:
+            with track_api_call("upload_activity_file_chunked"):
+                file_id = upload_chunked(
+                    project_name,
+                    filepath,
+                    {
+                        "target": "activity_file",
+                        "content_type": mime_type,
+                        "filename": os.path.basename(filepath)
+                    },
+                    performance_settings
+                )["id"]
+            UPLOAD_BYTES.inc(os.path.getsize(filepath), kind="activity_file")
+            return file_id
+        except Exception as e:
+            print(f"Chunked upload of {filepath} failed, using core files endpoint: {e}")
+
+    conn = get_server_api_connection()
+    with track_api_call("upload_activity_file"):
+        response = conn.upload_file(
+            f"projects/{project_name}/files",
+            filepath,
+            request_type=RequestTypes.post,
+            headers={
+                "Content-Type": mime_type,
+                "x-file-name": os.path.basename(filepath)
+            }
+        )
+        response.raise_for_status()
+    UPLOAD_BYTES.inc(os.path.getsize(filepath), kind="activity_file")
+    return response.json()["id"]
+
+
+def _get_resolution(version):
+    attrib = version.get("attrib") or {}
+    if attrib.get("resolutionWidth") and attrib.get("resolutionHeight"):
+        return attrib["resolutionWidth"], attrib["resolutionHeight"]
+    return None
+
+
+def start_contact_sheet(project_name, representation_id):
+    """Build contact sheet of viewed representation in the media process pool.
+
+    Returns:
+        concurrent.futures.Future: Resolves to the sheet path, cached by
+            representation id.
+    """
+    from .contact_sheet import submit_contact_sheet
+    from .memory_budget import get_frame_count
+
+    submission_settings = get_submission_settings()
+    representation = get_representation_by_id(
+        project_name, representation_id, fields=REPRESENTATION_PATH_FIELDS | {"files"})
+    version = get_version_by_id(project_name, representation["versionId"], fields=VERSION_MEDIA_FIELDS)
+
+    return submit_contact_sheet(
+        representation_id,
+        get_representation_path(representation),
+        get_frame_count({"representation": representation, "version": version}),
+        _get_resolution(version),
+        frames=submission_settings.get("contact_sheet_frames", 12),
+        columns=submission_settings.get("contact_sheet_columns", 4),
+        tile_width=submission_settings.get("contact_sheet_tile_width", 320),
+        max_workers=get_stack_settings().get("analysis_workers", 4)
+    )
+
+
+def prepare_attachments(project_name, version_id, submission_context):
+    """Upload optional activity attachments, returns file ids.
+
+    The contact sheet is built in the media process pool while annotated
+    frames are converted and uploaded, its upload waits for the build.
+    """
+    submission_settings = get_submission_settings()
+    file_ids = []
+
+    sheet_future = None
+    representation_id = submission_context.get("view_representation_id")
+    if submission_settings.get("attach_contact_sheet", False) and representation_id:
+        try:
+            sheet_future = start_contact_sheet(project_name, representation_id)
+        except Exception as e:
+            print(f"Failed to attach contact sheet: {e}")
+
+    for png_path in submission_context.get("annotated_frame_paths", []):
+        try:
+            jpeg_path = convert_image(png_path, os.path.splitext(png_path)[0] + ".jpg")
+            file_ids.append(upload_activity_file(project_name, jpeg_path))
+            os.remove(jpeg_path)
+            os.remove(png_path)
+        except Exception as e:
+            print(f"Failed to attach annotated frame {png_path}: {e}")
+
+    if sheet_future is not None:
+        try:
+            file_ids.insert(0, upload_activity_file(project_name, sheet_future.result()))
+        except Exception as e:
+            print(f"Failed to attach contact sheet: {e}")
+
+    return file_ids
+
+
+def add_to_reviewer_inbox(project_name, submission_id, version_id, task_id, review_data, submitter_name):
+    """Index submission in the server addon inbox of its reviewers.
+
+    Failures are only reported, the activity already reached the reviewers.
+    """
+    reviewers = [reviewer for reviewer in review_data.get("reviewers") or [review_data["reviewer"]] if reviewer]
+    if not reviewers:
+        return False
+    conn = get_server_api_connection()
+    try:
+        with track_api_call("add_inbox_submission"):
+            response = conn.post(
+                f"addons/review_submitter/{__version__}/projects/{project_name}/inbox",
+                submission_id=submission_id,
+                reviewers=reviewers,
+                version_id=version_id,
+                task_id=task_id,
+                submission_type=review_data["submission_type"],
+                high_priority=bool(review_data.get("is_high_priority")),
+                submitter=submitter_name,
+                comment=review_data.get("comment", "")
+            )
+            response.raise_for_status()
+        return True
+    except Exception as e:
+        print(f"Failed to add submission to reviewer inbox: {e}")
+        return False
+
+
+def _get_context_task_id(project_name, submission_context):
+    """Task of submission, explicit id or host folder path and task name"""
+    if submission_context.get("task_id"):
+        return submission_context["task_id"]
+
+    task_name = submission_context.get("task_name")
+    if not task_name:
+        return None
+    folder = get_cached_folder(project_name, submission_context.get("folder_path"))
+    if not folder:
+        return None
+    tasks = get_cached_tasks(project_name, folder["id"], [task_name])
+    return tasks[0]["id"] if tasks else None
+
+
+def get_submission_id(version_id, submission_context):
+    """Stable id of a submission request.
+
+    Derived from version, task context, submitter and the client-side
+    request time, so every retry of one request sends the same id and the
+    reviewer inbox does not get duplicates.
+    """
+    key = "|".join(str(part) for part in (
+        submission_context.get("project_name"),
+        version_id,
+        submission_context.get("task_id")
+        or f"{submission_context.get('folder_path')}/{submission_context.get('task_name')}",
+        submission_context.get("submitter_name"),
+        submission_context["requested_at"]
+    ))
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def submit_review(version_id, review_data, submission_context):
+    """Create activity, upload thumbnail and store submission data.
+
+    The submission id is created on the first call and kept in
+    'submission_context', so retrying with the same context reuses it.
+
+    Args:
+        version_id (str): Reviewed version.
+        review_data (dict): Reviewer, submission type, priority and comment.
+        submission_context (dict): Project, task, thumbnail, attachments and
+            loaded products collected by the caller. Optional 'source'
+            labels the submission in metrics, optional 'requested_at' is
+            the time the submission was requested.
+    """
+    if not submission_context.get("submitter_name"):
+        submission_context["submitter_name"] = os.environ.get("USERNAME")
+    submission_context.setdefault("requested_at", datetime.now().isoformat())
+    submission_context.setdefault(
+        "submission_id", get_submission_id(version_id, submission_context))
+    try:
+        with track_operation(
+            SUBMISSIONS, SUBMISSION_DURATION, source=submission_context.get("source", "rv")
+        ):
+            _send_review(version_id, review_data, submission_context)
+    finally:
+        # Annotated frames are exported to a temporary directory per submission
+        frame_paths = submission_context.get("annotated_frame_paths", [])
+        for frame_dir in {os.path.dirname(path) for path in frame_paths}:
+            shutil.rmtree(frame_dir, ignore_errors=True)
+
+
+def _send_review(version_id, review_data, submission_context):
+    conn = get_server_api_connection()
+    project_name = submission_context["project_name"]
+
+    file_ids = prepare_attachments(project_name, version_id, submission_context)
+
+    with track_api_call("create_activity"):
+        conn.create_activity(
+            project_name=project_name,
+            entity_type="version",
+            entity_id=version_id,
+            activity_type="comment",
+            body=build_activity_message(review_data, submission_context.get("unchanged_products")),
+            file_ids=file_ids or None
+        )
+
+    thumbnail_path = submission_context.get("thumbnail_path")
+    if thumbnail_path:
+        upload_thumbnail_to_version(project_name, version_id, thumbnail_path)
+        try:
+            os.remove(thumbnail_path)
+        except:
+            pass
+
+    task_id = _get_context_task_id(project_name, submission_context)
+    submitter_name = submission_context["submitter_name"]
+    submission_id = submission_context["submission_id"]
+    add_to_reviewer_inbox(project_name, submission_id, version_id, task_id, review_data, submitter_name)
+    if not task_id:
+        return
+
+    submission_data = {
+        "submission_id": submission_id,
+        "submission_type": review_data["submission_type"],
+        "reviewer_name": review_data["reviewer"],
+        "submitter_name": submitter_name,
+        "workfile_version_id": version_id,
+        "submitted_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "unchanged_products": submission_context.get("unchanged_products", []),
+        "loaded_products": submission_context["loaded_products"]
+    }
+
+    with _get_task_lock(task_id):
+        with track_api_call("get_task"):
+            task = get_task_by_id(project_name, task_id, fields={"id", "data"})
+        task_data = task.get("data", {})
+
+        # Keep previous submissions for multi-generation comparison
+        history = task_data.get("submission_history", [])
+        if task_data.get("submission_data"):
+            history.insert(0, task_data["submission_data"])
+        task_data["submission_history"] = history[:SUBMISSION_HISTORY_LIMIT]
+        task_data["submission_data"] = submission_data
+        with track_api_call("update_task"):
+            update_task(project_name, task_id, data=task_data)
+        SubmissionCache.record_submission(project_name, task_id, task_data)
+
+
+def find_review_representation(project_name, version_id):
+    """Representation of version with reviewable media, None if missing.
+
+    Movies are preferred over image sequences, representations named
+    'thumbnail' are skipped.
+    """
+    media = []
+    for representation in get_representations(
+        project_name, version_ids=[version_id], fields=REPRESENTATION_PATH_FIELDS
+    ):
+        if representation["name"] == "thumbnail":
+            continue
+        ext = os.path.splitext(get_representation_path(representation))[1].lower()
+        if ext in VIDEO_EXTENSIONS:
+            return representation
+        if ext in IMAGE_EXTENSIONS:
+            media.append(representation)
+    return media[0] if media else None
+
+
+def extract_thumbnail_from_media(representation, width=None):
+    """Render first frame of representation to a temporary PNG"""
+    fd, thumbnail_path = tempfile.mkstemp(prefix="review_thumbnail_", suffix=".png")
+    os.close(fd)
+    try:
+        return extract_frame(get_representation_path(representation), thumbnail_path, width=width)
+    except Exception as e:
+        print(f"Failed to extract thumbnail from media: {e}")
+        os.remove(thumbnail_path)
+        return None
+
+
+def collect_headless_context(project_name, version_id, submitter_name=None, thumbnail=True):
+    """Submission context of a version without RV or a host context.
+
+    The version itself is stored as loaded product and its task receives
+    the submission data.
+    """
+    version = get_version_by_id(project_name, version_id, fields=VERSION_SUMMARY_FIELDS)
+    if not version:
+        raise ValueError(f"Version '{version_id}' not found in project '{project_name}'")
+    product = get_product_by_id(project_name, version["productId"], fields=PRODUCT_SUMMARY_FIELDS)
+
+    representation = find_review_representation(project_name, version_id)
+    loaded_product = {
+        "version_id": version_id,
+        "version_name": version["name"],
+        "product_name": product["name"],
+        "product_type": product["productType"]
+    }
+    thumbnail_path = None
+    if representation:
+        loaded_product["representation_id"] = representation["id"]
+        if thumbnail:
+            thumbnail_path = extract_thumbnail_from_media(representation)
+
+    return {
+        "project_name": project_name,
+        "source": "headless",
+        "task_id": version.get("taskId"),
+        "submitter_name": submitter_name,
+        "thumbnail_path": thumbnail_path,
+        "view_representation_id": representation["id"] if representation else None,
+        "annotated_frame_paths": [],
+        "loaded_products": {version["productId"]: loaded_product}
+    }
+
+
+def submit_versions(
+    project_name,
+    version_ids,
+    review_data,
+    max_workers=4,
+    submitter_name=None,
+    thumbnail=True
+):
+    """Submit many versions for review concurrently without any UI.
+
+    Args:
+        project_name (str): Project of the versions.
+        version_ids (list[str]): Versions to submit.
+        review_data (dict): Review data used for every version.
+        max_workers (int): Versions submitted at the same time.
+        submitter_name (Optional[str]): Stored as submitter in task data.
+        thumbnail (bool): Render thumbnails from the version media.
+
+    Returns:
+        dict[str, Optional[str]]: Error message by version id, None when
+            the version was submitted.
+    """
+    def _submit(version_id):
+        submission_context = collect_headless_context(
+            project_name, version_id, submitter_name, thumbnail)
+        submit_review(version_id, review_data, submission_context)
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ReviewSubmit") as executor:
+        futures = {
+            executor.submit(_submit, version_id): version_id
+            for version_id in dict.fromkeys(version_ids)
+        }
+        for future in as_completed(futures):
+            version_id = futures[future]
+            try:
+                future.result()
+                results[version_id] = None
+                print(f"Review submitted for version {version_id}")
+            except Exception as e:
+                results[version_id] = str(e)
+                print(f"Review submission of version {version_id} failed: {e}")
+    return results
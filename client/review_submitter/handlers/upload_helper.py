@@ -0,0 +1,169 @@
+"""Chunked, resumable uploads through the server addon upload endpoints."""
+import hashlib
+import os
+import time
+
+import requests
+
+from ..version import __version__
+from .metrics import UPLOAD_RETRIES
+
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+class UploadError(Exception):
+    """File cannot be uploaded or the upload failed within the retry limit."""
+
+
+def get_addon_endpoint_url(path):
+    """Full URL of a review_submitter server addon endpoint"""
+    server_url = os.environ.get("AYON_SERVER_URL", "").rstrip("/")
+    return f"{server_url}/api/addons/review_submitter/{__version__}/{path.lstrip('/')}"
+
+
+def get_auth_headers():
+    api_key = os.environ.get("AYON_API_KEY", "")
+    if not api_key:
+        raise UploadError("Missing AYON_API_KEY environment variable")
+    return {"Authorization": f"Bearer {api_key}"}
+
+
+class ChunkedUploader:
+    """Upload a file in fixed-size chunks and resume after failures.
+
+    Only one chunk is held in memory at a time. After a failed request the
+    uploader asks the server for the last acknowledged offset and continues
+    from there, so a broken connection never restarts the whole file.
+
+    Protocol of the upload endpoints:
+        GET   {base_url}/{upload_id}           -> {"offset": int, "size": int},
+                                                  404 when nothing was staged
+        PATCH {base_url}/{upload_id}           chunk body with 'Upload-Offset'
+                                                  and 'Upload-Length' headers
+                                                  -> {"offset": int}, 409 with
+                                                  the staged offset on mismatch
+        POST  {base_url}/{upload_id}/finalize  JSON payload -> JSON result
+
+    Args:
+        base_url (str): URL of the uploads collection.
+        headers (Optional[dict]): Extra headers, e.g. authorization.
+        chunk_size (int): Bytes sent per request.
+        max_retries (int): Consecutive failures before giving up.
+        retry_delay (float): First retry delay, doubled on each retry.
+        progress_callback (Optional[Callable[[int, int], None]]): Called with
+            acknowledged bytes and total size after each chunk.
+        timeout (float): Timeout of one request in seconds.
+    """
+
+    def __init__(
+        self,
+        base_url,
+        headers=None,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        max_retries=5,
+        retry_delay=1.0,
+        progress_callback=None,
+        timeout=60
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.headers = dict(headers or {})
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.progress_callback = progress_callback
+        self.timeout = timeout
+
+    @staticmethod
+    def get_upload_id(filepath):
+        """Stable id of a file so a restarted upload resumes"""
+        stat = os.stat(filepath)
+        key = f"{os.path.abspath(filepath)}|{stat.st_size}|{stat.st_mtime_ns}"
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+    def get_offset(self, upload_id):
+        """Bytes of upload already acknowledged by the server"""
+        response = requests.get(
+            f"{self.base_url}/{upload_id}",
+            headers=self.headers,
+            timeout=self.timeout
+        )
+        if response.status_code == 404:
+            return 0
+        response.raise_for_status()
+        return response.json()["offset"]
+
+    def upload(self, filepath, upload_id=None, finalize_payload=None):
+        """Upload file and finalize it.
+
+        Returns:
+            dict: Response of the finalize request.
+
+        Raises:
+            UploadError: File is empty or the upload failed.
+        """
+        size = os.path.getsize(filepath)
+        if not size:
+            raise UploadError(f"Cannot upload empty file {filepath}")
+        upload_id = upload_id or self.get_upload_id(filepath)
+
+        offset = None
+        failures = 0
+        with open(filepath, "rb") as stream:
+            while offset is None or offset < size:
+                try:
+                    if offset is None:
+                        offset = self.get_offset(upload_id)
+                        if offset >= size:
+                            break
+                    stream.seek(offset)
+                    offset = self._send_chunk(upload_id, offset, size, stream.read(self.chunk_size))
+                    failures = 0
+                except (requests.RequestException, KeyError, ValueError) as e:
+                    failures += 1
+                    UPLOAD_RETRIES.inc()
+                    if failures > self.max_retries:
+                        raise UploadError(f"Upload of {filepath} failed: {e}")
+                    time.sleep(self.retry_delay * 2 ** (failures - 1))
+                    # Resume from the last acknowledged chunk
+                    offset = None
+                    continue
+
+                if self.progress_callback:
+                    self.progress_callback(offset, size)
+
+        return self._finalize(upload_id, finalize_payload or {})
+
+    def _send_chunk(self, upload_id, offset, size, chunk):
+        headers = dict(self.headers)
+        headers.update({
+            "Content-Type": "application/offset+octet-stream",
+            "Upload-Offset": str(offset),
+            "Upload-Length": str(size)
+        })
+        response = requests.patch(
+            f"{self.base_url}/{upload_id}",
+            data=chunk,
+            headers=headers,
+            timeout=self.timeout
+        )
+        if response.status_code == 409:
+            # Server has a different offset, continue from there
+            return response.json()["offset"]
+        response.raise_for_status()
+        return response.json()["offset"]
+
+    def _finalize(self, upload_id, payload):
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = requests.post(
+                    f"{self.base_url}/{upload_id}/finalize",
+                    json=payload,
+                    headers=self.headers,
+                    timeout=self.timeout
+                )
+                response.raise_for_status()
+                return response.json()
+            except requests.RequestException as e:
+                if attempt == self.max_retries:
+                    raise UploadError(f"Finalizing upload {upload_id} failed: {e}")
+                time.sleep(self.retry_delay * 2 ** attempt)
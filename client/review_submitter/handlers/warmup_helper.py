@@ -0,0 +1,67 @@
+"""Background warm-up of shared caches on host launch."""
+import os
+import threading
+
+# Hosts in which the addon warms up caches on launch
+WARM_UP_HOSTS = {"openrv"}
+
+
+def warm_up_caches(project_name, folder_path=None, task_name=None):
+    """Resolve settings, reviewers and current folder/tasks into caches.
+
+    Each step is independent, a failing step does not stop the others.
+    """
+    from .settings_helper import get_addon_settings
+    from .cache_helper import USERS_CACHE, get_cached_folder, get_cached_tasks
+
+    def _resolve_reviewers():
+        from .review_submission_handler import ReviewSubmissionDialog
+
+        USERS_CACHE.get_or_fetch("names", ReviewSubmissionDialog._query_user_names)
+
+    def _resolve_context():
+        if not folder_path:
+            return
+        folder = get_cached_folder(project_name, folder_path)
+        if folder:
+            get_cached_tasks(project_name, folder["id"])
+
+    steps = (
+        lambda: get_addon_settings(project_name),
+        _resolve_reviewers,
+        _resolve_context,
+    )
+    for step in steps:
+        try:
+            step()
+        except Exception as e:
+            print(f"[WARM-UP] Step failed: {e}")
+
+
+def start_warm_up(delay=2.0):
+    """Start warm-up for current host context on a daemon thread.
+
+    The start is delayed so the host finishes its own startup first.
+
+    Returns:
+        threading.Timer or None: Started timer, None if there is no context
+            to warm up.
+    """
+    host_name = os.environ.get("AYON_HOST_NAME")
+    project_name = os.environ.get("AYON_PROJECT_NAME")
+    if host_name not in WARM_UP_HOSTS or not project_name:
+        return None
+
+    timer = threading.Timer(
+        delay,
+        warm_up_caches,
+        args=(
+            project_name,
+            os.environ.get("AYON_FOLDER_PATH"),
+            os.environ.get("AYON_TASK_NAME"),
+        )
+    )
+    timer.name = "ReviewSubmitterWarmUp"
+    timer.daemon = True
+    timer.start()
+    return timer
@@ -1,33 +1,55 @@
 import os
 import pyblish.api
-from qtpy import QtWidgets
 
 
 class IntegrateReviewPrompt(pyblish.api.ContextPlugin):
-    """Prompt for review submission after successful publish"""
+    """Prompt for review submission after successful publish
+
+    The dialog is deferred to the Qt event loop and shown non-modal, so the
+    publish does not wait for the artist. With 'auto_submit_on_publish'
+    enabled the review goes to the default reviewers on a background thread
+    without any UI.
+    """
 
     order = pyblish.api.IntegratorOrder + 10
     label = "Review Submission Prompt"
     hosts = ["openrv"]
     optional = True
 
+    # Keep non-modal dialogs alive until they are closed
+    _open_dialogs = []
+
     def process(self, context):
-        """Show review dialog if user opted for review"""
+        """Submit or prompt for review if user opted for review"""
         if not os.environ.get("AYON_PUBLISH_FOR_REVIEW"):
             return
 
+        from review_submitter.handlers.metrics import PUBLISH_PROMPTS
+
         if self._has_errors(context):
             self.log.info("Publish had errors, skipping review submission")
+            PUBLISH_PROMPTS.inc(action="skipped_errors")
             os.environ.pop("AYON_PUBLISH_FOR_REVIEW", None)
             return
 
         version_id = self._get_version_id(context)
         if not version_id:
             self.log.warning("No version_id found, skipping review submission")
+            PUBLISH_PROMPTS.inc(action="skipped_no_version")
             os.environ.pop("AYON_PUBLISH_FOR_REVIEW", None)
             return
 
-        self._show_review_dialog(version_id)
+        from review_submitter.handlers.settings_helper import get_submission_settings
+
+        submission_settings = get_submission_settings()
+        if (
+            submission_settings.get("auto_submit_on_publish", False)
+            and self._auto_submit(version_id)
+        ):
+            PUBLISH_PROMPTS.inc(action="auto_submit")
+        else:
+            self._defer_review_dialog(version_id)
+            PUBLISH_PROMPTS.inc(action="dialog")
         os.environ.pop("AYON_PUBLISH_FOR_REVIEW", None)
 
     def _has_errors(self, context):
@@ -45,14 +67,49 @@ class IntegrateReviewPrompt(pyblish.api.ContextPlugin):
                 return version_entity.get("id")
         return None
 
-    def _show_review_dialog(self, version_id):
-        """Show review submission dialog"""
+    def _auto_submit(self, version_id):
+        """Submit to default reviewers in background, False if not possible"""
+        from review_submitter.handlers import ReviewSubmissionHandler
+
+        review_data = ReviewSubmissionHandler.get_default_review_data()
+        if not review_data:
+            self.log.warning("Auto-submit is enabled but no default reviewers are set")
+            return False
+
+        ReviewSubmissionHandler.submit_in_background(version_id, review_data)
+        self.log.info(f"Submitting review to {', '.join(review_data['reviewers'])} in background")
+        return True
+
+    def _defer_review_dialog(self, version_id):
+        """Show review dialog once control returns to the event loop"""
+        from qtpy import QtCore
+
+        QtCore.QTimer.singleShot(0, lambda: self._show_review_dialog(version_id))
+
+    @classmethod
+    def _show_review_dialog(cls, version_id):
+        """Show non-modal review submission dialog"""
         from review_submitter.handlers import (
             ReviewSubmissionDialog,
             ReviewSubmissionHandler
         )
+        from review_submitter.handlers.settings_helper import get_submission_settings
+
+        notice = None
+        if get_submission_settings().get("detect_identical_resubmissions", False):
+            notice = ReviewSubmissionHandler.get_unchanged_products_notice()
 
-        dialog = ReviewSubmissionDialog()
-        if dialog.exec_() == QtWidgets.QDialog.Accepted:
+        dialog = ReviewSubmissionDialog(notice=notice)
+
+        def on_accepted():
             review_data = dialog.get_review_data()
             ReviewSubmissionHandler._create_version_activity(version_id, review_data)
+
+        def on_finished(_result):
+            if dialog in cls._open_dialogs:
+                cls._open_dialogs.remove(dialog)
+
+        dialog.accepted.connect(on_accepted)
+        dialog.finished.connect(on_finished)
+        cls._open_dialogs.append(dialog)
+        dialog.show()
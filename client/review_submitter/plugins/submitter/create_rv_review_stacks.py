@@ -1,5 +1,4 @@
 from ayon_core.pipeline import load
-from review_submitter.handlers import OpenRVStackHandler, ReviewSubmissionHandler
 
 
 class CreateRvReviewStack(load.ProductLoaderPlugin):
@@ -34,6 +33,9 @@ class CreateRvReviewStack(load.ProductLoaderPlugin):
         Returns:
             bool: True if successful, False otherwise
         """
+        # Deferred so plugin discovery does not import RV and ayon_api
+        from review_submitter.handlers import OpenRVStackHandler
+
         try:
             return OpenRVStackHandler.create_auto_stack(contexts)
         except Exception as e:
@@ -41,3 +43,41 @@ class CreateRvReviewStack(load.ProductLoaderPlugin):
             import traceback
             traceback.print_exc()
             return False
+
+
+
+class CreateRvDailiesPlaylist(load.ProductLoaderPlugin):
+    """Build a dailies playlist of per-shot comparison stacks in OpenRV.
+    Shots are sorted by folder path and become viewable as they load"""
+
+    label = "Create RV Dailies Playlist"
+    settings_category = "nuke"
+    product_types = {"render",
+                     "prerender",
+                     "plate",
+                     "package",
+                     "review"}
+
+    representations = {"*"}
+    order = -99
+    icon = "list"
+    color = "#00FF00"
+    is_multiple_contexts_compatible = True
+
+    tool_names = ["library_loader", "loader"]
+
+    def load(self, contexts, name=None, namespace=None, options=None):
+        """Start streaming the selected contexts into a playlist.
+
+        Returns:
+            bool: True if the playlist was started, False otherwise
+        """
+        from review_submitter.handlers import OpenRVStackHandler
+
+        try:
+            return OpenRVStackHandler.create_playlist(contexts)
+        except Exception as e:
+            print(f"Error during playlist creation: {e}")
+            import traceback
+            traceback.print_exc()
+            return False
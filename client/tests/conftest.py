@@ -0,0 +1,55 @@
+"""Stand-ins of host modules for tests importing the client package."""
+import os
+import sys
+import types
+
+import pytest
+
+CLIENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROOT_DIR = os.path.dirname(CLIENT_DIR)
+
+
+def stub_module(name, **attributes):
+    module = types.ModuleType(name)
+    module.__path__ = []
+    module.__dict__.update(attributes)
+    return module
+
+
+def install_stubs(monkeypatch, modules):
+    """Put stand-in modules into 'sys.modules' and link them to parents"""
+    for name, module in modules.items():
+        parent, _, child = name.rpartition(".")
+        if parent in modules:
+            setattr(modules[parent], child, module)
+        monkeypatch.setitem(sys.modules, name, module)
+
+
+@pytest.fixture
+def client_package(monkeypatch, tmp_path):
+    """Fresh 'review_submitter' import with 'ayon_core' and 'ayon_api' stand-ins.
+
+    Returns:
+        dict[str, types.ModuleType]: Installed stand-ins by name, tests add
+            the attributes they need.
+    """
+    for name in list(sys.modules):
+        if name == "review_submitter" or name.startswith("review_submitter."):
+            monkeypatch.delitem(sys.modules, name)
+    modules = {
+        "ayon_api": stub_module("ayon_api"),
+        "ayon_core": stub_module("ayon_core"),
+        "ayon_core.addon": stub_module(
+            "ayon_core.addon",
+            AYONAddon=type("AYONAddon", (), {}),
+            IHostAddon=type("IHostAddon", (), {}),
+            IPluginPaths=type("IPluginPaths", (), {}),
+        ),
+        "ayon_core.settings": stub_module(
+            "ayon_core.settings", get_project_settings=lambda *args: {}
+        ),
+    }
+    install_stubs(monkeypatch, modules)
+    monkeypatch.syspath_prepend(CLIENT_DIR)
+    monkeypatch.setenv("AYON_REVIEW_SUBMITTER_CACHE_DIR", str(tmp_path / "cache"))
+    return modules
@@ -0,0 +1,87 @@
+"""Resumable uploads against the local upload stand-in with injected failures."""
+import importlib
+import importlib.util
+import os
+import sys
+import threading
+
+import pytest
+
+from conftest import ROOT_DIR
+
+TOOLS_DIR = os.path.join(ROOT_DIR, "tools")
+
+
+@pytest.fixture
+def stand_in(monkeypatch, tmp_path):
+    """Start upload stand-in failing every third chunk, yields its store"""
+    monkeypatch.syspath_prepend(TOOLS_DIR)
+    monkeypatch.delitem(sys.modules, "upload_stand_in", raising=False)
+    upload_stand_in = importlib.import_module("upload_stand_in")
+
+    server = upload_stand_in.create_server(
+        "127.0.0.1", 0, str(tmp_path / "staging"), fail_every=3)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, upload_stand_in
+    server.shutdown()
+    server.server_close()
+
+
+def _uploader(client_package, server, **kwargs):
+    upload_helper = importlib.import_module("review_submitter.handlers.upload_helper")
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/projects/demo/uploads"
+    return upload_helper, upload_helper.ChunkedUploader(
+        base_url, chunk_size=64 * 1024, retry_delay=0, **kwargs)
+
+
+def test_upload_resumes_after_failed_chunks(client_package, stand_in, tmp_path):
+    server, upload_stand_in = stand_in
+    upload_helper, uploader = _uploader(client_package, server)
+    metrics = importlib.import_module("review_submitter.handlers.metrics")
+    source = tmp_path / "contact_sheet.jpg"
+    source.write_bytes(os.urandom(10 * 64 * 1024 + 123))
+
+    progress = []
+    uploader.progress_callback = lambda sent, total: progress.append(sent)
+    result = uploader.upload(
+        str(source),
+        finalize_payload={"target": "activity_file", "content_type": "image/jpeg"}
+    )
+
+    assert result["id"]
+    # Every third chunk request failed and was resumed from the staged offset
+    assert metrics.UPLOAD_RETRIES.samples()[()] >= 3
+    assert progress[-1] == source.stat().st_size
+    assert progress == sorted(progress)
+
+    upload_id = uploader.get_upload_id(str(source))
+    store = upload_stand_in.uploads.UploadStore(str(tmp_path / "staging"))
+    status = store.status("demo", upload_id)
+    assert status["result"] == result
+    assert status["offset"] == status["size"] == source.stat().st_size
+
+
+def test_repeated_upload_returns_first_result(client_package, stand_in, tmp_path):
+    server, _upload_stand_in = stand_in
+    upload_helper, uploader = _uploader(client_package, server)
+    source = tmp_path / "annotation.0001.png"
+    source.write_bytes(os.urandom(3 * 64 * 1024))
+
+    first = uploader.upload(str(source), finalize_payload={"target": "thumbnail"})
+    second = uploader.upload(str(source), finalize_payload={"target": "thumbnail"})
+    assert first == second
+
+
+def test_empty_and_unknown_targets_are_rejected(client_package, stand_in, tmp_path):
+    server, _upload_stand_in = stand_in
+    upload_helper, uploader = _uploader(client_package, server, max_retries=0)
+    empty = tmp_path / "empty.png"
+    empty.write_bytes(b"")
+    with pytest.raises(upload_helper.UploadError):
+        uploader.upload(str(empty))
+
+    source = tmp_path / "notes.txt"
+    source.write_bytes(b"notes")
+    with pytest.raises(upload_helper.UploadError):
+        uploader.upload(str(source), finalize_payload={"target": "workfile"})
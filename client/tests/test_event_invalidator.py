@@ -0,0 +1,174 @@
+"""Cache invalidation from project events fed by 'LocalEventSource'.
+
+'ayon_core' and 'ayon_api' are replaced by minimal stand-ins, events never
+reach a server.
+"""
+import importlib
+import os
+import sys
+import time
+import types
+from datetime import timedelta
+
+import pytest
+
+CLIENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_NAME = "demo"
+
+
+def _stub_module(name, **attributes):
+    module = types.ModuleType(name)
+    module.__path__ = []
+    module.__dict__.update(attributes)
+    return module
+
+
+def _stub_modules():
+    modules = {
+        "ayon_api": _stub_module("ayon_api"),
+        "ayon_core": _stub_module("ayon_core"),
+        "ayon_core.addon": _stub_module(
+            "ayon_core.addon",
+            AYONAddon=type("AYONAddon", (), {}),
+            IHostAddon=type("IHostAddon", (), {}),
+            IPluginPaths=type("IPluginPaths", (), {}),
+        ),
+        "ayon_core.settings": _stub_module(
+            "ayon_core.settings", get_project_settings=lambda *args: {}
+        ),
+    }
+    for name, module in modules.items():
+        parent, _, child = name.rpartition(".")
+        if parent:
+            setattr(modules[parent], child, module)
+    return modules
+
+
+class _FailingEventSource:
+    def get_events(self, project_name, newer_than, topics):
+        raise ConnectionError("Server not reachable")
+
+
+def _start(invalidator, source):
+    # Tests poll themselves, the thread only polls once on start
+    invalidator.start(PROJECT_NAME, source=source, interval=3600)
+    deadline = time.monotonic() + 5
+    while not invalidator._healthy and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def events(monkeypatch, tmp_path):
+    """Invalidator polling a local event source and the caches it invalidates"""
+    for name in list(sys.modules):
+        if name == "review_submitter" or name.startswith("review_submitter."):
+            monkeypatch.delitem(sys.modules, name)
+    for name, module in _stub_modules().items():
+        monkeypatch.setitem(sys.modules, name, module)
+    monkeypatch.syspath_prepend(CLIENT_DIR)
+    monkeypatch.setenv("AYON_REVIEW_SUBMITTER_CACHE_DIR", str(tmp_path))
+
+    invalidator = importlib.import_module("review_submitter.handlers.event_invalidator")
+    cache_helper = importlib.import_module("review_submitter.handlers.cache_helper")
+    submission_cache = importlib.import_module("review_submitter.handlers.submission_cache")
+
+    source = invalidator.LocalEventSource()
+    _start(invalidator.EventInvalidator, source)
+    yield types.SimpleNamespace(
+        module=invalidator,
+        source=source,
+        invalidator=invalidator.EventInvalidator,
+        entities=cache_helper.ENTITY_CACHE,
+        settings=cache_helper.SETTINGS_CACHE,
+        submissions=submission_cache.SubmissionCache,
+        long_ttl=invalidator.EventInvalidator.long_ttl,
+        default_ttl=cache_helper.DEFAULT_TTL,
+    )
+    invalidator.EventInvalidator.stop()
+
+
+def _fill(events):
+    events.entities.set(("folder", PROJECT_NAME, "/shots/sh010"), {"id": "folder1"})
+    events.entities.set(("tasks", PROJECT_NAME, "folder1"), [{"id": "task1"}])
+    events.entities.set(("tasks", PROJECT_NAME, "folder2"), [{"id": "task2"}])
+    events.entities.set(("tasks", "other", "folder1"), [{"id": "task3"}])
+    events.submissions._verified.set((PROJECT_NAME, "task1"), [])
+    events.settings.set(PROJECT_NAME, {"performance": {}})
+
+
+def test_task_event_drops_tasks_of_its_folder(events):
+    _fill(events)
+    events.source.emit(
+        "entity.task.data_changed", PROJECT_NAME,
+        {"entityId": "task1", "parentId": "folder1"}
+    )
+
+    assert events.invalidator.poll() == 1
+    assert events.entities.get(("tasks", PROJECT_NAME, "folder1")) is None
+    assert events.submissions._verified.get((PROJECT_NAME, "task1")) is None
+    assert events.entities.get(("tasks", PROJECT_NAME, "folder2")) is not None
+    assert events.entities.get(("tasks", "other", "folder1")) is not None
+    assert events.entities.get(("folder", PROJECT_NAME, "/shots/sh010")) is not None
+
+
+def test_folder_event_drops_folders_and_tasks_of_project(events):
+    _fill(events)
+    events.source.emit("entity.folder.renamed", PROJECT_NAME, {"entityId": "folder1"})
+
+    assert events.invalidator.poll() == 1
+    assert events.entities.get(("folder", PROJECT_NAME, "/shots/sh010")) is None
+    assert events.entities.get(("tasks", PROJECT_NAME, "folder2")) is None
+    assert events.entities.get(("tasks", "other", "folder1")) is not None
+
+
+def test_settings_event_of_other_addon_is_ignored(events):
+    _fill(events)
+    events.source.emit("settings.changed", PROJECT_NAME, {"addon_name": "other"})
+    events.invalidator.poll()
+    assert events.settings.get(PROJECT_NAME) is not None
+
+    events.source.emit("settings.changed", PROJECT_NAME, {"addon_name": "review_submitter"})
+    events.invalidator.poll()
+    assert events.settings.get(PROJECT_NAME) is None
+
+
+def test_events_are_handled_once(events):
+    events.source.emit("entity.task.status_changed", PROJECT_NAME, {"entityId": "task1"})
+    # Versions are not cache keys, their events are not fetched
+    events.source.emit("entity.version.created", PROJECT_NAME, {"parentId": "product1"})
+
+    assert events.invalidator.poll() == 1
+    # Events inside the cursor overlap are fetched again but not handled again
+    assert events.invalidator.poll() == 0
+
+
+def test_failed_polling_clears_caches_and_shortens_ttl(events):
+    assert events.entities.ttl == events.long_ttl
+    _fill(events)
+
+    events.invalidator._source = _FailingEventSource()
+    events.invalidator.poll()
+
+    assert events.entities.ttl == events.default_ttl
+    assert events.settings.ttl == events.default_ttl
+    assert events.entities.get(("tasks", PROJECT_NAME, "folder2")) is None
+    assert events.settings.get(PROJECT_NAME) is None
+
+
+def test_cursor_is_seeded_from_the_newest_server_event(events):
+    # Server clock runs ten minutes behind the local clock
+    source = events.module.LocalEventSource(clock_offset=timedelta(minutes=-10))
+    source.emit("entity.task.created", PROJECT_NAME, {"entityId": "task0", "parentId": "folder0"})
+    source.emit("entity.version.created", PROJECT_NAME, {"parentId": "product1"})
+    _start(events.invalidator, source)
+    assert events.invalidator._cursor == events.module._parse_timestamp(
+        source.get_latest_event(PROJECT_NAME, events.module.TOPICS)["createdAt"])
+
+    _fill(events)
+    source.emit("entity.task.data_changed", PROJECT_NAME, {"entityId": "task1", "parentId": "folder1"})
+    assert events.invalidator.poll() == 1
+    assert events.entities.get(("tasks", PROJECT_NAME, "folder1")) is None
+
+
+def test_cursor_of_project_without_events_starts_at_epoch(events):
+    assert events.invalidator._cursor == events.module.EPOCH
@@ -0,0 +1,106 @@
+"""Warm-up reads of stacked inputs with their own source frame ranges.
+
+'rv.commands' is a stand-in describing a stack of two image sequences, the
+warm-up reads files only and never asks RV to decode or cache frames.
+"""
+import importlib
+import types
+
+import pytest
+
+from conftest import install_stubs, stub_module
+
+STACK_NODE = "stack1"
+
+
+class _RVCommands(types.SimpleNamespace):
+    """Stack of sequences 'a' (1001-1010) and 'b' (1-10), playhead at 3"""
+
+    CacheOff = 0
+    CacheBuffer = 2
+
+    def __init__(self, media_dir):
+        super().__init__(
+            calls=[],
+            media={
+                "sourceA": f"{media_dir}/a.1001-1010#.exr",
+                "sourceB": f"{media_dir}/b.1-10@@@.exr",
+            },
+            # Global frame 1 shows frame 1001 of 'a' and frame 1 of 'b'
+            offsets={"sourceA": 1000, "sourceB": 0},
+        )
+
+    def __getattr__(self, name):
+        # Any other RV command is recorded and does nothing
+        return lambda *args: self.calls.append(name)
+
+    def viewNode(self):
+        return STACK_NODE
+
+    def frame(self):
+        return 3
+
+    def nodeType(self, node):
+        if node == STACK_NODE:
+            return "RVStackGroup"
+        return "RVFileSource" if node.startswith("source") else "RVSourceGroup"
+
+    def nodeInputs(self, node):
+        return ["groupA", "groupB"]
+
+    def nodesInGroup(self, group):
+        return [f"source{group[-1]}"]
+
+    def sourceMedia(self, source):
+        return [self.media[source]]
+
+    def sourceMediaInfo(self, source, media):
+        return {"width": 64, "height": 32, "channels": 4, "bitsPerChannel": 8}
+
+    def sourceFrame(self, frame, source):
+        return frame + self.offsets[source]
+
+    def cacheInfo(self):
+        return [64 * 32 * 4 * 2 * 8]
+
+
+@pytest.fixture
+def warm_up(client_package, monkeypatch, tmp_path):
+    commands = _RVCommands(str(tmp_path))
+    install_stubs(monkeypatch, {"rv": stub_module("rv"), "rv.commands": commands})
+    module = importlib.import_module("review_submitter.handlers.frame_warmup")
+    module.FrameWarmUp._warmed.clear()
+    module.FrameWarmUp._media_info.clear()
+    module.FrameWarmUp._window = None
+    yield types.SimpleNamespace(module=module, commands=commands, media_dir=tmp_path)
+    if module.FrameWarmUp._executor is not None:
+        module.FrameWarmUp._executor.shutdown(wait=True)
+        module.FrameWarmUp._executor = None
+
+
+def test_each_input_is_read_at_its_own_source_frame(warm_up, monkeypatch):
+    scheduled = []
+    monkeypatch.setattr(warm_up.module.FrameWarmUp, "_schedule", scheduled.extend)
+    warm_up.module.FrameWarmUp.update(force=True)
+
+    # Cache holds 8 frames of both inputs, half of it sizes the window
+    frames_a = [read[0].rsplit(".", 2)[1] for read in scheduled if "/a." in read[0]]
+    frames_b = [read[0].rsplit(".", 2)[1] for read in scheduled if "/b." in read[0]]
+    assert frames_a == ["1003", "1004", "1002", "1005"]
+    assert frames_b == ["003", "004", "002", "005"]
+    # Top input first at every frame
+    assert "/a.1003" in scheduled[0][0] and "/b.003" in scheduled[1][0]
+
+
+def test_warm_up_only_reads_files(warm_up):
+    for name in ("a.1003.exr", "b.003.exr", "b.004.exr"):
+        (warm_up.media_dir / name).write_bytes(b"\0" * 1024)
+
+    warm_up.module.FrameWarmUp.start({"warm_up_readers": 1})
+    warm_up.module.FrameWarmUp._executor.shutdown(wait=True)
+    warm_up.module.FrameWarmUp._executor = None
+
+    warmed = sorted(path.rsplit("/", 1)[1] for path, _offset, _length in warm_up.module.FrameWarmUp._warmed)
+    assert warmed == ["a.1003.exr", "b.003.exr", "b.004.exr"]
+    # RV is only asked to keep its own cache on, never to decode frames
+    assert warm_up.commands.calls == ["cacheMode", "bind", "bind"]
@@ -0,0 +1,136 @@
+"""Plugin discovery must not import Qt, ayon_api or RV.
+
+The loader and publish plugins are imported by file path the way AYON
+discovers them. 'ayon_core' and 'pyblish' are replaced by minimal stand-ins
+providing the base classes the plugins derive from, heavy modules are
+blocked so importing them fails the test.
+"""
+import importlib.abc
+import importlib.util
+import os
+import sys
+import time
+import types
+
+import pytest
+
+CLIENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PLUGINS_DIR = os.path.join(CLIENT_DIR, "review_submitter", "plugins")
+PLUGIN_PATHS = [
+    os.path.join(PLUGINS_DIR, "submitter", "create_rv_review_stacks.py"),
+    os.path.join(PLUGINS_DIR, "publish", "integrate_review_prompt.py"),
+]
+# Modules only needed once a plugin is used
+HEAVY_MODULES = ("qtpy", "ayon_api", "rv", "ayon_openrv", "ayon_core.tools")
+# Import time of all plugins in seconds
+IMPORT_BUDGET = 0.5
+
+
+class _HeavyModuleBlocker(importlib.abc.MetaPathFinder):
+    def __init__(self):
+        self.attempts = []
+
+    def find_spec(self, fullname, path=None, target=None):
+        if any(
+            fullname == name or fullname.startswith(name + ".")
+            for name in HEAVY_MODULES
+        ):
+            self.attempts.append(fullname)
+            raise ImportError(f"{fullname} imported during plugin discovery")
+        return None
+
+
+def _stub_module(name, **attributes):
+    module = types.ModuleType(name)
+    module.__path__ = []
+    module.__dict__.update(attributes)
+    return module
+
+
+def _stub_modules():
+    class _Plugin:
+        pass
+
+    modules = {
+        "ayon_core": _stub_module("ayon_core"),
+        "ayon_core.addon": _stub_module(
+            "ayon_core.addon",
+            AYONAddon=_Plugin,
+            IHostAddon=type("IHostAddon", (), {}),
+            IPluginPaths=type("IPluginPaths", (), {}),
+        ),
+        "ayon_core.settings": _stub_module(
+            "ayon_core.settings", get_project_settings=lambda *args: {}
+        ),
+        "ayon_core.pipeline": _stub_module("ayon_core.pipeline"),
+        "ayon_core.pipeline.load": _stub_module(
+            "ayon_core.pipeline.load", ProductLoaderPlugin=_Plugin
+        ),
+        "pyblish": _stub_module("pyblish"),
+        "pyblish.api": _stub_module(
+            "pyblish.api", ContextPlugin=_Plugin, IntegratorOrder=3
+        ),
+    }
+    # Submodules are attributes of their parent like after a real import
+    for name, module in modules.items():
+        parent, _, child = name.rpartition(".")
+        if parent:
+            setattr(modules[parent], child, module)
+    return modules
+
+
+@pytest.fixture
+def clean_modules(monkeypatch):
+    """Fresh import state with stand-ins and heavy modules blocked"""
+    for name in list(sys.modules):
+        if name == "review_submitter" or name.startswith("review_submitter."):
+            monkeypatch.delitem(sys.modules, name)
+        elif any(
+            name == heavy or name.startswith(heavy + ".")
+            for heavy in HEAVY_MODULES
+        ):
+            monkeypatch.delitem(sys.modules, name)
+    for name, module in _stub_modules().items():
+        monkeypatch.setitem(sys.modules, name, module)
+    monkeypatch.syspath_prepend(CLIENT_DIR)
+
+    blocker = _HeavyModuleBlocker()
+    monkeypatch.setattr(sys, "meta_path", [blocker] + sys.meta_path)
+    return blocker
+
+
+def _import_plugin(path):
+    name = os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_plugin_discovery_skips_heavy_modules(clean_modules):
+    for path in PLUGIN_PATHS:
+        _import_plugin(path)
+
+    # The handlers package itself resolves handlers on first use only
+    import review_submitter.handlers  # noqa: F401
+
+    assert clean_modules.attempts == []
+    loaded = [
+        name for name in sys.modules
+        if any(name == heavy or name.startswith(heavy + ".") for heavy in HEAVY_MODULES)
+    ]
+    assert loaded == []
+    assert "review_submitter.handlers.openrv_handler" not in sys.modules
+    assert "review_submitter.handlers.review_submission_handler" not in sys.modules
+
+
+def test_plugin_import_time_budget(clean_modules):
+    start = time.perf_counter()
+    for path in PLUGIN_PATHS:
+        _import_plugin(path)
+    import review_submitter.handlers  # noqa: F401
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < IMPORT_BUDGET, (
+        f"Plugin import took {elapsed:.3f}s, budget is {IMPORT_BUDGET}s"
+    )
@@ -0,0 +1,66 @@
+"""Representation choice of the memory budget planner."""
+import importlib
+
+import pytest
+
+from conftest import install_stubs, stub_module
+
+MB = 1024 * 1024
+
+
+@pytest.fixture
+def planner(client_package, monkeypatch):
+    install_stubs(monkeypatch, {
+        "ayon_core.lib": stub_module("ayon_core.lib"),
+        "ayon_core.lib.transcoding": stub_module(
+            "ayon_core.lib.transcoding", VIDEO_EXTENSIONS={".mov", ".mp4"}),
+    })
+    client_package["ayon_core"].lib = importlib.import_module("ayon_core.lib")
+    module = importlib.import_module("review_submitter.handlers.memory_budget")
+    return module.MemoryBudgetPlanner
+
+
+def _context(product_id, version_id, representation_id, name, size_mb, generation=0):
+    # RGBA 8 bit, one frame of 1024x256 pixels is one megabyte
+    return {
+        "product": {"id": product_id, "name": product_id},
+        "version": {"id": version_id, "attrib": {"resolutionWidth": 1024, "resolutionHeight": 256}},
+        "representation": {
+            "id": representation_id,
+            "name": name,
+            "attrib": {"frameStart": 1, "frameEnd": size_mb},
+        },
+        "review_generation": generation,
+    }
+
+
+def _ids(ext_groups):
+    return sorted(ctx["representation"]["id"] for contexts in ext_groups.values() for ctx in contexts)
+
+
+def test_every_version_keeps_one_representation(planner):
+    ext_groups = {
+        ".mov": [
+            _context("render", "v3", "v3_mov", "h264", 100),
+        ],
+        ".jpg": [
+            _context("render", "v3", "v3_jpg", "review", 300),
+            _context("render", "v2", "v2_jpg", "review", 50),
+        ],
+    }
+    # v2 has no 'h264' representation, it still keeps its only one
+    assert _ids(planner.apply(ext_groups, 300)) == ["v2_jpg", "v3_mov"]
+
+
+def test_lazy_generations_are_kept_and_not_counted(planner):
+    ext_groups = {
+        ".mov": [
+            _context("render", "v4", "v4_mov", "h264", 100),
+            _context("render", "v3", "v3_mov", "h264", 100, generation=1),
+            _context("render", "v2", "v2_mov", "h264", 1000, generation=2),
+        ],
+    }
+    assert planner.apply(ext_groups, 200) is ext_groups
+
+    ext_groups[".exr"] = [_context("render", "v4", "v4_exr", "exr", 200)]
+    assert _ids(planner.apply(ext_groups, 200)) == ["v2_mov", "v3_mov", "v4_mov"]
@@ -0,0 +1,87 @@
+"""Metrics files of concurrent sessions never repeat a series.
+
+'ayon_core' is replaced by minimal stand-ins, nothing is sent anywhere.
+"""
+import importlib
+import os
+import sys
+import types
+
+import pytest
+
+CLIENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _stub_module(name, **attributes):
+    module = types.ModuleType(name)
+    module.__path__ = []
+    module.__dict__.update(attributes)
+    return module
+
+
+def _stub_modules():
+    modules = {
+        "ayon_core": _stub_module("ayon_core"),
+        "ayon_core.addon": _stub_module(
+            "ayon_core.addon",
+            AYONAddon=type("AYONAddon", (), {}),
+            IHostAddon=type("IHostAddon", (), {}),
+            IPluginPaths=type("IPluginPaths", (), {}),
+        ),
+        "ayon_core.settings": _stub_module(
+            "ayon_core.settings", get_project_settings=lambda *args: {}
+        ),
+    }
+    for name, module in modules.items():
+        parent, _, child = name.rpartition(".")
+        if parent:
+            setattr(modules[parent], child, module)
+    return modules
+
+
+@pytest.fixture
+def metrics(monkeypatch, tmp_path):
+    for name in list(sys.modules):
+        if name == "review_submitter" or name.startswith("review_submitter."):
+            monkeypatch.delitem(sys.modules, name)
+    for name, module in _stub_modules().items():
+        monkeypatch.setitem(sys.modules, name, module)
+    monkeypatch.syspath_prepend(CLIENT_DIR)
+    monkeypatch.setenv("AYON_REVIEW_SUBMITTER_CACHE_DIR", str(tmp_path))
+    module = importlib.import_module("review_submitter.handlers.metrics")
+    yield module
+    module.MetricsExporter._remove_files()
+    module.MetricsExporter._thread = None
+
+
+def _series(text):
+    return [line.rsplit(" ", 1)[0] for line in text.splitlines() if not line.startswith("#")]
+
+
+def test_every_series_has_process_labels(metrics):
+    metrics.API_CALLS.inc(operation="get_task", result="ok")
+    metrics.API_CALL_DURATION.observe(0.2, operation="get_task")
+    metrics.UPLOAD_RETRIES.inc()
+
+    series = []
+    for pid in ("100", "200"):
+        text = metrics.REGISTRY.render_prometheus([("host", "openrv"), ("pid", pid)])
+        lines = _series(text)
+        assert lines
+        assert all(f'host="openrv",pid="{pid}"' in line for line in lines)
+        series.extend(lines)
+    # Files of both sessions can be read by one textfile collector
+    assert len(series) == len(set(series))
+
+
+def test_exporter_files_are_per_process_and_removed(metrics, tmp_path):
+    metrics.MetricsExporter.start(str(tmp_path), 3600, host_name="openrv")
+    metrics.MetricsExporter.flush()
+
+    base_name = f"review_submitter_openrv_{os.getpid()}"
+    assert sorted(os.listdir(tmp_path)) == [f"{base_name}.json", f"{base_name}.prom"]
+    with open(tmp_path / f"{base_name}.prom") as stream:
+        assert all(f'pid="{os.getpid()}"' in line for line in _series(stream.read()))
+
+    metrics.MetricsExporter._remove_files()
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,166 @@
+"""Media work in the shared pool when Python is embedded in the host binary.
+
+Worker processes import the client package themselves, so the 'ayon_core'
+stand-ins are written to disk instead of being put into 'sys.modules'.
+ffmpeg is replaced by a script writing raw RGB frames.
+"""
+import importlib
+import multiprocessing.spawn
+import os
+import sys
+import textwrap
+
+import pytest
+
+from conftest import CLIENT_DIR
+
+FAKE_FFMPEG = '''
+import sys
+
+args = sys.argv[1:]
+path = args[args.index("-i") + 1]
+width, height = (
+    int(value)
+    for value in args[args.index("-vf") + 1].rsplit("scale=", 1)[1].split(":")
+)
+count = int(args[args.index("-frames:v") + 1])
+for index in range(count):
+    if "changed" in path and index in (2, 3):
+        value = 255
+    else:
+        value = index * 10
+    # Horizontal gradient so frame hashes have set bits
+    row = bytes(
+        channel for column in range(width) for channel in [(value + column * 7) % 256] * 3
+    )
+    sys.stdout.buffer.write(row * height)
+'''
+
+STAND_INS = {
+    "ayon_core/__init__.py": "",
+    "ayon_core/addon.py": """
+        class AYONAddon:
+            pass
+
+
+        class IHostAddon:
+            pass
+
+
+        class IPluginPaths:
+            pass
+    """,
+    "ayon_core/settings.py": """
+        def get_project_settings(*args):
+            return {}
+    """,
+    "ayon_core/lib/__init__.py": """
+        import os
+        import sys
+
+
+        def get_ffmpeg_tool_args(tool, *args):
+            fake_ffmpeg = os.path.join(os.path.dirname(__file__), "fake_ffmpeg.py")
+            return [sys.executable, fake_ffmpeg, *args]
+    """,
+    "ayon_core/lib/transcoding.py": """
+        IMAGE_EXTENSIONS = {".exr", ".dpx", ".png", ".jpg"}
+        VIDEO_EXTENSIONS = {".mov", ".mp4"}
+    """,
+    "ayon_core/pipeline/__init__.py": "",
+    "ayon_core/pipeline/load.py": """
+        def get_representation_path(representation):
+            return representation["attrib"]["path"]
+    """,
+}
+
+
+@pytest.fixture
+def media_helper(monkeypatch, tmp_path):
+    """Fresh 'media_helper' with stand-ins importable by worker processes"""
+    stand_in_dir = tmp_path / "stand_ins"
+    for relpath, content in STAND_INS.items():
+        path = stand_in_dir / relpath
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(textwrap.dedent(content))
+    (stand_in_dir / "ayon_core" / "lib" / "fake_ffmpeg.py").write_text(FAKE_FFMPEG)
+
+    for name in list(sys.modules):
+        if name.split(".")[0] in ("review_submitter", "ayon_core"):
+            monkeypatch.delitem(sys.modules, name)
+    monkeypatch.syspath_prepend(str(stand_in_dir))
+    monkeypatch.syspath_prepend(CLIENT_DIR)
+    monkeypatch.setenv("AYON_REVIEW_SUBMITTER_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.delenv("AYON_REVIEW_SUBMITTER_PYTHON", raising=False)
+    # The spawn executable is process-wide, restore it for other tests
+    monkeypatch.setattr(multiprocessing.spawn, "_python_exe", multiprocessing.spawn._python_exe)
+
+    module = importlib.import_module("review_submitter.handlers.media_helper")
+    yield module
+    if module._process_pool is not None:
+        module._process_pool.shutdown(cancel_futures=True)
+        module._process_pool = None
+
+
+def _embed_in_host(monkeypatch, tmp_path, bundled=True):
+    """Pretend Python runs inside an 'rv' binary with its own prefix"""
+    prefix = tmp_path / "rv"
+    (prefix / "bin").mkdir(parents=True)
+    host_binary = prefix / "bin" / "rv"
+    host_binary.write_text("")
+    bundled_python = None
+    if bundled:
+        major, minor = sys.version_info[:2]
+        bundled_python = prefix / "bin" / f"python{major}.{minor}"
+        bundled_python.symlink_to(sys.executable)
+    monkeypatch.setattr(sys, "executable", str(host_binary))
+    monkeypatch.setattr(sys, "exec_prefix", str(prefix))
+    monkeypatch.setattr(sys, "base_exec_prefix", str(prefix))
+    return bundled_python
+
+
+def test_workers_run_bundled_interpreter_in_embedded_host(media_helper, monkeypatch, tmp_path):
+    bundled_python = _embed_in_host(monkeypatch, tmp_path)
+    assert media_helper.get_python_executable() == str(bundled_python)
+
+    pool = media_helper.get_process_pool(1)
+    assert isinstance(pool, media_helper.ProcessPoolExecutor)
+    assert pool.submit(os.getpid).result(timeout=60) != os.getpid()
+    assert pool.submit(
+        media_helper.get_sequence_pattern, "/shots/sh010/render.1001.exr"
+    ).result(timeout=60) == ("/shots/sh010/render.%04d.exr", 1001)
+
+
+def test_media_work_runs_in_process_without_interpreter(media_helper, monkeypatch, tmp_path):
+    _embed_in_host(monkeypatch, tmp_path, bundled=False)
+    assert media_helper.get_python_executable() is None
+
+    pool = media_helper.get_process_pool(1)
+    assert isinstance(pool, media_helper.ThreadPoolExecutor)
+    assert pool.submit(os.getpid).result(timeout=60) == os.getpid()
+
+
+def test_missing_interpreter_override_is_not_used(media_helper, monkeypatch, tmp_path):
+    monkeypatch.setenv("AYON_REVIEW_SUBMITTER_PYTHON", str(tmp_path / "missing" / "python"))
+    assert media_helper.get_python_executable() is None
+
+
+def test_chunked_workers_run_in_pool(media_helper):
+    pytest.importorskip("numpy")
+    frame_diff = importlib.import_module("review_submitter.handlers.frame_diff")
+    fingerprint = importlib.import_module("review_submitter.handlers.fingerprint")
+
+    pool = media_helper.get_process_pool(2)
+    # More frames than one chunk, so the workers read several chunks
+    frame_count = frame_diff.CHUNK_SIZE + 5
+    diffs = pool.submit(
+        frame_diff._diff_frames, "/media/v001.mov", "/media/v002_changed.mov", 16, 9, frame_count
+    ).result(timeout=120)
+    hashes = pool.submit(
+        fingerprint._hash_frames, "/media/v001.mov", [0, 4, 8]
+    ).result(timeout=120)
+
+    assert len(diffs) == frame_count
+    assert [index for index, diff in enumerate(diffs) if diff > 0] == [2, 3]
+    assert len(hashes) == 3
+    assert all(len(frame_hash) == fingerprint.HASH_SIZE ** 2 // 4 for frame_hash in hashes)
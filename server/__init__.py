@@ -1,11 +1,361 @@
-from typing import Type
+import asyncio
+import weakref
+from typing import Literal, Type
+
+from fastapi import Header, Query, Request
+from fastapi.responses import JSONResponse, Response
+
 from ayon_server.addons import BaseServerAddon
+from ayon_server.api.dependencies import CurrentUser, ProjectName
+from ayon_server.exceptions import (
+    BadRequestException,
+    ForbiddenException,
+    NotFoundException,
+)
+from ayon_server.types import Field, OPModel
+
 from .settings import ReviewSubmitterSettings, DEFAULT_VALUES
+from .analytics import backfill_analytics, get_analytics
+from .files import store_activity_file
+from .inbox import (
+    INBOX_STATUSES,
+    MAX_PAGE_SIZE,
+    add_submission,
+    list_inbox,
+    set_submission_status,
+)
+from .thumbnails import (
+    THUMBNAIL_TIERS,
+    get_thumbnail_tier,
+    get_version_thumbnail_id,
+    store_review_thumbnail,
+)
+from .uploads import UploadStore, UploadOffsetMismatch
+
+UPLOAD_STORE = UploadStore()
+# Serializes finalize requests of one upload, entries go away with their users
+_FINALIZE_LOCKS = weakref.WeakValueDictionary()
+# Thumbnail ids are never reused for other content
+THUMBNAIL_CACHE_CONTROL = "private, max-age=31536000, immutable"
+# The thumbnail of a version changes, clients revalidate with the ETag
+VERSION_THUMBNAIL_CACHE_CONTROL = "private, no-cache"
+
+
+class FinalizeUploadModel(OPModel):
+    target: Literal["thumbnail", "activity_file"] = Field("thumbnail", title="Upload target")
+    content_type: str = Field("image/png", title="Content type")
+    filename: str | None = Field(None, title="File name of activity files")
+
+
+class InboxSubmissionModel(OPModel):
+    submission_id: str = Field(..., title="Submission id", regex=r"^[0-9a-f]{16,64}$")
+    reviewers: list[str] = Field(..., title="Reviewers", min_items=1)
+    version_id: str = Field(..., title="Version id")
+    task_id: str | None = Field(None, title="Task id")
+    submission_type: str = Field("WIP", title="Submission type")
+    high_priority: bool = Field(False, title="High priority")
+    submitter: str | None = Field(None, title="Submitter")
+    comment: str = Field("", title="Comment")
+
+
+class InboxStatusModel(OPModel):
+    status: Literal[INBOX_STATUSES] = Field(..., title="Status")
 
 
 class ReviewSubmitterAddon(BaseServerAddon):
     settings_model: Type[ReviewSubmitterSettings] = ReviewSubmitterSettings
 
+    def initialize(self):
+        self.add_endpoint(
+            "projects/{project_name}/uploads/{upload_id}",
+            self.get_upload_status,
+            method="GET",
+        )
+        self.add_endpoint(
+            "projects/{project_name}/uploads/{upload_id}",
+            self.upload_chunk,
+            method="PATCH",
+        )
+        self.add_endpoint(
+            "projects/{project_name}/uploads/{upload_id}/finalize",
+            self.finalize_upload,
+            method="POST",
+        )
+        self.add_endpoint(
+            "projects/{project_name}/thumbnails",
+            self.upload_thumbnail,
+            method="POST",
+        )
+        self.add_endpoint(
+            "projects/{project_name}/thumbnails/{thumbnail_id}",
+            self.get_thumbnail,
+            method="GET",
+        )
+        self.add_endpoint(
+            "projects/{project_name}/versions/{version_id}/thumbnail",
+            self.get_version_thumbnail,
+            method="GET",
+        )
+        self.add_endpoint(
+            "projects/{project_name}/inbox",
+            self.add_inbox_submission,
+            method="POST",
+        )
+        self.add_endpoint(
+            "projects/{project_name}/inbox",
+            self.get_inbox,
+            method="GET",
+        )
+        self.add_endpoint(
+            "projects/{project_name}/inbox/{submission_id}",
+            self.update_inbox_submission,
+            method="PATCH",
+        )
+        self.add_endpoint(
+            "projects/{project_name}/analytics",
+            self.get_project_analytics,
+            method="GET",
+        )
+        self.add_endpoint(
+            "projects/{project_name}/analytics/backfill",
+            self.backfill_project_analytics,
+            method="POST",
+        )
+
     async def get_default_settings(self):
         settings_model_cls = self.get_settings_model()
         return settings_model_cls(**DEFAULT_VALUES)
+
+    async def get_upload_status(
+        self,
+        user: CurrentUser,
+        project_name: ProjectName,
+        upload_id: str,
+    ):
+        """Offset of a resumable upload acknowledged so far"""
+        user.check_project_access(project_name)
+        try:
+            status = UPLOAD_STORE.status(project_name, upload_id)
+        except ValueError as e:
+            raise BadRequestException(str(e))
+        if status is None:
+            raise NotFoundException(f"Upload {upload_id} not found")
+        return {"offset": status["offset"], "size": status["size"]}
+
+    async def upload_chunk(
+        self,
+        request: Request,
+        user: CurrentUser,
+        project_name: ProjectName,
+        upload_id: str,
+        upload_offset: int = Header(...),
+        upload_length: int = Header(...),
+    ):
+        """Append one chunk of a resumable upload"""
+        user.check_project_access(project_name)
+        chunk = await request.body()
+        try:
+            offset = await asyncio.to_thread(
+                UPLOAD_STORE.append,
+                project_name,
+                upload_id,
+                upload_offset,
+                upload_length,
+                chunk,
+            )
+        except ValueError as e:
+            raise BadRequestException(str(e))
+        except UploadOffsetMismatch as e:
+            return JSONResponse(status_code=409, content={"offset": e.offset})
+        return {"offset": offset, "size": upload_length}
+
+    async def finalize_upload(
+        self,
+        payload: FinalizeUploadModel,
+        user: CurrentUser,
+        project_name: ProjectName,
+        upload_id: str,
+    ):
+        """Turn a complete upload into its target entity.
+
+        Concurrent finalize requests of an upload wait for the first one and
+        return its result, so the target is created once.
+        """
+        user.check_project_access(project_name)
+        lock = _FINALIZE_LOCKS.setdefault((project_name, upload_id), asyncio.Lock())
+        async with lock:
+            try:
+                status = UPLOAD_STORE.status(project_name, upload_id)
+            except ValueError as e:
+                raise BadRequestException(str(e))
+            if status is None:
+                raise NotFoundException(f"Upload {upload_id} not found")
+            if status["result"] is not None:
+                return status["result"]
+
+            if payload.target == "activity_file":
+                data_path = UPLOAD_STORE.data_path(project_name, upload_id)
+                if data_path is None:
+                    raise BadRequestException(f"Upload {upload_id} is not complete")
+                try:
+                    file_id = await store_activity_file(
+                        project_name,
+                        data_path,
+                        payload.filename or upload_id,
+                        payload.content_type,
+                        user.name,
+                    )
+                except RuntimeError as e:
+                    raise BadRequestException(str(e))
+                result = {"id": file_id}
+            else:
+                content = await asyncio.to_thread(UPLOAD_STORE.read, project_name, upload_id)
+                if content is None:
+                    raise BadRequestException(f"Upload {upload_id} is not complete")
+                thumbnail_id = await store_review_thumbnail(
+                    project_name, payload.content_type, content, user.name
+                )
+                result = {"id": thumbnail_id}
+            await asyncio.to_thread(UPLOAD_STORE.complete, project_name, upload_id, result)
+            return result
+
+    async def add_inbox_submission(
+        self,
+        payload: InboxSubmissionModel,
+        user: CurrentUser,
+        project_name: ProjectName,
+    ):
+        """Add submission to the inbox of its reviewers"""
+        user.check_project_access(project_name)
+        await add_submission(
+            project_name,
+            payload.submission_id,
+            payload.reviewers,
+            payload.version_id,
+            payload.submission_type,
+            high_priority=payload.high_priority,
+            task_id=payload.task_id,
+            submitter=payload.submitter or user.name,
+            comment=payload.comment,
+        )
+        return {"submission_id": payload.submission_id}
+
+    async def get_inbox(
+        self,
+        user: CurrentUser,
+        project_name: ProjectName,
+        reviewer: str | None = Query(None, description="Defaults to the current user"),
+        status: Literal[INBOX_STATUSES] = Query("pending"),
+        limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+        cursor: str | None = Query(None, description="'next_cursor' of the previous page"),
+    ):
+        """Page of submissions of reviewer, high priority and newest first"""
+        user.check_project_access(project_name)
+        reviewer = reviewer or user.name
+        if reviewer != user.name and not user.is_manager:
+            raise ForbiddenException("Only managers can read inboxes of other users")
+        try:
+            return await list_inbox(project_name, reviewer, status, limit, cursor)
+        except ValueError as e:
+            raise BadRequestException(str(e))
+
+    async def update_inbox_submission(
+        self,
+        payload: InboxStatusModel,
+        user: CurrentUser,
+        project_name: ProjectName,
+        submission_id: str,
+        reviewer: str | None = Query(None, description="Defaults to the current user"),
+    ):
+        """Set status of submission in inbox of reviewer"""
+        user.check_project_access(project_name)
+        reviewer = reviewer or user.name
+        if reviewer != user.name and not user.is_manager:
+            raise ForbiddenException("Only managers can update inboxes of other users")
+        if not await set_submission_status(project_name, submission_id, reviewer, payload.status):
+            raise NotFoundException(f"Submission {submission_id} not in inbox of {reviewer}")
+        return {"submission_id": submission_id, "status": payload.status}
+
+    async def get_project_analytics(
+        self,
+        user: CurrentUser,
+        project_name: ProjectName,
+        days: int = Query(30, ge=1, le=366),
+        top_reviewers: int = Query(10, ge=1, le=100),
+    ):
+        """Submissions per day and type, turnaround and heaviest reviewers"""
+        user.check_project_access(project_name)
+        return await get_analytics(project_name, days, top_reviewers)
+
+    async def backfill_project_analytics(
+        self,
+        user: CurrentUser,
+        project_name: ProjectName,
+    ):
+        """Index submissions of task data and rebuild analytics"""
+        if not user.is_manager:
+            raise ForbiddenException("Only managers can backfill analytics")
+        return await backfill_analytics(project_name)
+
+    async def upload_thumbnail(
+        self,
+        request: Request,
+        user: CurrentUser,
+        project_name: ProjectName,
+        content_type: str = Header("image/png"),
+    ):
+        """Store review thumbnail and derive its resolution tiers"""
+        user.check_project_access(project_name)
+        payload = await request.body()
+        if not payload:
+            raise BadRequestException("Empty thumbnail")
+        thumbnail_id = await store_review_thumbnail(
+            project_name, content_type, payload, user.name
+        )
+        return {"id": thumbnail_id}
+
+    @staticmethod
+    def _tier_response(tier, if_none_match, cache_control=THUMBNAIL_CACHE_CONTROL):
+        headers = {"ETag": tier["etag"], "Cache-Control": cache_control}
+        if if_none_match and tier["etag"] in [
+            tag.strip() for tag in if_none_match.split(",")
+        ]:
+            return Response(status_code=304, headers=headers)
+        return Response(content=tier["data"], media_type=tier["mime"], headers=headers)
+
+    async def get_thumbnail(
+        self,
+        user: CurrentUser,
+        project_name: ProjectName,
+        thumbnail_id: str,
+        size: int = Query(
+            THUMBNAIL_TIERS[0],
+            ge=1,
+            description="Requested width, served by the smallest tier covering it",
+        ),
+        if_none_match: str | None = Header(None),
+    ):
+        """Resolution tier of thumbnail with a strong ETag"""
+        user.check_project_access(project_name)
+        tier = await get_thumbnail_tier(project_name, thumbnail_id, size)
+        if tier is None:
+            raise NotFoundException(f"Thumbnail {thumbnail_id} has no resolution tiers")
+        return self._tier_response(tier, if_none_match)
+
+    async def get_version_thumbnail(
+        self,
+        user: CurrentUser,
+        project_name: ProjectName,
+        version_id: str,
+        size: int = Query(THUMBNAIL_TIERS[0], ge=1),
+        if_none_match: str | None = Header(None),
+    ):
+        """Resolution tier of the thumbnail of version"""
+        user.check_project_access(project_name)
+        thumbnail_id = await get_version_thumbnail_id(project_name, version_id)
+        if not thumbnail_id:
+            raise NotFoundException(f"Version {version_id} has no thumbnail")
+        tier = await get_thumbnail_tier(project_name, thumbnail_id, size)
+        if tier is None:
+            raise NotFoundException(f"Thumbnail {thumbnail_id} has no resolution tiers")
+        return self._tier_response(tier, if_none_match, VERSION_THUMBNAIL_CACHE_CONTROL)
@@ -0,0 +1,392 @@
+"""Incrementally maintained submission analytics of a project.
+
+Aggregates are updated in the same transaction as the reviewer inbox
+record they count, so reading them never touches task data or the inbox
+itself. 'backfill_analytics' rebuilds them from submissions stored in
+task data by earlier addon versions.
+"""
+import hashlib
+from datetime import datetime, timezone
+
+from ayon_server.lib.postgres import Postgres
+
+DAILY_TABLE = "review_submitter_daily_stats"
+TYPE_TABLE = "review_submitter_type_stats"
+REVIEWER_TABLE = "review_submitter_reviewer_stats"
+
+
+async def create_analytics_tables(project_name):
+    """Create aggregate tables of project, called with the inbox table"""
+    await Postgres.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS project_{project_name}.{DAILY_TABLE} (
+            day DATE NOT NULL,
+            submission_type VARCHAR NOT NULL,
+            submissions INTEGER NOT NULL DEFAULT 0,
+            high_priority INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, submission_type)
+        )
+        """
+    )
+    await Postgres.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS project_{project_name}.{TYPE_TABLE} (
+            submission_type VARCHAR PRIMARY KEY,
+            submissions INTEGER NOT NULL DEFAULT 0,
+            approved INTEGER NOT NULL DEFAULT 0,
+            turnaround_seconds DOUBLE PRECISION NOT NULL DEFAULT 0
+        )
+        """
+    )
+    await Postgres.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS project_{project_name}.{REVIEWER_TABLE} (
+            reviewer VARCHAR PRIMARY KEY,
+            submissions INTEGER NOT NULL DEFAULT 0,
+            pending INTEGER NOT NULL DEFAULT 0,
+            approved INTEGER NOT NULL DEFAULT 0,
+            turnaround_seconds DOUBLE PRECISION NOT NULL DEFAULT 0
+        )
+        """
+    )
+    await Postgres.execute(
+        f"""
+        CREATE INDEX IF NOT EXISTS {REVIEWER_TABLE}_submissions_idx
+        ON project_{project_name}.{REVIEWER_TABLE} (submissions)
+        """
+    )
+
+
+async def record_submission(conn, project_name, submission_type, high_priority, reviewers):
+    """Count a new submission and its new inbox records.
+
+    Args:
+        conn: Connection of the transaction that inserted the records.
+        reviewers (list[str]): Reviewers whose inbox record was inserted.
+    """
+    await conn.execute(
+        f"""
+        INSERT INTO project_{project_name}.{DAILY_TABLE} AS stats
+        (day, submission_type, submissions, high_priority)
+        VALUES ((NOW() AT TIME ZONE 'UTC')::date, $1, 1, $2)
+        ON CONFLICT (day, submission_type) DO UPDATE SET
+            submissions = stats.submissions + 1,
+            high_priority = stats.high_priority + EXCLUDED.high_priority
+        """,
+        submission_type,
+        int(high_priority),
+    )
+    await conn.execute(
+        f"""
+        INSERT INTO project_{project_name}.{TYPE_TABLE} AS stats
+        (submission_type, submissions) VALUES ($1, 1)
+        ON CONFLICT (submission_type) DO UPDATE SET
+            submissions = stats.submissions + 1
+        """,
+        submission_type,
+    )
+    await add_reviewer_records(conn, project_name, reviewers)
+
+
+async def add_reviewer_records(conn, project_name, reviewers):
+    """Count new pending inbox records of reviewers"""
+    for reviewer in reviewers:
+        await conn.execute(
+            f"""
+            INSERT INTO project_{project_name}.{REVIEWER_TABLE} AS stats
+            (reviewer, submissions, pending) VALUES ($1, 1, 1)
+            ON CONFLICT (reviewer) DO UPDATE SET
+                submissions = stats.submissions + 1,
+                pending = stats.pending + 1
+            """,
+            reviewer,
+        )
+
+
+async def _first_approval_seconds(conn, project_name, record):
+    """Turnaround of the earliest approval of submission by other reviewers"""
+    from .inbox import TABLE_NAME
+
+    return await conn.fetchval(
+        f"""
+        SELECT MIN(EXTRACT(EPOCH FROM updated_at - created_at))
+        FROM project_{project_name}.{TABLE_NAME}
+        WHERE submission_id = $1 AND reviewer <> $2 AND status = 'approved'
+        """,
+        record["submission_id"],
+        record["reviewer"],
+    )
+
+
+def _min_defined(*values):
+    values = [value for value in values if value is not None]
+    return min(values) if values else None
+
+
+async def record_status_change(conn, project_name, record, new_status, changed_at):
+    """Move inbox record between pending and approved aggregates.
+
+    Reviewer aggregates count inbox records. Submission type aggregates
+    count submissions, a submission is approved while any of its reviewers
+    approves it and its turnaround is the one of the earliest approval.
+
+    Args:
+        conn: Connection of the transaction that updates the record, records
+            of the submission must be locked.
+        record (dict): Record before the change with 'submission_id',
+            'reviewer', 'submission_type', 'status', 'created_at' and
+            'updated_at'.
+        new_status (str): Status set on the record.
+        changed_at (datetime): Time of the change.
+    """
+    old_status = record["status"]
+    if old_status == new_status:
+        return
+
+    pending = int(new_status == "pending") - int(old_status == "pending")
+    approved = int(new_status == "approved") - int(old_status == "approved")
+    # Turnaround of an approval is removed again when it is revoked
+    old_turnaround = None
+    new_turnaround = None
+    if old_status == "approved":
+        old_turnaround = (record["updated_at"] - record["created_at"]).total_seconds()
+    if new_status == "approved":
+        new_turnaround = (changed_at - record["created_at"]).total_seconds()
+
+    await conn.execute(
+        f"""
+        UPDATE project_{project_name}.{REVIEWER_TABLE} SET
+            pending = pending + $2,
+            approved = approved + $3,
+            turnaround_seconds = turnaround_seconds + $4
+        WHERE reviewer = $1
+        """,
+        record["reviewer"],
+        pending,
+        approved,
+        (new_turnaround or 0.0) - (old_turnaround or 0.0),
+    )
+    if not approved:
+        return
+
+    others = await _first_approval_seconds(conn, project_name, record)
+    if others is not None:
+        others = float(others)
+    before = _min_defined(others, old_turnaround)
+    after = _min_defined(others, new_turnaround)
+    if before == after:
+        return
+    await conn.execute(
+        f"""
+        UPDATE project_{project_name}.{TYPE_TABLE} SET
+            approved = approved + $2,
+            turnaround_seconds = turnaround_seconds + $3
+        WHERE submission_type = $1
+        """,
+        record["submission_type"],
+        int(after is not None) - int(before is not None),
+        (after or 0.0) - (before or 0.0),
+    )
+
+
+def _average_hours(turnaround_seconds, approved):
+    if not approved:
+        return None
+    return round(turnaround_seconds / approved / 3600, 2)
+
+
+async def get_analytics(project_name, days=30, top_reviewers=10):
+    """Aggregates of project, cost depends on 'days' and 'top_reviewers' only"""
+    from .inbox import ensure_inbox_table
+
+    await ensure_inbox_table(project_name)
+    daily = await Postgres.fetch(
+        f"""
+        SELECT day, submission_type, submissions, high_priority
+        FROM project_{project_name}.{DAILY_TABLE}
+        WHERE day > (NOW() AT TIME ZONE 'UTC')::date - $1::integer
+        ORDER BY day, submission_type
+        """,
+        days,
+    )
+    types = await Postgres.fetch(
+        f"""
+        SELECT submission_type, submissions, approved, turnaround_seconds
+        FROM project_{project_name}.{TYPE_TABLE}
+        ORDER BY submission_type
+        """
+    )
+    reviewers = await Postgres.fetch(
+        f"""
+        SELECT reviewer, submissions, pending, approved, turnaround_seconds
+        FROM project_{project_name}.{REVIEWER_TABLE}
+        ORDER BY submissions DESC
+        LIMIT $1
+        """,
+        top_reviewers,
+    )
+    return {
+        "daily": [
+            {
+                "date": record["day"].isoformat(),
+                "submission_type": record["submission_type"],
+                "submissions": record["submissions"],
+                "high_priority": record["high_priority"],
+            }
+            for record in daily
+        ],
+        "submission_types": {
+            record["submission_type"]: {
+                "submissions": record["submissions"],
+                "approved": record["approved"],
+                "avg_turnaround_hours": _average_hours(
+                    record["turnaround_seconds"], record["approved"]
+                ),
+            }
+            for record in types
+        },
+        "top_reviewers": [
+            {
+                "reviewer": record["reviewer"],
+                "submissions": record["submissions"],
+                "pending": record["pending"],
+                "approved": record["approved"],
+                "avg_turnaround_hours": _average_hours(
+                    record["turnaround_seconds"], record["approved"]
+                ),
+            }
+            for record in reviewers
+        ],
+    }
+
+
+def parse_submitted_at(value):
+    """Submission time of task data as aware datetime.
+
+    Clients write ISO 8601 in UTC with an offset. Values of earlier addon
+    versions have no offset and are read as UTC.
+
+    Raises:
+        ValueError: Value is not an ISO 8601 date and time.
+    """
+    submitted_at = datetime.fromisoformat(value)
+    if submitted_at.tzinfo is None:
+        submitted_at = submitted_at.replace(tzinfo=timezone.utc)
+    return submitted_at
+
+
+def _iter_task_submissions(task_id, task_data):
+    """Submissions stored in task data, newest first"""
+    submissions = [task_data.get("submission_data") or {}]
+    submissions.extend(task_data.get("submission_history") or [])
+    for submission in submissions:
+        if not submission.get("reviewer_name") or not submission.get("submitted_at"):
+            continue
+        try:
+            submitted_at = parse_submitted_at(submission["submitted_at"])
+        except (TypeError, ValueError):
+            continue
+        submission_id = submission.get("submission_id") or hashlib.sha1(
+            f"{task_id}:{submission.get('workfile_version_id')}:{submission['submitted_at']}".encode()
+        ).hexdigest()
+        yield submission_id, submitted_at, submission
+
+
+async def backfill_analytics(project_name):
+    """Index submissions of task data and rebuild aggregates from the inbox.
+
+    Submissions missing in the inbox are added with the status 'pending'
+    and their original submission time. Runs in one transaction that
+    blocks new submissions of the project until it is done.
+
+    Returns:
+        dict: Number of scanned tasks and added inbox records.
+    """
+    from .inbox import TABLE_NAME, ensure_inbox_table
+
+    await ensure_inbox_table(project_name)
+    inbox = f"project_{project_name}.{TABLE_NAME}"
+    added = 0
+    async with Postgres.acquire() as conn, conn.transaction():
+        await conn.execute(f"LOCK TABLE {inbox} IN EXCLUSIVE MODE")
+        tasks = await conn.fetch(
+            f"""
+            SELECT id, data FROM project_{project_name}.tasks
+            WHERE data ? 'submission_data'
+            """
+        )
+        for task in tasks:
+            for submission_id, submitted_at, submission in _iter_task_submissions(
+                task["id"], task["data"] or {}
+            ):
+                result = await conn.execute(
+                    f"""
+                    INSERT INTO {inbox}
+                    (submission_id, reviewer, version_id, task_id, submission_type,
+                     submitter, created_at, updated_at)
+                    VALUES ($1, $2, $3, $4, $5, $6, $7, $7)
+                    ON CONFLICT (submission_id, reviewer) DO NOTHING
+                    """,
+                    submission_id,
+                    submission["reviewer_name"],
+                    submission.get("workfile_version_id") or "",
+                    task["id"],
+                    submission.get("submission_type") or "WIP",
+                    submission.get("submitter_name"),
+                    submitted_at,
+                )
+                added += int(result.split()[-1])
+
+        for table in (DAILY_TABLE, TYPE_TABLE, REVIEWER_TABLE):
+            await conn.execute(f"DELETE FROM project_{project_name}.{table}")
+        await conn.execute(
+            f"""
+            INSERT INTO project_{project_name}.{DAILY_TABLE}
+            (day, submission_type, submissions, high_priority)
+            SELECT day, submission_type, COUNT(*), COUNT(*) FILTER (WHERE high_priority)
+            FROM (
+                SELECT DISTINCT ON (submission_id)
+                    submission_id, submission_type, high_priority,
+                    (created_at AT TIME ZONE 'UTC')::date AS day
+                FROM {inbox}
+            ) AS submissions
+            GROUP BY day, submission_type
+            """
+        )
+        await conn.execute(
+            f"""
+            INSERT INTO project_{project_name}.{TYPE_TABLE}
+            (submission_type, submissions, approved, turnaround_seconds)
+            SELECT
+                submission_type,
+                COUNT(*),
+                COUNT(first_approval),
+                COALESCE(SUM(first_approval), 0)
+            FROM (
+                SELECT
+                    submission_id,
+                    MIN(submission_type) AS submission_type,
+                    MIN(EXTRACT(EPOCH FROM updated_at - created_at))
+                        FILTER (WHERE status = 'approved') AS first_approval
+                FROM {inbox}
+                GROUP BY submission_id
+            ) AS submissions
+            GROUP BY submission_type
+            """
+        )
+        await conn.execute(
+            f"""
+            INSERT INTO project_{project_name}.{REVIEWER_TABLE}
+            (reviewer, submissions, pending, approved, turnaround_seconds)
+            SELECT
+                reviewer,
+                COUNT(*),
+                COUNT(*) FILTER (WHERE status = 'pending'),
+                COUNT(*) FILTER (WHERE status = 'approved'),
+                COALESCE(SUM(EXTRACT(EPOCH FROM updated_at - created_at))
+                    FILTER (WHERE status = 'approved'), 0)
+            FROM {inbox}
+            GROUP BY reviewer
+            """
+        )
+    return {"tasks": len(tasks), "added": added}
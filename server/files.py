@@ -0,0 +1,49 @@
+"""Activity files assembled from resumable uploads."""
+import asyncio
+import os
+import shutil
+
+from ayon_server.lib.postgres import Postgres
+from ayon_server.utils import create_uuid
+
+try:
+    from ayon_server.files import Storages
+except ImportError:
+    Storages = None
+
+
+async def store_activity_file(project_name, source_path, filename, mime, user_name=None):
+    """Copy complete upload to project file storage, returns file id.
+
+    The file is registered like the core 'files' endpoint registers it, so
+    it can be attached to an activity by id. Only local project storage is
+    supported, other storages raise 'RuntimeError' and clients upload the
+    file through the core endpoint instead.
+    """
+    if Storages is None:
+        raise RuntimeError("Server has no project file storage")
+    storage = await Storages.project(project_name)
+    if storage.storage_type != "local":
+        raise RuntimeError(
+            f"Resumable activity files need local project storage, not {storage.storage_type}")
+
+    file_id = create_uuid()
+    target_path = await storage.get_path(file_id)
+
+    def _copy():
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        shutil.copyfile(source_path, target_path)
+        return os.path.getsize(target_path)
+
+    size = await asyncio.to_thread(_copy)
+    await Postgres.execute(
+        f"""
+        INSERT INTO project_{project_name}.files (id, size, author, data)
+        VALUES ($1, $2, $3, $4)
+        """,
+        file_id,
+        size,
+        user_name,
+        {"filename": filename, "mime": mime},
+    )
+    return file_id
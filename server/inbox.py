@@ -0,0 +1,209 @@
+"""Indexed reviewer inbox of review submissions.
+
+Every submission adds one record per reviewer to a table in the project
+schema. Records are listed newest first with high priority on top using
+keyset pagination, so a page costs one index range scan no matter how
+deep the reviewer pages.
+"""
+import base64
+import json
+from datetime import datetime
+
+from ayon_server.lib.postgres import Postgres
+
+from .analytics import (
+    add_reviewer_records,
+    create_analytics_tables,
+    record_status_change,
+    record_submission,
+)
+
+TABLE_NAME = "review_submitter_inbox"
+INBOX_STATUSES = ("pending", "approved", "rejected", "dismissed")
+MAX_PAGE_SIZE = 500
+
+_initialized_projects = set()
+
+
+async def ensure_inbox_table(project_name):
+    """Create inbox table and index of project once per server process"""
+    if project_name in _initialized_projects:
+        return
+    await Postgres.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS project_{project_name}.{TABLE_NAME} (
+            submission_id VARCHAR NOT NULL,
+            reviewer VARCHAR NOT NULL,
+            version_id VARCHAR NOT NULL,
+            task_id VARCHAR,
+            submission_type VARCHAR NOT NULL,
+            high_priority BOOLEAN NOT NULL DEFAULT FALSE,
+            submitter VARCHAR,
+            comment TEXT NOT NULL DEFAULT '',
+            status VARCHAR NOT NULL DEFAULT 'pending',
+            created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            PRIMARY KEY (submission_id, reviewer)
+        )
+        """
+    )
+    # Matches the page query: equality on reviewer and status, then the sort keys
+    await Postgres.execute(
+        f"""
+        CREATE INDEX IF NOT EXISTS {TABLE_NAME}_page_idx
+        ON project_{project_name}.{TABLE_NAME}
+        (reviewer, status, high_priority, created_at, submission_id)
+        """
+    )
+    await create_analytics_tables(project_name)
+    _initialized_projects.add(project_name)
+
+
+def encode_cursor(record):
+    """Opaque cursor pointing after 'record'"""
+    payload = json.dumps([
+        record["high_priority"],
+        record["created_at"].isoformat(),
+        record["submission_id"],
+    ])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Sort keys stored in cursor, raises ValueError if it is malformed"""
+    try:
+        high_priority, created_at, submission_id = json.loads(
+            base64.urlsafe_b64decode(cursor.encode())
+        )
+        return bool(high_priority), datetime.fromisoformat(created_at), str(submission_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+
+
+async def add_submission(
+    project_name,
+    submission_id,
+    reviewers,
+    version_id,
+    submission_type,
+    high_priority=False,
+    task_id=None,
+    submitter=None,
+    comment="",
+):
+    """Add submission to inbox of each reviewer and update analytics.
+
+    Repeated requests with the same submission id are ignored, so a client
+    can retry after a lost response.
+    """
+    await ensure_inbox_table(project_name)
+    async with Postgres.acquire() as conn, conn.transaction():
+        is_new = not await conn.fetchval(
+            f"""
+            SELECT EXISTS (
+                SELECT 1 FROM project_{project_name}.{TABLE_NAME}
+                WHERE submission_id = $1
+            )
+            """,
+            submission_id,
+        )
+        inserted = []
+        for reviewer in dict.fromkeys(reviewers):
+            result = await conn.execute(
+                f"""
+                INSERT INTO project_{project_name}.{TABLE_NAME}
+                (submission_id, reviewer, version_id, task_id, submission_type,
+                 high_priority, submitter, comment)
+                VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+                ON CONFLICT (submission_id, reviewer) DO NOTHING
+                """,
+                submission_id,
+                reviewer,
+                version_id,
+                task_id,
+                submission_type,
+                high_priority,
+                submitter,
+                comment,
+            )
+            if result.split()[-1] != "0":
+                inserted.append(reviewer)
+
+        if is_new and inserted:
+            await record_submission(
+                conn, project_name, submission_type, high_priority, inserted
+            )
+        elif inserted:
+            await add_reviewer_records(conn, project_name, inserted)
+
+
+async def list_inbox(project_name, reviewer, status="pending", limit=50, cursor=None):
+    """Page of reviewer inbox, high priority first, then newest first.
+
+    Returns:
+        dict: 'items' of the page and 'next_cursor', None on the last page.
+    """
+    await ensure_inbox_table(project_name)
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    args = [reviewer, status]
+    after = ""
+    if cursor:
+        args.extend(decode_cursor(cursor))
+        after = "AND (high_priority, created_at, submission_id) < ($3, $4, $5)"
+    # One extra row tells whether there is a next page
+    args.append(limit + 1)
+    records = await Postgres.fetch(
+        f"""
+        SELECT submission_id, reviewer, version_id, task_id, submission_type,
+               high_priority, submitter, comment, status, created_at, updated_at
+        FROM project_{project_name}.{TABLE_NAME}
+        WHERE reviewer = $1 AND status = $2 {after}
+        ORDER BY high_priority DESC, created_at DESC, submission_id DESC
+        LIMIT ${len(args)}
+        """,
+        *args,
+    )
+    items = [dict(record) for record in records[:limit]]
+    next_cursor = encode_cursor(items[-1]) if len(records) > limit else None
+    for item in items:
+        item["created_at"] = item["created_at"].isoformat()
+        item["updated_at"] = item["updated_at"].isoformat()
+    return {"items": items, "next_cursor": next_cursor}
+
+
+async def set_submission_status(project_name, submission_id, reviewer, status):
+    """Set status of reviewer record, False if there is no such record.
+
+    Setting the current status again changes nothing, so 'updated_at'
+    stays the time of the last real change, e.g. of the approval.
+    """
+    await ensure_inbox_table(project_name)
+    async with Postgres.acquire() as conn, conn.transaction():
+        # Records of all reviewers are locked, aggregates count per submission
+        records = await conn.fetch(
+            f"""
+            SELECT submission_id, reviewer, submission_type, status, created_at, updated_at
+            FROM project_{project_name}.{TABLE_NAME}
+            WHERE submission_id = $1
+            FOR UPDATE
+            """,
+            submission_id,
+        )
+        record = next((record for record in records if record["reviewer"] == reviewer), None)
+        if record is None:
+            return False
+        if record["status"] == status:
+            return True
+        changed_at = await conn.fetchval(
+            f"""
+            UPDATE project_{project_name}.{TABLE_NAME}
+            SET status = $3, updated_at = NOW()
+            WHERE submission_id = $1 AND reviewer = $2
+            RETURNING updated_at
+            """,
+            submission_id,
+            reviewer,
+            status,
+        )
+        await record_status_change(conn, project_name, dict(record), status, changed_at)
+    return True
@@ -40,6 +40,210 @@ class SubmissionSettings(BaseSettingsModel):
         default_factory=lambda: ["WIP", "FINAL", "PACKAGE"],
         title="Available Submission Types"
     )
+    detect_identical_resubmissions: bool = SettingsField(
+        False,
+        title="Detect Identical Resubmissions",
+        description="Fingerprint sampled frames and flag versions without pixel changes since the last submission"
+    )
+    attach_contact_sheet: bool = SettingsField(
+        False,
+        title="Attach Contact Sheet",
+        description="Attach a contact sheet of frames sampled across the viewed media to the review activity"
+    )
+    contact_sheet_frames: int = SettingsField(
+        12,
+        title="Contact Sheet Frames",
+        ge=1
+    )
+    contact_sheet_columns: int = SettingsField(
+        4,
+        title="Contact Sheet Columns",
+        ge=1
+    )
+    contact_sheet_tile_width: int = SettingsField(
+        320,
+        title="Contact Sheet Tile Width",
+        ge=16
+    )
+    attach_annotated_frames: bool = SettingsField(
+        False,
+        title="Attach Annotated Frames",
+        description="Render only frames with RV paint strokes and attach them to the review activity"
+    )
+    max_annotated_frames: int = SettingsField(
+        20,
+        title="Max Annotated Frames",
+        ge=1
+    )
+
+
+class StackSettings(BaseSettingsModel):
+    layout_mode: str = SettingsField(
+        "packed",
+        title="Layout Mode",
+        enum_resolver=lambda: ["packed", "paged"],
+        description="'paged' splits large selections into pages of tiles"
+    )
+    layout_page_size: int = SettingsField(
+        16,
+        title="Tiles per Page",
+        ge=1
+    )
+    max_loaded_pages: int = SettingsField(
+        2,
+        title="Max Loaded Pages",
+        ge=1,
+        description="Pages kept in memory before the least recently viewed is released"
+    )
+    memory_budget_enabled: bool = SettingsField(
+        False,
+        title="Fit Stacks into RV Cache Budget",
+        description="Prefer cheaper representations when the full stack would not fit"
+    )
+    rv_cache_budget_mb: int = SettingsField(
+        4096,
+        title="RV Cache Budget (MB)",
+        ge=1
+    )
+    compare_generations: int = SettingsField(
+        1,
+        title="Compared Generations",
+        ge=1,
+        le=10,
+        description="Number of previously submitted versions to compare against, older than the last one load on first view"
+    )
+    changed_frame_analysis: bool = SettingsField(
+        False,
+        title="Mark Changed Frames",
+        description="Compare downsampled proxies of current and previous version and mark changed frames in RV"
+    )
+    analysis_proxy_width: int = SettingsField(
+        256,
+        title="Analysis Proxy Width",
+        ge=16
+    )
+    changed_frame_threshold: float = SettingsField(
+        0.02,
+        title="Changed Frame Threshold",
+        ge=0.0,
+        le=1.0,
+        description="Mean absolute pixel difference (0-1) from which a frame counts as changed"
+    )
+    analysis_workers: int = SettingsField(
+        4,
+        title="Analysis Worker Processes",
+        ge=1
+    )
+    proxies_enabled: bool = SettingsField(
+        False,
+        title="Stack Proxies",
+        description="Generate downscaled single-layer proxies of heavy image sequences in background and play them in stacks"
+    )
+    proxy_width: int = SettingsField(
+        1024,
+        title="Proxy Width",
+        ge=16
+    )
+    proxy_extensions: list[str] = SettingsField(
+        default_factory=lambda: [".exr", ".dpx"],
+        title="Proxy Extensions",
+        description="Image sequence extensions that get proxies"
+    )
+    proxy_backend: str = SettingsField(
+        "ffmpeg",
+        title="Proxy Transcoder",
+        enum_resolver=lambda: ["ffmpeg", "numpy"]
+    )
+    frame_warm_up: bool = SettingsField(
+        False,
+        title="Warm Up Frames Around Playhead",
+        description="Prefetch media of all inputs of the viewed stack in a window around the playhead, sized by the RV cache"
+    )
+    warm_up_max_frames: int = SettingsField(
+        48,
+        title="Max Warm-up Window (frames)",
+        ge=1
+    )
+    warm_up_readers: int = SettingsField(
+        4,
+        title="Warm-up Reader Threads",
+        ge=1
+    )
+
+
+class PerformanceSettings(BaseSettingsModel):
+    warm_up_on_launch: bool = SettingsField(
+        False,
+        title="Warm-up Caches on Host Launch",
+        description="Pre-fetch settings, reviewers and current folder/tasks in background when OpenRV starts"
+    )
+    warm_up_delay: float = SettingsField(
+        2.0,
+        title="Warm-up Delay (seconds)",
+        ge=0.0
+    )
+    chunked_uploads: bool = SettingsField(
+        False,
+        title="Chunked Resumable Uploads",
+        description="Upload review thumbnails in chunks through the addon endpoints and resume after failures"
+    )
+    upload_chunk_size_mb: int = SettingsField(
+        4,
+        title="Upload Chunk Size (MB)",
+        ge=1
+    )
+    upload_max_retries: int = SettingsField(
+        5,
+        title="Upload Max Retries",
+        ge=0
+    )
+    media_cache_enabled: bool = SettingsField(
+        False,
+        title="Local Media Cache",
+        description="Mirror stacked media to a local cache directory in background and play the local copy once complete"
+    )
+    media_cache_dir: str = SettingsField(
+        "",
+        title="Media Cache Directory",
+        description="Local (SSD) directory, empty uses the addon cache directory"
+    )
+    media_cache_size_gb: int = SettingsField(
+        100,
+        title="Media Cache Size (GB)",
+        description="Least recently used media is evicted beyond this size",
+        ge=1
+    )
+    event_invalidation: bool = SettingsField(
+        False,
+        title="Event-driven Cache Invalidation",
+        description="Poll the project event stream and drop cached settings, tasks and submissions when they change, so caches can keep entries longer"
+    )
+    event_poll_interval: float = SettingsField(
+        5.0,
+        title="Event Poll Interval (seconds)",
+        ge=0.5
+    )
+    event_cache_ttl: int = SettingsField(
+        3600,
+        title="Cache TTL with Event Invalidation (seconds)",
+        description="Time to live of cached entries while the event stream is polled successfully",
+        ge=60
+    )
+    metrics_enabled: bool = SettingsField(
+        False,
+        title="Export Metrics",
+        description="Write API calls, cache hits, uploaded bytes and submissions to a local Prometheus text and JSON file"
+    )
+    metrics_dir: str = SettingsField(
+        "",
+        title="Metrics Directory",
+        description="E.g. the node exporter textfile collector directory, empty uses the addon cache directory"
+    )
+    metrics_flush_interval: float = SettingsField(
+        30.0,
+        title="Metrics Flush Interval (seconds)",
+        ge=1.0
+    )
 
 
 class ReviewSubmitterSettings(BaseSettingsModel):
@@ -56,6 +260,14 @@ class ReviewSubmitterSettings(BaseSettingsModel):
         default_factory=SubmissionSettings,
         title="Submission Settings"
     )
+    stack_settings: StackSettings = SettingsField(
+        default_factory=StackSettings,
+        title="OpenRV Stack Settings"
+    )
+    performance: PerformanceSettings = SettingsField(
+        default_factory=PerformanceSettings,
+        title="Performance"
+    )
 
 
 DEFAULT_VALUES = {
@@ -72,6 +284,48 @@ DEFAULT_VALUES = {
         "auto_submit_on_publish": False,
         "default_reviewers": [],
         "require_comment": True,
-        "submission_types": ["WIP", "FINAL", "PACKAGE"]
+        "submission_types": ["WIP", "FINAL", "PACKAGE"],
+        "detect_identical_resubmissions": False,
+        "attach_contact_sheet": False,
+        "contact_sheet_frames": 12,
+        "contact_sheet_columns": 4,
+        "contact_sheet_tile_width": 320,
+        "attach_annotated_frames": False,
+        "max_annotated_frames": 20
+    },
+    "stack_settings": {
+        "layout_mode": "packed",
+        "layout_page_size": 16,
+        "max_loaded_pages": 2,
+        "memory_budget_enabled": False,
+        "rv_cache_budget_mb": 4096,
+        "compare_generations": 1,
+        "changed_frame_analysis": False,
+        "analysis_proxy_width": 256,
+        "changed_frame_threshold": 0.02,
+        "analysis_workers": 4,
+        "proxies_enabled": False,
+        "proxy_width": 1024,
+        "proxy_extensions": [".exr", ".dpx"],
+        "proxy_backend": "ffmpeg",
+        "frame_warm_up": False,
+        "warm_up_max_frames": 48,
+        "warm_up_readers": 4
+    },
+    "performance": {
+        "warm_up_on_launch": False,
+        "warm_up_delay": 2.0,
+        "chunked_uploads": False,
+        "upload_chunk_size_mb": 4,
+        "upload_max_retries": 5,
+        "media_cache_enabled": False,
+        "media_cache_dir": "",
+        "media_cache_size_gb": 100,
+        "event_invalidation": False,
+        "event_poll_interval": 5.0,
+        "event_cache_ttl": 3600,
+        "metrics_enabled": False,
+        "metrics_dir": "",
+        "metrics_flush_interval": 30.0
     }
 }
@@ -0,0 +1,229 @@
+"""Storing of review thumbnails uploaded through the addon.
+
+Every stored thumbnail also gets downscaled resolution tiers, so views
+that render small tiles do not download the full image. Tiers are kept in
+a project table with a strong ETag of their content.
+"""
+import asyncio
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+from ayon_server.lib.postgres import Postgres
+from ayon_server.logging import logger
+from ayon_server.utils import create_uuid
+
+try:
+    from ayon_server.helpers.thumbnails import store_thumbnail
+except ImportError:
+    store_thumbnail = None
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# Longest edge of derived tiers in pixels
+THUMBNAIL_TIERS = (128, 512, 1024)
+TIERS_TABLE = "review_submitter_thumbnail_tiers"
+TIER_JPEG_QUALITY = 85
+# In-process cache of served tiers
+MEMORY_CACHE_SIZE = 64 * 1024 * 1024
+
+_initialized_projects = set()
+
+
+class _TierCache:
+    """Byte-bounded LRU of served tiers, thumbnails never change"""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            tier = self._items.get(key)
+            if tier is not None:
+                self._items.move_to_end(key)
+            return tier
+
+    def set(self, key, tier):
+        with self._lock:
+            if key in self._items:
+                return
+            self._items[key] = tier
+            self._size += len(tier["data"])
+            while self._size > self.max_size and self._items:
+                _key, evicted = self._items.popitem(last=False)
+                self._size -= len(evicted["data"])
+
+
+_tier_cache = _TierCache(MEMORY_CACHE_SIZE)
+
+
+async def store_review_thumbnail(project_name, mime, payload, user_name=None):
+    """Store thumbnail and its resolution tiers in project, returns its id"""
+    thumbnail_id = create_uuid()
+    if store_thumbnail is not None:
+        await store_thumbnail(
+            project_name=project_name,
+            thumbnail_id=thumbnail_id,
+            mime=mime,
+            payload=payload,
+            user_name=user_name,
+        )
+    else:
+        # Older servers keep thumbnails in the project schema
+        await Postgres.execute(
+            f"""
+            INSERT INTO project_{project_name}.thumbnails (id, mime, data)
+            VALUES ($1, $2, $3)
+            """,
+            thumbnail_id,
+            mime,
+            payload,
+        )
+    try:
+        await store_thumbnail_tiers(project_name, thumbnail_id, payload)
+    except Exception as e:
+        # Tiers are derived again on first request
+        logger.warning(f"Could not derive tiers of thumbnail {thumbnail_id}: {e}")
+    return thumbnail_id
+
+
+def get_etag(data):
+    """Strong ETag of tier content"""
+    return '"{}"'.format(hashlib.sha256(data).hexdigest()[:32])
+
+
+def pick_tier(size):
+    """Smallest tier covering 'size', the largest tier for bigger sizes"""
+    for tier in THUMBNAIL_TIERS:
+        if size <= tier:
+            return tier
+    return THUMBNAIL_TIERS[-1]
+
+
+def derive_tiers(payload):
+    """Downscale image to every tier, never upscales.
+
+    Returns:
+        dict[int, dict]: 'mime', 'etag' and 'data' by tier.
+    """
+    if Image is None:
+        raise RuntimeError("Pillow is required to derive thumbnail tiers")
+
+    with Image.open(io.BytesIO(payload)) as image:
+        image.load()
+        has_alpha = "A" in image.getbands() or "transparency" in image.info
+        source = image.convert("RGBA" if has_alpha else "RGB")
+
+    tiers = {}
+    for tier in THUMBNAIL_TIERS:
+        resized = source.copy()
+        resized.thumbnail((tier, tier), Image.LANCZOS)
+        stream = io.BytesIO()
+        if has_alpha:
+            resized.save(stream, format="PNG", optimize=True)
+            mime = "image/png"
+        else:
+            resized.save(stream, format="JPEG", quality=TIER_JPEG_QUALITY, optimize=True)
+            mime = "image/jpeg"
+        data = stream.getvalue()
+        tiers[tier] = {"mime": mime, "etag": get_etag(data), "data": data}
+    return tiers
+
+
+async def ensure_tiers_table(project_name):
+    if project_name in _initialized_projects:
+        return
+    await Postgres.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS project_{project_name}.{TIERS_TABLE} (
+            thumbnail_id VARCHAR NOT NULL,
+            size INTEGER NOT NULL,
+            mime VARCHAR NOT NULL,
+            etag VARCHAR NOT NULL,
+            data BYTEA NOT NULL,
+            PRIMARY KEY (thumbnail_id, size)
+        )
+        """
+    )
+    _initialized_projects.add(project_name)
+
+
+async def store_thumbnail_tiers(project_name, thumbnail_id, payload):
+    """Derive tiers of thumbnail and store them, returns the tiers"""
+    await ensure_tiers_table(project_name)
+    tiers = await asyncio.to_thread(derive_tiers, payload)
+    async with Postgres.acquire() as conn, conn.transaction():
+        for size, tier in tiers.items():
+            await conn.execute(
+                f"""
+                INSERT INTO project_{project_name}.{TIERS_TABLE}
+                (thumbnail_id, size, mime, etag, data)
+                VALUES ($1, $2, $3, $4, $5)
+                ON CONFLICT (thumbnail_id, size) DO NOTHING
+                """,
+                thumbnail_id,
+                size,
+                tier["mime"],
+                tier["etag"],
+                tier["data"],
+            )
+    return tiers
+
+
+async def _load_thumbnail_data(project_name, thumbnail_id):
+    """Original image of thumbnail kept in the project schema, None otherwise"""
+    records = await Postgres.fetch(
+        f"SELECT data FROM project_{project_name}.thumbnails WHERE id = $1",
+        thumbnail_id,
+    )
+    if not records or not records[0]["data"]:
+        return None
+    return bytes(records[0]["data"])
+
+
+async def get_thumbnail_tier(project_name, thumbnail_id, size):
+    """Tier of thumbnail closest to 'size', None if it cannot be served.
+
+    Thumbnails uploaded outside the addon get their tiers derived on the
+    first request, when their original is in the project schema.
+    """
+    tier_size = pick_tier(size)
+    key = (project_name, thumbnail_id, tier_size)
+    tier = _tier_cache.get(key)
+    if tier is not None:
+        return tier
+
+    await ensure_tiers_table(project_name)
+    records = await Postgres.fetch(
+        f"""
+        SELECT mime, etag, data FROM project_{project_name}.{TIERS_TABLE}
+        WHERE thumbnail_id = $1 AND size = $2
+        """,
+        thumbnail_id,
+        tier_size,
+    )
+    if records:
+        record = records[0]
+        tier = {"mime": record["mime"], "etag": record["etag"], "data": bytes(record["data"])}
+    else:
+        payload = await _load_thumbnail_data(project_name, thumbnail_id)
+        if payload is None:
+            return None
+        tier = (await store_thumbnail_tiers(project_name, thumbnail_id, payload))[tier_size]
+    _tier_cache.set(key, tier)
+    return tier
+
+
+async def get_version_thumbnail_id(project_name, version_id):
+    records = await Postgres.fetch(
+        f"SELECT thumbnail_id FROM project_{project_name}.versions WHERE id = $1",
+        version_id,
+    )
+    return records[0]["thumbnail_id"] if records else None
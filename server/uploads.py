@@ -0,0 +1,164 @@
+"""Staging of resumable chunked uploads."""
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+
+UPLOAD_ID_PATTERN = re.compile(r"^[0-9a-f]{16,64}$")
+PROJECT_NAME_PATTERN = re.compile(r"^[a-zA-Z0-9_]+$")
+# Seconds an upload is kept after its last chunk or finalize
+UPLOAD_TTL = 24 * 3600
+SWEEP_INTERVAL = 3600
+
+
+class UploadOffsetMismatch(Exception):
+    """Chunk does not start at the staged offset."""
+
+    def __init__(self, offset):
+        super().__init__(f"Expected chunk at offset {offset}")
+        self.offset = offset
+
+
+class UploadStore:
+    """Stage chunks of uploads on disk until they are finalized.
+
+    Each upload has a data file and a small JSON metadata file with the
+    total size and, once finalized, the finalize result. Keeping the result
+    makes a repeated finalize request (e.g. after a lost response) return
+    the same answer instead of failing.
+
+    Uploads without activity for 'ttl' seconds are removed, finalized and
+    abandoned ones alike. The sweep runs at most once per 'SWEEP_INTERVAL'
+    when an upload starts or is finalized.
+    """
+
+    def __init__(self, root=None, ttl=UPLOAD_TTL):
+        self.root = root or os.path.join(tempfile.gettempdir(), "review_submitter_uploads")
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._last_sweep = 0.0
+
+    def _dir(self, project_name, upload_id):
+        if not PROJECT_NAME_PATTERN.match(project_name):
+            raise ValueError(f"Invalid project name '{project_name}'")
+        if not UPLOAD_ID_PATTERN.match(upload_id):
+            raise ValueError(f"Invalid upload id '{upload_id}'")
+        return os.path.join(self.root, project_name, upload_id)
+
+    def _read_meta(self, upload_dir):
+        meta_path = os.path.join(upload_dir, "meta.json")
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, "r") as stream:
+            return json.load(stream)
+
+    def _write_meta(self, upload_dir, meta):
+        with open(os.path.join(upload_dir, "meta.json"), "w") as stream:
+            json.dump(meta, stream)
+
+    def status(self, project_name, upload_id):
+        """Staged offset and size, None if upload is unknown"""
+        upload_dir = self._dir(project_name, upload_id)
+        meta = self._read_meta(upload_dir)
+        if meta is None:
+            return None
+        data_path = os.path.join(upload_dir, "data")
+        offset = os.path.getsize(data_path) if os.path.exists(data_path) else meta["size"]
+        return {"offset": offset, "size": meta["size"], "result": meta.get("result")}
+
+    def append(self, project_name, upload_id, offset, size, chunk):
+        """Append chunk at offset, returns new staged offset"""
+        upload_dir = self._dir(project_name, upload_id)
+        if size < 1:
+            raise ValueError("Upload length must be positive, empty files are not accepted")
+        with self._lock:
+            os.makedirs(upload_dir, exist_ok=True)
+            meta = self._read_meta(upload_dir)
+            if meta is None:
+                meta = {"size": size}
+                self._write_meta(upload_dir, meta)
+                self._maybe_sweep()
+
+            data_path = os.path.join(upload_dir, "data")
+            staged = os.path.getsize(data_path) if os.path.exists(data_path) else 0
+            if offset != staged or offset + len(chunk) > meta["size"]:
+                raise UploadOffsetMismatch(staged)
+
+            with open(data_path, "ab") as stream:
+                stream.write(chunk)
+            return staged + len(chunk)
+
+    def data_path(self, project_name, upload_id):
+        """Path to data of a complete upload, None if not complete"""
+        status = self.status(project_name, upload_id)
+        if status is None or status["offset"] != status["size"]:
+            return None
+        return os.path.join(self._dir(project_name, upload_id), "data")
+
+    def read(self, project_name, upload_id):
+        """Content of a complete upload, None if not complete"""
+        data_path = self.data_path(project_name, upload_id)
+        if data_path is None:
+            return None
+        with open(data_path, "rb") as stream:
+            return stream.read()
+
+    def complete(self, project_name, upload_id, result):
+        """Drop staged data and remember finalize result"""
+        upload_dir = self._dir(project_name, upload_id)
+        with self._lock:
+            meta = self._read_meta(upload_dir) or {}
+            meta["result"] = result
+            self._write_meta(upload_dir, meta)
+            data_path = os.path.join(upload_dir, "data")
+            if os.path.exists(data_path):
+                os.remove(data_path)
+            self._maybe_sweep()
+
+    def discard(self, project_name, upload_id):
+        shutil.rmtree(self._dir(project_name, upload_id), ignore_errors=True)
+
+    @staticmethod
+    def _last_activity(upload_dir):
+        return max(
+            [os.path.getmtime(upload_dir)]
+            + [entry.stat().st_mtime for entry in os.scandir(upload_dir)]
+        )
+
+    def sweep(self, now=None):
+        """Remove uploads without activity for 'ttl' seconds.
+
+        Returns:
+            int: Number of removed uploads.
+        """
+        now = now or time.time()
+        removed = 0
+        if not os.path.isdir(self.root):
+            return removed
+        for project_entry in os.scandir(self.root):
+            if not project_entry.is_dir():
+                continue
+            for upload_entry in os.scandir(project_entry.path):
+                try:
+                    if now - self._last_activity(upload_entry.path) < self.ttl:
+                        continue
+                except OSError:
+                    # Removed by a concurrent sweep
+                    continue
+                shutil.rmtree(upload_entry.path, ignore_errors=True)
+                removed += 1
+        return removed
+
+    def _maybe_sweep(self):
+        """Sweep if the last sweep is older than 'SWEEP_INTERVAL', needs the lock"""
+        now = time.time()
+        if now - self._last_sweep < SWEEP_INTERVAL:
+            return
+        self._last_sweep = now
+        try:
+            self.sweep(now)
+        except OSError as e:
+            print(f"Could not sweep staged uploads: {e}")
@@ -0,0 +1,112 @@
+"""Stand-ins of AYON server modules for tests of the server addon.
+
+Server modules are imported from a 'review_submitter_server' package
+pointing at 'server/', so the addon '__init__', which needs a running
+AYON server, is never executed.
+"""
+import asyncio
+import importlib
+import json
+import os
+import sys
+import types
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVER_DIR = os.path.join(ROOT_DIR, "server")
+SERVER_PACKAGE = "review_submitter_server"
+# DSN of a PostgreSQL database the database tests may create schemas in
+POSTGRES_DSN_ENV = "REVIEW_SUBMITTER_TEST_POSTGRES"
+PROJECT_NAME = "review_submitter_test"
+
+
+class Postgres:
+    """'ayon_server.lib.postgres.Postgres' backed by an asyncpg pool"""
+
+    pool = None
+
+    @classmethod
+    def acquire(cls):
+        return cls.pool.acquire()
+
+    @classmethod
+    async def execute(cls, query, *args):
+        return await cls.pool.execute(query, *args)
+
+    @classmethod
+    async def fetch(cls, query, *args):
+        return await cls.pool.fetch(query, *args)
+
+
+async def _init_connection(conn):
+    # JSON columns are decoded like the AYON server does
+    await conn.set_type_codec(
+        "jsonb", encoder=json.dumps, decoder=json.loads, schema="pg_catalog")
+
+
+def _stub_module(name, **attributes):
+    module = types.ModuleType(name)
+    module.__path__ = []
+    module.__dict__.update(attributes)
+    return module
+
+
+@pytest.fixture
+def server_package(monkeypatch):
+    """Import server addon modules by name, e.g. 'analytics'"""
+    for name in list(sys.modules):
+        if name == SERVER_PACKAGE or name.startswith(f"{SERVER_PACKAGE}."):
+            monkeypatch.delitem(sys.modules, name)
+    modules = {
+        "ayon_server": _stub_module("ayon_server"),
+        "ayon_server.lib": _stub_module("ayon_server.lib"),
+        "ayon_server.lib.postgres": _stub_module("ayon_server.lib.postgres", Postgres=Postgres),
+        SERVER_PACKAGE: _stub_module(SERVER_PACKAGE, __path__=[SERVER_DIR]),
+    }
+    for name, module in modules.items():
+        parent, _, child = name.rpartition(".")
+        if parent in modules:
+            setattr(modules[parent], child, module)
+        monkeypatch.setitem(sys.modules, name, module)
+
+    def _import(name):
+        return importlib.import_module(f"{SERVER_PACKAGE}.{name}")
+    return _import
+
+
+@pytest.fixture
+def database(server_package):
+    """Run coroutine function with a fresh project schema in PostgreSQL.
+
+    Skipped without asyncpg or a DSN in 'REVIEW_SUBMITTER_TEST_POSTGRES'.
+    The project schema 'project_review_submitter_test' is dropped and
+    created again, with the 'tasks' table the analytics backfill reads.
+    """
+    asyncpg = pytest.importorskip("asyncpg")
+    dsn = os.environ.get(POSTGRES_DSN_ENV)
+    if not dsn:
+        pytest.skip(f"Set {POSTGRES_DSN_ENV} to run database tests")
+    schema = f"project_{PROJECT_NAME}"
+
+    async def _run(test):
+        Postgres.pool = await asyncpg.create_pool(
+            dsn, min_size=1, max_size=4, init=_init_connection)
+        try:
+            await Postgres.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+            await Postgres.execute(f"CREATE SCHEMA {schema}")
+            await Postgres.execute(
+                f"""
+                CREATE TABLE {schema}.tasks (
+                    id VARCHAR PRIMARY KEY,
+                    data JSONB NOT NULL DEFAULT '{{}}'::jsonb
+                )
+                """
+            )
+            return await test()
+        finally:
+            await Postgres.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+            await Postgres.pool.close()
+            Postgres.pool = None
+
+    return lambda test: asyncio.run(_run(test))
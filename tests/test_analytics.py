@@ -0,0 +1,45 @@
+"""Submission analytics of the server addon."""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+UTC = timezone.utc
+
+
+@pytest.fixture
+def analytics(server_package):
+    return server_package("analytics")
+
+
+def test_submitted_at_keeps_offset_and_reads_legacy_values_as_utc(analytics):
+    task_data = {
+        "submission_data": {
+            "submission_id": "current",
+            "reviewer_name": "reviewer",
+            "submitted_at": "2026-10-19T14:30:00+02:00",
+        },
+        "submission_history": [
+            {
+                "reviewer_name": "reviewer",
+                "workfile_version_id": "version1",
+                "submitted_at": "2026-10-18 14:30:00",
+            },
+            {"reviewer_name": "reviewer", "submitted_at": "yesterday"},
+        ],
+    }
+
+    submissions = list(analytics._iter_task_submissions("task1", task_data))
+
+    assert [submitted_at for _, submitted_at, _ in submissions] == [
+        datetime(2026, 10, 19, 12, 30, tzinfo=UTC),
+        datetime(2026, 10, 18, 14, 30, tzinfo=UTC),
+    ]
+    assert submissions[0][0] == "current"
+    # Legacy submissions get an id stable across backfills
+    assert submissions[1][0] == list(analytics._iter_task_submissions("task1", task_data))[1][0]
+
+
+def test_client_timestamps_parse_to_the_same_instant(analytics):
+    now = datetime.now(timezone(timedelta(hours=-7))).replace(microsecond=0)
+    written = now.astimezone(UTC).isoformat(timespec="seconds")
+    assert analytics.parse_submitted_at(written) == now
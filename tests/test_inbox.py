@@ -0,0 +1,143 @@
+"""Reviewer inbox and its analytics against a PostgreSQL database."""
+import pytest
+
+from conftest import PROJECT_NAME, Postgres
+
+INBOX = f"project_{PROJECT_NAME}.review_submitter_inbox"
+
+
+@pytest.fixture
+def inbox(server_package):
+    return server_package("inbox")
+
+
+@pytest.fixture
+def analytics(server_package):
+    return server_package("analytics")
+
+
+async def _add(inbox, submission_id, reviewers=("anna",), high_priority=False, submission_type="WIP"):
+    await inbox.add_submission(
+        PROJECT_NAME,
+        submission_id,
+        list(reviewers),
+        version_id=f"version_{submission_id}",
+        submission_type=submission_type,
+        high_priority=high_priority,
+    )
+
+
+async def _read_all_pages(inbox, limit):
+    pages = []
+    cursor = None
+    while True:
+        page = await inbox.list_inbox(PROJECT_NAME, "anna", limit=limit, cursor=cursor)
+        pages.append([item["submission_id"] for item in page["items"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def test_keyset_pages_cover_the_inbox_once(database, inbox):
+    async def _test():
+        for index in range(7):
+            await _add(inbox, f"sub{index}", high_priority=index in (1, 4))
+        await _add(inbox, "other", reviewers=["ben"])
+        await _add(inbox, "approved")
+        await inbox.set_submission_status(PROJECT_NAME, "approved", "anna", "approved")
+        # Ties on every sort key but the id are ordered by the id
+        await Postgres.execute(
+            f"UPDATE {INBOX} SET created_at = '2026-10-19T12:00:00+00:00'"
+            " WHERE submission_id IN ('sub2', 'sub3', 'sub5')"
+        )
+
+        full = (await inbox.list_inbox(PROJECT_NAME, "anna", limit=50))["items"]
+        order = [item["submission_id"] for item in full]
+        assert order == ["sub4", "sub1", "sub6", "sub0", "sub5", "sub3", "sub2"]
+
+        for limit in (1, 3, 6):
+            pages = await _read_all_pages(inbox, limit)
+            assert [item for page in pages for item in page] == order
+            assert all(len(page) == limit for page in pages[:-1])
+            assert 0 < len(pages[-1]) <= limit
+
+        # A last page filled exactly has no cursor to an empty page
+        assert await _read_all_pages(inbox, 7) == [order]
+        # Page size is clamped to at least one record
+        assert len((await inbox.list_inbox(PROJECT_NAME, "anna", limit=0))["items"]) == 1
+        with pytest.raises(ValueError):
+            await inbox.list_inbox(PROJECT_NAME, "anna", cursor="not a cursor")
+
+    database(_test)
+
+
+def test_repeated_submission_id_is_counted_once(database, inbox, analytics):
+    async def _test():
+        await _add(inbox, "sub1", reviewers=["anna", "ben"], high_priority=True)
+        await _add(inbox, "sub1", reviewers=["anna", "ben"], high_priority=True)
+
+        records = await Postgres.fetch(f"SELECT reviewer FROM {INBOX} ORDER BY reviewer")
+        assert [record["reviewer"] for record in records] == ["anna", "ben"]
+        stats = await analytics.get_analytics(PROJECT_NAME)
+        assert [(day["submissions"], day["high_priority"]) for day in stats["daily"]] == [(1, 1)]
+        assert stats["submission_types"]["WIP"]["submissions"] == 1
+        assert {item["reviewer"]: item["submissions"] for item in stats["top_reviewers"]} == {
+            "anna": 1, "ben": 1
+        }
+
+        # A retry adding a reviewer only counts the new inbox record
+        await _add(inbox, "sub1", reviewers=["anna", "ben", "carl"], high_priority=True)
+        stats = await analytics.get_analytics(PROJECT_NAME)
+        assert stats["submission_types"]["WIP"]["submissions"] == 1
+        assert {item["reviewer"]: item["pending"] for item in stats["top_reviewers"]} == {
+            "anna": 1, "ben": 1, "carl": 1
+        }
+
+    database(_test)
+
+
+def test_repeated_status_keeps_approval_time(database, inbox):
+    async def _test():
+        await _add(inbox, "sub1")
+        assert await inbox.set_submission_status(PROJECT_NAME, "sub1", "anna", "approved")
+        approved_at = (await inbox.list_inbox(PROJECT_NAME, "anna", status="approved"))["items"][0]["updated_at"]
+
+        assert await inbox.set_submission_status(PROJECT_NAME, "sub1", "anna", "approved")
+        item = (await inbox.list_inbox(PROJECT_NAME, "anna", status="approved"))["items"][0]
+        assert item["updated_at"] == approved_at
+        assert not await inbox.set_submission_status(PROJECT_NAME, "sub1", "ben", "approved")
+
+    database(_test)
+
+
+def test_incremental_aggregates_match_a_rebuild(database, inbox, analytics):
+    async def _test():
+        await _add(inbox, "sub1", reviewers=["anna", "ben"])
+        await _add(inbox, "sub2", reviewers=["anna"], submission_type="FINAL")
+        await _add(inbox, "sub3", reviewers=["ben"], high_priority=True)
+        # Approval times one and two hours after the submission
+        for submission_id, reviewer, hours in (("sub1", "anna", 1), ("sub1", "ben", 2), ("sub2", "anna", 3)):
+            await Postgres.execute(
+                f"UPDATE {INBOX} SET created_at = NOW() - make_interval(hours => $3)"
+                " WHERE submission_id = $1 AND reviewer = $2",
+                submission_id, reviewer, hours,
+            )
+            await inbox.set_submission_status(PROJECT_NAME, submission_id, reviewer, "approved")
+
+        # Revoking the first approval keeps the submission approved by ben
+        await inbox.set_submission_status(PROJECT_NAME, "sub1", "anna", "pending")
+        await inbox.set_submission_status(PROJECT_NAME, "sub3", "ben", "rejected")
+
+        incremental = await analytics.get_analytics(PROJECT_NAME)
+        assert incremental["submission_types"]["WIP"]["submissions"] == 2
+        assert incremental["submission_types"]["WIP"]["approved"] == 1
+        assert incremental["submission_types"]["WIP"]["avg_turnaround_hours"] == 2.0
+        assert incremental["submission_types"]["FINAL"]["avg_turnaround_hours"] == 3.0
+        reviewers = {item["reviewer"]: item for item in incremental["top_reviewers"]}
+        assert (reviewers["anna"]["pending"], reviewers["anna"]["approved"]) == (1, 1)
+        assert (reviewers["ben"]["pending"], reviewers["ben"]["approved"]) == (0, 1)
+
+        assert await analytics.backfill_analytics(PROJECT_NAME) == {"tasks": 0, "added": 0}
+        assert await analytics.get_analytics(PROJECT_NAME) == incremental
+
+    database(_test)
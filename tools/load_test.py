@@ -0,0 +1,275 @@
+#!/usr/bin/env python
+"""Load test of the review submission path.
+
+Every simulated submission calls 'submit_review' of the addon with
+ayon_api pointed at the tested server, so the addon sends exactly the
+requests it sends when an artist submits a review: addon settings,
+version activity, thumbnail upload, thumbnail operation, reviewer inbox
+record, task read and task data update. Submissions run concurrently and
+the report lists p50/p95/p99 latency, throughput and error rate of whole
+submissions and of each AYON request.
+
+Per-request numbers come from the addon metrics registry, so their
+percentiles are upper bounds of the latency histogram buckets.
+
+Needs the client dependencies of the addon (ayon_api, ayon_core).
+
+Example:
+    python tools/load_test.py --start-mock --submissions 200 --concurrency 50 \
+        --latency 0.02 --jitter 0.05 --error-rate 0.01
+"""
+import argparse
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLIENT_DIR = os.path.join(ROOT_DIR, "client")
+
+# Reported requests in submission order, named like the addon metrics operations
+STEPS = (
+    "create_activity",
+    "upload_thumbnail",
+    "update_version_thumbnail",
+    "add_inbox_submission",
+    "get_task",
+    "update_task"
+)
+# Reviewers are picked from the users of the mock server
+REVIEWER_COUNT = 200
+
+
+def load_submission_path(server_url, api_key, project_name):
+    """Point ayon_api at the server and import the addon submission path.
+
+    Must run before anything in the process creates an ayon_api connection.
+
+    Returns:
+        tuple[module, module]: 'submission_helper' and 'metrics' modules.
+    """
+    os.environ["AYON_SERVER_URL"] = server_url
+    os.environ["AYON_API_KEY"] = api_key or "load-test"
+    os.environ["AYON_PROJECT_NAME"] = project_name
+    if CLIENT_DIR not in sys.path:
+        sys.path.insert(0, CLIENT_DIR)
+
+    from review_submitter.handlers import metrics, submission_helper
+
+    return submission_helper, metrics
+
+
+def _api_call_snapshot(metrics):
+    return metrics.API_CALLS.samples(), metrics.API_CALL_DURATION.samples()
+
+
+def _step_reports(metrics, before, after):
+    """Requests sent between two snapshots by operation"""
+    calls_before, durations_before = before
+    calls_after, durations_after = after
+    buckets = metrics.API_CALL_DURATION.buckets
+
+    operations = {key[0] for key in calls_after}
+    ordered = [step for step in STEPS if step in operations]
+    ordered.extend(sorted(operations - set(STEPS)))
+
+    steps = {}
+    for operation in ordered:
+        ok = calls_after.get((operation, "ok"), 0) - calls_before.get((operation, "ok"), 0)
+        errors = calls_after.get((operation, "error"), 0) - calls_before.get((operation, "error"), 0)
+        empty = {"buckets": [0] * len(buckets), "count": 0}
+        entry = durations_after.get((operation,), empty)
+        previous = durations_before.get((operation,), empty)
+        counts = [a - b for a, b in zip(entry["buckets"], previous["buckets"])]
+        total = entry["count"] - previous["count"]
+        attempts = ok + errors
+        steps[operation] = {
+            "count": attempts,
+            "errors": errors,
+            "error_rate": errors / attempts if attempts else 0.0,
+            "p50_ms": _ms(bucket_percentile(buckets, counts, total, 50)),
+            "p95_ms": _ms(bucket_percentile(buckets, counts, total, 95)),
+            "p99_ms": _ms(bucket_percentile(buckets, counts, total, 99))
+        }
+    return steps
+
+
+def bucket_percentile(bounds, cumulative_counts, total, percent):
+    """Upper bound of the histogram bucket holding the percentile"""
+    if not total:
+        return None
+    rank = max(1, math.ceil(percent / 100.0 * total))
+    for bound, count in zip(bounds, cumulative_counts):
+        if count >= rank:
+            return bound
+    return bounds[-1]
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of values"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, int(round(percent / 100.0 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def _summary(durations, attempts):
+    return {
+        "count": attempts,
+        "errors": attempts - len(durations),
+        "error_rate": (attempts - len(durations)) / attempts if attempts else 0.0,
+        "p50_ms": _ms(percentile(durations, 50)),
+        "p95_ms": _ms(percentile(durations, 95)),
+        "p99_ms": _ms(percentile(durations, 99))
+    }
+
+
+def _ms(value):
+    return None if value is None else round(value * 1000, 2)
+
+
+def run_load_test(
+    server_url,
+    project_name="load_test",
+    submissions=200,
+    concurrency=50,
+    tasks=50,
+    ramp_up=0.0,
+    thumbnail_kb=64,
+    api_key=""
+):
+    """Run concurrent submissions through the addon and return report dictionary"""
+    submission_helper, metrics = load_submission_path(server_url, api_key, project_name)
+    thumbnail = os.urandom(thumbnail_kb * 1024)
+    task_ids = [uuid.uuid5(uuid.NAMESPACE_OID, f"task{index}").hex for index in range(max(1, tasks))]
+    thumbnail_dir = tempfile.mkdtemp(prefix="review_submitter_load_test_")
+
+    def _run(index):
+        if ramp_up:
+            delay = start + ramp_up * index / submissions - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        # The addon removes the thumbnail once it is uploaded
+        thumbnail_path = os.path.join(thumbnail_dir, f"thumbnail_{index}.png")
+        with open(thumbnail_path, "wb") as stream:
+            stream.write(thumbnail)
+        reviewer = f"artist{index % REVIEWER_COUNT:03d}"
+        submission_start = time.perf_counter()
+        try:
+            submission_helper.submit_review(
+                uuid.uuid4().hex,
+                {
+                    "reviewer": reviewer,
+                    "reviewers": [reviewer],
+                    "submission_type": "WIP",
+                    "is_high_priority": index % 10 == 0,
+                    "comment": "Load test"
+                },
+                {
+                    "project_name": project_name,
+                    "source": "load_test",
+                    "task_id": task_ids[index % len(task_ids)],
+                    "submitter_name": "load_test",
+                    "thumbnail_path": thumbnail_path,
+                    "loaded_products": {}
+                }
+            )
+            return time.perf_counter() - submission_start
+        except Exception:
+            return None
+
+    before = _api_call_snapshot(metrics)
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(_run, range(submissions)))
+    finally:
+        shutil.rmtree(thumbnail_dir, ignore_errors=True)
+    elapsed = time.perf_counter() - start
+
+    totals = [total for total in results if total is not None]
+    report = {
+        "submissions": _summary(totals, submissions),
+        "steps": _step_reports(metrics, before, _api_call_snapshot(metrics)),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_per_s": round(len(totals) / elapsed, 2) if elapsed else None,
+        "concurrency": concurrency
+    }
+    return report
+
+
+def print_report(report):
+    print(f"Elapsed {report['elapsed_s']} s, concurrency {report['concurrency']}, "
+          f"throughput {report['throughput_per_s']} submissions/s")
+    header = f"{'':<26}{'count':>7}{'errors':>8}{'err %':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    print(header)
+    rows = [("submission", report["submissions"])] + list(report["steps"].items())
+    for name, row in rows:
+        print(
+            f"{name:<26}{row['count']:>7}{row['errors']:>8}{row['error_rate'] * 100:>8.2f}"
+            f"{_format(row['p50_ms'])}{_format(row['p95_ms'])}{_format(row['p99_ms'])}"
+        )
+
+
+def _format(value):
+    return f"{'-' if value is None else value:>10}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--server-url", default=os.environ.get("AYON_SERVER_URL", "http://127.0.0.1:5056"))
+    parser.add_argument("--api-key", default=os.environ.get("AYON_API_KEY", ""))
+    parser.add_argument("--project", default="load_test")
+    parser.add_argument("--submissions", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--tasks", type=int, default=50, help="Tasks shared by submissions")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="Seconds to start all submissions")
+    parser.add_argument("--thumbnail-kb", type=int, default=64)
+    parser.add_argument("--json", dest="json_path", default=None, help="Write report to JSON file")
+    parser.add_argument("--start-mock", action="store_true", help="Run mock server in this process")
+    parser.add_argument("--latency", type=float, default=0.0, help="Mock server latency")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Mock server latency jitter")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Mock server error rate")
+    parser.add_argument("--seed", type=int, default=None, help="Mock server fault seed")
+    args = parser.parse_args()
+
+    server = None
+    server_url = args.server_url
+    if args.start_mock:
+        from mock_ayon_server import create_server
+
+        server = create_server(
+            "127.0.0.1", 0, args.latency, args.jitter, args.error_rate, seed=args.seed)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        server_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        report = run_load_test(
+            server_url,
+            args.project,
+            args.submissions,
+            args.concurrency,
+            args.tasks,
+            args.ramp_up,
+            args.thumbnail_kb,
+            args.api_key
+        )
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, "w") as stream:
+            json.dump(report, stream, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,356 @@
+#!/usr/bin/env python
+"""Local mock of the AYON server endpoints used by the review submission path.
+
+Covers the requests sent while submitting a review through ayon_api:
+server info and current user of the connection, addon settings, graphql
+user and task queries, version activities, thumbnails, activity files,
+operations, task updates, the review_submitter reviewer inbox and
+resumable upload endpoints. Entities are kept in memory, latency and
+errors can be injected to see how clients behave under load.
+
+Example:
+    python tools/mock_ayon_server.py --port 5056 --latency 0.05 --jitter 0.1 --error-rate 0.01
+"""
+import argparse
+import base64
+import json
+import random
+import re
+import threading
+import time
+import urllib.parse
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from upload_stand_in import FaultInjector, handle_upload_request, send_json, uploads
+
+ROUTES = (
+    ("info", "GET", re.compile(r"^/api/info$")),
+    ("me", "GET", re.compile(r"^/api/users/me$")),
+    ("settings", "GET", re.compile(r"^/api/addons/review_submitter/[^/]+/settings(/[^/]+)?$")),
+    ("graphql", "POST", re.compile(r"^/(api/)?graphql$")),
+    ("activity", "POST", re.compile(r"^/api/projects/(?P<project>[^/]+)/(?P<entity_type>[a-z]+)s/(?P<entity_id>[^/]+)/activities$")),
+    ("thumbnail", "POST", re.compile(r"^/api/projects/(?P<project>[^/]+)/thumbnails$")),
+    ("thumbnail", "POST", re.compile(r"^/api/addons/review_submitter/[^/]+/projects/(?P<project>[^/]+)/thumbnails$")),
+    ("file", "POST", re.compile(r"^/api/projects/(?P<project>[^/]+)/files$")),
+    ("operations", "POST", re.compile(r"^/api/projects/(?P<project>[^/]+)/operations$")),
+    ("update_task", "PATCH", re.compile(r"^/api/projects/(?P<project>[^/]+)/tasks/(?P<task_id>[^/]+)$")),
+    ("add_inbox", "POST", re.compile(r"^/api/addons/review_submitter/[^/]+/projects/(?P<project>[^/]+)/inbox$")),
+    ("get_inbox", "GET", re.compile(r"^/api/addons/review_submitter/[^/]+/projects/(?P<project>[^/]+)/inbox$")),
+    ("stats", "GET", re.compile(r"^/mock/stats$")),
+)
+SERVER_VERSION = "1.8.0"
+
+
+class FaultPolicy:
+    """Random latency and error injection, thread safe."""
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def apply(self):
+        """Sleep injected latency, returns True if request should fail"""
+        with self._lock:
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            fail = self._random.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+        return fail
+
+
+class MockState:
+    """In-memory entities touched by review submissions."""
+
+    def __init__(self, user_count=200):
+        self.users = [f"artist{index:03d}" for index in range(user_count)]
+        self.tasks = {}
+        self.activities = []
+        self.thumbnails = {}
+        self.files = {}
+        self.operations = 0
+        self.inbox = {}
+        self.requests = Counter()
+        self.errors = Counter()
+        self._lock = threading.Lock()
+
+    def get_task(self, task_id):
+        with self._lock:
+            task = self.tasks.setdefault(task_id, self._new_task(task_id))
+            return json.loads(json.dumps(task))
+
+    @staticmethod
+    def _new_task(task_id):
+        return {
+            "id": task_id,
+            "name": "review",
+            "label": None,
+            "taskType": "Review",
+            "folderId": uuid.uuid5(uuid.NAMESPACE_OID, "folder").hex,
+            "assignees": [],
+            "attrib": {},
+            "data": {},
+            "status": "Not ready",
+            "tags": [],
+            "active": True,
+            "updatedAt": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime())
+        }
+
+    def update_task(self, task_id, changes):
+        with self._lock:
+            task = self.tasks.setdefault(task_id, self._new_task(task_id))
+            task.update(changes)
+            task["updatedAt"] = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime())
+
+    def add(self, collection, payload):
+        entity_id = uuid.uuid4().hex
+        with self._lock:
+            if collection == "activities":
+                self.activities.append(dict(payload, id=entity_id))
+            else:
+                getattr(self, collection)[entity_id] = payload
+        return entity_id
+
+    def add_inbox(self, payload):
+        created_at = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime()) + f".{time.time_ns() % 10 ** 9:09d}"
+        with self._lock:
+            for reviewer in payload.get("reviewers", []):
+                records = self.inbox.setdefault(reviewer, {})
+                records.setdefault(payload["submission_id"], dict(
+                    payload, reviewer=reviewer, status="pending", created_at=created_at))
+
+    def get_inbox(self, reviewer, limit=50, cursor=None):
+        """Page of inbox in the order of the server addon endpoint"""
+        def sort_key(record):
+            return (record["high_priority"], record["created_at"], record["submission_id"])
+
+        with self._lock:
+            records = [
+                record for record in self.inbox.get(reviewer, {}).values()
+                if record["status"] == "pending"
+            ]
+        records.sort(key=sort_key, reverse=True)
+        if cursor:
+            after = tuple(json.loads(base64.urlsafe_b64decode(cursor.encode())))
+            records = [record for record in records if sort_key(record) < after]
+        next_cursor = None
+        if len(records) > limit:
+            next_cursor = base64.urlsafe_b64encode(
+                json.dumps(sort_key(records[limit - 1])).encode()).decode()
+        return {"items": records[:limit], "next_cursor": next_cursor}
+
+    def count(self, route, failed=False):
+        with self._lock:
+            self.requests[route] += 1
+            if failed:
+                self.errors[route] += 1
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                "requests": dict(self.requests),
+                "errors": dict(self.errors),
+                "tasks": len(self.tasks),
+                "activities": len(self.activities),
+                "thumbnails": len(self.thumbnails),
+                "files": len(self.files),
+                "operations": self.operations,
+                "inbox_records": sum(len(records) for records in self.inbox.values())
+            }
+
+
+def _read_body(handler):
+    length = int(handler.headers.get("Content-Length", 0))
+    return handler.rfile.read(length) if length else b""
+
+
+def _read_json(handler):
+    body = _read_body(handler)
+    return json.loads(body) if body else {}
+
+
+def graphql_response(state, query, variables):
+    """Data of the graphql user and task queries sent by the addon"""
+    data = {}
+    if "users" in query:
+        data["users"] = {
+            "pageInfo": {"endCursor": None, "hasNextPage": False},
+            "edges": [{"node": {"name": name}} for name in state.users]
+        }
+    if "tasks" in query and "project" in query:
+        edges = []
+        for task_id in variables.get("taskIds") or []:
+            task = state.get_task(task_id)
+            # Entity data is a JSON string in graphql
+            task["data"] = json.dumps(task["data"])
+            task["projectName"] = variables.get("projectName")
+            edges.append({"cursor": task_id, "node": task})
+        data["project"] = {
+            "name": variables.get("projectName"),
+            "tasks": {
+                "pageInfo": {"endCursor": None, "hasNextPage": False},
+                "edges": edges
+            }
+        }
+    return {"data": data}
+
+
+def handle_request(handler, state, policy, store):
+    path = handler.path.split("?")[0]
+    for route, method, pattern in ROUTES:
+        match = pattern.match(path)
+        if match and handler.command == method:
+            break
+    else:
+        if "/uploads/" in path:
+            failed = policy.apply()
+            state.count("upload", failed)
+            if failed:
+                _read_body(handler)
+                send_json(handler, 503, {"detail": "Injected failure"})
+            elif not handle_upload_request(handler, store, FaultInjector()):
+                send_json(handler, 404, {"detail": "Not found"})
+            return
+        send_json(handler, 404, {"detail": f"No mock for {handler.command} {path}"})
+        return
+
+    if route == "stats":
+        send_json(handler, 200, state.get_stats())
+        return
+
+    # Requests of the connection itself are never delayed or failed
+    if route == "info":
+        state.count(route)
+        send_json(handler, 200, {"version": SERVER_VERSION, "uptime": 0, "attributes": []})
+        return
+
+    if route == "me":
+        state.count(route)
+        send_json(handler, 200, {
+            "name": "load_test",
+            "attrib": {"fullName": "Load Test", "email": None},
+            "active": True,
+            "accessGroups": {},
+            "data": {"isAdmin": True, "isManager": True}
+        })
+        return
+
+    failed = policy.apply()
+    state.count(route, failed)
+    if failed:
+        _read_body(handler)
+        send_json(handler, 503, {"detail": "Injected failure"})
+        return
+
+    if route == "graphql":
+        payload = _read_json(handler)
+        send_json(handler, 200, graphql_response(
+            state, payload.get("query", ""), payload.get("variables") or {}))
+
+    elif route == "settings":
+        # Addon defaults apply to every missing value
+        send_json(handler, 200, {})
+
+    elif route == "activity":
+        payload = _read_json(handler)
+        payload.update(match.groupdict())
+        send_json(handler, 201, {"id": state.add("activities", payload)})
+
+    elif route in ("thumbnail", "file"):
+        size = len(_read_body(handler))
+        collection = "thumbnails" if route == "thumbnail" else "files"
+        entity_id = state.add(collection, {"size": size, "contentType": handler.headers.get("Content-Type")})
+        send_json(handler, 201, {"id": entity_id})
+
+    elif route == "operations":
+        operations = _read_json(handler).get("operations", [])
+        with state._lock:
+            state.operations += len(operations)
+        send_json(handler, 200, {
+            "success": True,
+            "operations": [
+                {"id": op.get("id"), "entityId": op.get("entityId"), "success": True}
+                for op in operations
+            ]
+        })
+
+    elif route == "add_inbox":
+        payload = _read_json(handler)
+        state.add_inbox(payload)
+        send_json(handler, 200, {"submission_id": payload.get("submission_id")})
+
+    elif route == "get_inbox":
+        query = urllib.parse.parse_qs(urllib.parse.urlsplit(handler.path).query)
+        send_json(handler, 200, state.get_inbox(
+            query.get("reviewer", ["reviewer"])[0],
+            int(query.get("limit", ["50"])[0]),
+            query.get("cursor", [None])[0]
+        ))
+
+    elif route == "update_task":
+        state.update_task(match.group("task_id"), _read_json(handler))
+        handler.send_response(204)
+        handler.end_headers()
+
+
+def create_server(
+    host,
+    port,
+    latency=0.0,
+    jitter=0.0,
+    error_rate=0.0,
+    user_count=200,
+    store_dir=None,
+    seed=None
+):
+    """Create mock server, 'server.state' holds the in-memory entities"""
+    state = MockState(user_count)
+    policy = FaultPolicy(latency, jitter, error_rate, seed)
+    store = uploads.UploadStore(store_dir)
+
+    class MockHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _handle(self):
+            try:
+                handle_request(self, state, policy, store)
+            except (ValueError, KeyError) as e:
+                send_json(self, 400, {"detail": str(e)})
+
+        do_GET = do_POST = do_PATCH = _handle
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MockHandler)
+    server.daemon_threads = True
+    server.state = state
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5056)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to each request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra seconds up to this value")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of a 503 response")
+    parser.add_argument("--users", type=int, default=200, help="Users returned by graphql")
+    parser.add_argument("--store-dir", default=None, help="Upload staging directory")
+    parser.add_argument("--seed", type=int, default=None, help="Seed of injected faults")
+    args = parser.parse_args()
+
+    server = create_server(
+        args.host, args.port, args.latency, args.jitter, args.error_rate,
+        args.users, args.store_dir, args.seed
+    )
+    print(f"Mock AYON server listening on http://{args.host}:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+"""Local stand-in for the review_submitter resumable upload endpoints.
+
+Serves the chunked upload protocol used by
+'review_submitter.handlers.upload_helper.ChunkedUploader' with the same
+staging logic as the server addon, plus optional fault injection to
+exercise resume behaviour without an AYON server.
+
+Example:
+    python tools/upload_stand_in.py --port 5055 --fail-every 3
+"""
+import argparse
+import importlib.util
+import json
+import os
+import re
+import threading
+import time
+import uuid
+import weakref
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Load server staging module without importing the server addon package
+_spec = importlib.util.spec_from_file_location(
+    "review_submitter_uploads", os.path.join(ROOT_DIR, "server", "uploads.py")
+)
+uploads = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(uploads)
+
+# Finalize targets of the server addon
+FINALIZE_TARGETS = ("thumbnail", "activity_file")
+UPLOAD_PATH_PATTERN = re.compile(
+    r"/projects/(?P<project>[^/]+)/uploads/(?P<upload_id>[^/]+)(?P<finalize>/finalize)?$"
+)
+
+
+class FaultInjector:
+    """Fail every n-th chunk request, thread safe."""
+
+    def __init__(self, fail_every=0):
+        self.fail_every = fail_every
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def should_fail(self):
+        if not self.fail_every:
+            return False
+        with self._lock:
+            self._count += 1
+            return self._count % self.fail_every == 0
+
+
+_finalize_locks = weakref.WeakValueDictionary()
+_finalize_locks_lock = threading.Lock()
+
+
+def _get_finalize_lock(project_name, upload_id):
+    """Lock serializing finalize requests of one upload like the server"""
+    with _finalize_locks_lock:
+        return _finalize_locks.setdefault((project_name, upload_id), threading.Lock())
+
+
+def handle_upload_request(handler, store, faults, latency=0.0):
+    """Handle upload protocol request, False if path does not match."""
+    match = UPLOAD_PATH_PATTERN.search(handler.path.split("?")[0])
+    if not match:
+        return False
+
+    if latency:
+        time.sleep(latency)
+
+    project_name = match.group("project")
+    upload_id = match.group("upload_id")
+    try:
+        if handler.command == "GET" and not match.group("finalize"):
+            status = store.status(project_name, upload_id)
+            if status is None:
+                send_json(handler, 404, {"detail": "Upload not found"})
+            else:
+                send_json(handler, 200, {"offset": status["offset"], "size": status["size"]})
+
+        elif handler.command == "PATCH":
+            length = int(handler.headers.get("Content-Length", 0))
+            chunk = handler.rfile.read(length)
+            if faults.should_fail():
+                # Chunk was received but never acknowledged
+                send_json(handler, 503, {"detail": "Injected failure"})
+                return True
+            try:
+                offset = store.append(
+                    project_name,
+                    upload_id,
+                    int(handler.headers["Upload-Offset"]),
+                    int(handler.headers["Upload-Length"]),
+                    chunk,
+                )
+            except uploads.UploadOffsetMismatch as e:
+                send_json(handler, 409, {"offset": e.offset})
+                return True
+            send_json(handler, 200, {"offset": offset})
+
+        elif handler.command == "POST" and match.group("finalize"):
+            length = int(handler.headers.get("Content-Length", 0))
+            payload = json.loads(handler.rfile.read(length) or b"{}")
+            if payload.get("target", "thumbnail") not in FINALIZE_TARGETS:
+                send_json(handler, 400, {"detail": f"Unknown target {payload['target']}"})
+                return True
+            with _get_finalize_lock(project_name, upload_id):
+                status = store.status(project_name, upload_id)
+                if status is None:
+                    send_json(handler, 404, {"detail": "Upload not found"})
+                elif status["result"] is not None:
+                    send_json(handler, 200, status["result"])
+                elif store.read(project_name, upload_id) is None:
+                    send_json(handler, 400, {"detail": "Upload is not complete"})
+                else:
+                    result = {"id": uuid.uuid4().hex}
+                    store.complete(project_name, upload_id, result)
+                    send_json(handler, 200, result)
+        else:
+            send_json(handler, 405, {"detail": "Method not allowed"})
+
+    except ValueError as e:
+        send_json(handler, 400, {"detail": str(e)})
+    return True
+
+
+def send_json(handler, status, payload):
+    body = json.dumps(payload).encode("utf-8")
+    handler.send_response(status)
+    handler.send_header("Content-Type", "application/json")
+    handler.send_header("Content-Length", str(len(body)))
+    handler.end_headers()
+    handler.wfile.write(body)
+
+
+def create_server(host, port, store_dir=None, fail_every=0, latency=0.0):
+    store = uploads.UploadStore(store_dir)
+    faults = FaultInjector(fail_every)
+
+    class UploadHandler(BaseHTTPRequestHandler):
+        def _handle(self):
+            if not handle_upload_request(self, store, faults, latency):
+                send_json(self, 404, {"detail": "Not found"})
+
+        do_GET = do_PATCH = do_POST = _handle
+
+        def log_message(self, format, *args):
+            pass
+
+    return ThreadingHTTPServer((host, port), UploadHandler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--store-dir", default=None, help="Staging directory")
+    parser.add_argument("--fail-every", type=int, default=0, help="Fail every n-th chunk")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to each request")
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port, args.store_dir, args.fail_every, args.latency)
+    print(f"Upload stand-in listening on http://{args.host}:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()